@@ -1,11 +1,22 @@
 import os
 from flask import Flask
-from exts import db
 from app_config import config
-from flask_cors import CORS 
 
 def create_app(config_name=None):
-   
+    # 扩展和蓝图在这里导入：只导入本模块（gunicorn/uvicorn 主进程、flask 命令行）时不加载 SQLAlchemy 等依赖
+    from flask_cors import CORS
+    from exts import db
+    from db_pool import init_db_pool
+    from query_stats import init_query_stats
+    from disease_index import init_disease_index
+    from result_store import init_result_store
+    from session_backend import init_session_backend
+    from classify_memo import init_classify_memo
+    from singleflight import init_singleflight
+    from hedging import init_hedger
+    from triage_table import init_triage_table
+    from commands import register_commands
+
     if config_name is None:
         config_name = os.environ.get('FLASK_ENV', 'development')
     
@@ -13,22 +24,36 @@ def create_app(config_name=None):
     app.config.from_object(config[config_name])
     app.config['JSON_AS_ASCII'] = False  # 确保JSON不转义中文
     app.config['JSONIFY_MIMETYPE'] = 'application/json; charset=utf-8'
+    # 先配置日志，启动过程中的日志也能写入文件
+    setup_logging(app)
     # 初始化扩展
+    init_db_pool(app)
     db.init_app(app)
+    init_query_stats(app)
+    init_result_store(app)
+    init_session_backend(app)
+    init_classify_memo(app)
+    # 合作方客户端（requests 及其连接池）在第一次调用合作方时创建，见 partner_client.get_partner_client
+    init_singleflight(app)
+    init_hedger(app)
     cors=CORS()
     
     # 注册蓝图
     from blueprints.classify import classify_bp,triage_bp
     app.register_blueprint(classify_bp)
     app.register_blueprint(triage_bp)
+    from blueprints.batch import batch_bp
+    app.register_blueprint(batch_bp)
+    from blueprints.metrics import metrics_bp
+    app.register_blueprint(metrics_bp)
 
-    
-    # 创建数据库表
-    with app.app_context():
-        db.create_all()
-    
-    # 配置日志
-    setup_logging(app)
+    # 建表等一次性操作改为命令行执行：flask --app app init-db
+    register_commands(app)
+
+    # 构建疾病->科室内存索引，请求路径上的科室解析不再查库
+    init_disease_index(app)
+    # 分诊规则（配置了规则文件时修改后自动重新读取）；本地打分器在第一次需要临时分类时构建
+    init_triage_table(app)
     
     return app
 
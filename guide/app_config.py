@@ -7,24 +7,94 @@ PORT = os.getenv('DB_PORT', '3306')
 DATABASE = os.getenv('DB_DATABASE', 'world')
 USERNAME = os.getenv('DB_USERNAME', 'root')
 PASSWORD = os.getenv('DB_PASSWORD', '0000000')
-DB_URI = 'mysql+pymysql://{}:{}@{}:{}/{}?charset=utf8'.format(USERNAME, PASSWORD, HOSTNAME, PORT, DATABASE)
+# DATABASE_URL 可直接指定完整连接串（如 sqlite:///guide.db），优先于上面的分项配置
+DB_URI = os.getenv('DATABASE_URL') or 'mysql+pymysql://{}:{}@{}:{}/{}?charset=utf8'.format(USERNAME, PASSWORD, HOSTNAME, PORT, DATABASE)
 SQLALCHEMY_DATABASE_URI = DB_URI
 
+
+def engine_options(pool_size, max_overflow, pool_recycle=1800, pool_timeout=10):
+    """连接池参数，环境变量 DB_POOL_* 优先
+    pool_recycle 需小于 MySQL 的 wait_timeout，pre_ping 在取出连接时检测已断开的连接
+    """
+    return {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', pool_size)),
+        'max_overflow': int(os.getenv('DB_POOL_MAX_OVERFLOW', max_overflow)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', pool_recycle)),
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', pool_timeout)),
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true',
+    }
+
+
+# 独立脚本（add.py 等）使用的连接池参数
+DB_ENGINE_OPTIONS = engine_options(pool_size=2, max_overflow=2)
+
 class Config:
     """基础配置类"""
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'your-secret-key-here'
     SQLALCHEMY_DATABASE_URI = DB_URI
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(pool_size=10, max_overflow=20)
     
     # 合作方API配置
     PARTNER_API_URL = os.getenv('PARTNER_API_URL', 'http://api.partner.com/model_api')
     # 第一条路由指向模型文件的路由
     PARTNER_API_TIMEOUT = int(os.getenv('PARTNER_API_TIMEOUT', '30'))
     PARTNER_API_RETRY = int(os.getenv('PARTNER_API_RETRY', '3'))
-    # 下侧为测试用配置
+    # 客户端连接池与重试/熔断配置；PARTNER_API_TIMEOUT 为读取超时，PARTNER_API_RETRY 为最多尝试次数
+    PARTNER_API_CONNECT_TIMEOUT = float(os.getenv('PARTNER_API_CONNECT_TIMEOUT', '3'))
+    PARTNER_API_POOL_SIZE = int(os.getenv('PARTNER_API_POOL_SIZE', '10'))
+    PARTNER_API_BACKOFF_BASE = float(os.getenv('PARTNER_API_BACKOFF_BASE', '0.2'))
+    PARTNER_API_BACKOFF_MAX = float(os.getenv('PARTNER_API_BACKOFF_MAX', '5'))
+    PARTNER_BREAKER_FAILURE_THRESHOLD = int(os.getenv('PARTNER_BREAKER_FAILURE_THRESHOLD', '5'))
+    PARTNER_BREAKER_RESET_TIMEOUT = float(os.getenv('PARTNER_BREAKER_RESET_TIMEOUT', '30'))
+    # 分类接口延迟预算（秒，0 表示不限制）：超过近期延迟分位数时对冲一次请求，
+    # 预算耗尽则返回带 provisional 标记的本地临时分类；预算同时是合作方请求（含重试）的截止时间
+    CLASSIFY_LATENCY_BUDGET = float(os.getenv('CLASSIFY_LATENCY_BUDGET', '5'))
+    PARTNER_HEDGE_ENABLED = os.getenv('PARTNER_HEDGE_ENABLED', 'true').lower() == 'true'
+    PARTNER_HEDGE_PERCENTILE = float(os.getenv('PARTNER_HEDGE_PERCENTILE', '95'))
+    PARTNER_HEDGE_DEFAULT_DELAY = float(os.getenv('PARTNER_HEDGE_DEFAULT_DELAY', '1'))
+    # 合作方批量接口（为空表示不支持，批量分类退化为并发逐条调用）
+    PARTNER_API_BATCH_URL = os.getenv('PARTNER_API_BATCH_URL', '')
+    PARTNER_API_BATCH_SIZE = int(os.getenv('PARTNER_API_BATCH_SIZE', '50'))
+    PARTNER_API_MAX_PARALLEL = int(os.getenv('PARTNER_API_MAX_PARALLEL', '4'))
+    # ASGI 模式（asgi.py）下合作方异步客户端的连接上限，即单进程可同时挂起的合作方请求数
+    ASYNC_PARTNER_POOL_SIZE = int(os.getenv('ASYNC_PARTNER_POOL_SIZE', '200'))
+    # /classify/batch、/triage/batch 单次请求最多条数
+    CLASSIFY_BATCH_MAX_ITEMS = int(os.getenv('CLASSIFY_BATCH_MAX_ITEMS', '500'))
+    TRIAGE_BATCH_MAX_ITEMS = int(os.getenv('TRIAGE_BATCH_MAX_ITEMS', '500'))
+    # 合作方模型版本，升级模型时修改以使分类记忆缓存失效
+    PARTNER_MODEL_VERSION = os.getenv('PARTNER_MODEL_VERSION', 'v1')
+    # 下侧为测试用配置，配合本地替身服务 python mock_partner.py --port 5001
     # PARTNER_API_URL = os.getenv('PARTNER_API_URL', 'http://localhost:5001/mock_api')
+    # PARTNER_API_BATCH_URL = os.getenv('PARTNER_API_BATCH_URL', 'http://localhost:5001/mock_api/batch')
     # PARTNER_API_TIMEOUT = int(os.getenv('PARTNER_API_TIMEOUT', '5'))
     # PARTNER_API_RETRY = int(os.getenv('PARTNER_API_RETRY', '2'))
+    # 分类结果/会话缓存配置（session_id 有效期 10 分钟）
+    RESULT_CACHE_TTL = int(os.getenv('RESULT_CACHE_TTL', '600'))
+    RESULT_CACHE_MAX_ENTRIES = int(os.getenv('RESULT_CACHE_MAX_ENTRIES', '10000'))
+    RESULT_CACHE_MAX_BYTES = int(os.getenv('RESULT_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+    # 分类结果记忆缓存（按规范化症状集合缓存合作方返回）
+    CLASSIFY_MEMO_ENABLED = os.getenv('CLASSIFY_MEMO_ENABLED', 'true').lower() == 'true'
+    CLASSIFY_MEMO_TTL = int(os.getenv('CLASSIFY_MEMO_TTL', '3600'))
+    CLASSIFY_MEMO_MAX_ENTRIES = int(os.getenv('CLASSIFY_MEMO_MAX_ENTRIES', '5000'))
+    # 会话存储后端：local 仅限单进程；多 worker/多主机部署使用 redis
+    # 本地可用 python mini_redis.py 启动替身服务
+    SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'local')
+    SESSION_REDIS_URL = os.getenv('SESSION_REDIS_URL', 'redis://127.0.0.1:6379/0')
+    SESSION_KEY_PREFIX = os.getenv('SESSION_KEY_PREFIX', 'guide:result:')
+    SESSION_REDIS_POOL_SIZE = int(os.getenv('SESSION_REDIS_POOL_SIZE', '16'))
+    SESSION_REDIS_TIMEOUT = float(os.getenv('SESSION_REDIS_TIMEOUT', '2'))
+    # 内存索引未命中时是否再查一次数据库（一条查询），用于索引重建前新增的疾病/同义词
+    DISEASE_INDEX_DB_FALLBACK = os.getenv('DISEASE_INDEX_DB_FALLBACK', 'true').lower() == 'true'
+    # /classify/ 返回的科室推荐个数，构建索引时预先排好
+    RECOMMEND_TOP_K = int(os.getenv('RECOMMEND_TOP_K', '3'))
+    # 单个请求的 SQL 条数超过该值时记 warning（0 为不告警）
+    SQL_REQUEST_WARN_QUERIES = int(os.getenv('SQL_REQUEST_WARN_QUERIES', '1'))
+    # 分诊规则文件（JSON，缺省使用 triage.py 中的规则），每隔 TRIAGE_RULES_CHECK_INTERVAL 秒检查是否修改
+    TRIAGE_RULES_FILE = os.getenv('TRIAGE_RULES_FILE', '')
+    TRIAGE_RULES_CHECK_INTERVAL = float(os.getenv('TRIAGE_RULES_CHECK_INTERVAL', '5'))
+    # 分诊记忆表最多记住的输入组合数，满了清空重来
+    TRIAGE_MEMO_MAX_ENTRIES = int(os.getenv('TRIAGE_MEMO_MAX_ENTRIES', '4096'))
     # 日志配置
     LOG_FILE = 'logs/app.log'
     LOG_LEVEL = 'INFO'
@@ -32,11 +102,13 @@ class Config:
 class DevelopmentConfig(Config):
     """开发环境配置"""
     DEBUG = True
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(pool_size=5, max_overflow=5)
     LOG_LEVEL = 'DEBUG'
 
 class ProductionConfig(Config):
     """生产环境配置"""
     DEBUG = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(pool_size=20, max_overflow=30, pool_timeout=5)
     LOG_LEVEL = 'WARNING'
 
 
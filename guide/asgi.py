@@ -0,0 +1,123 @@
+# ASGI 服务入口
+# 运行: uvicorn asgi:create_asgi_app --factory --host 0.0.0.0 --port 5000
+# POST /classify/ 在事件循环中处理，等待合作方和会话存储时不占用线程，单进程即可挂起数百个慢请求；
+# 其余路由（结果查询、分诊、批量接口等）原样转交 Flask 应用，路由和响应结构与 read.md 一致。
+# POST /classify/ 同样在 Flask 请求上下文中执行 before/after_request 钩子（SQL 统计等），
+# 分类流程与 WSGI 路由共用 classify_service（记忆缓存、single-flight、延迟预算、临时分类、错误响应）
+from asgiref.wsgi import WsgiToAsgi
+from flask import jsonify, request
+from werkzeug.test import EnvironBuilder
+
+from app import create_app
+from async_partner_client import AsyncPartnerClient
+from classify_service import classify_symptoms_async, parse_symptoms, partner_error_response
+from partner_errors import PartnerAPIError
+
+ASYNC_CLIENT_KEY = 'async_partner_client'
+
+
+class AsyncClassifyApp:
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.wsgi = WsgiToAsgi(flask_app)
+        self.partner = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http' and scope['method'] == 'POST' and scope['path'] == '/classify/':
+            await self._classify(scope, receive, send)
+        else:
+            await self.wsgi(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self.partner is not None:
+                    await self.partner.aclose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def _get_partner(self):
+        # httpx 客户端需在事件循环内创建
+        if self.partner is None:
+            self.partner = AsyncPartnerClient.from_config(self.flask_app.config)
+            self.flask_app.extensions[ASYNC_CLIENT_KEY] = self.partner
+        return self.partner
+
+    async def _classify(self, scope, receive, send):
+        body = b''
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+
+        app = self.flask_app
+        # 请求上下文保存在上下文变量中，每个 ASGI 请求是独立的任务，跨 await 持有不会串到其他请求。
+        # 异常处理与 Flask.full_dispatch_request / wsgi_app 相同
+        with app.request_context(_environ(scope, body)):
+            try:
+                try:
+                    rv = app.preprocess_request()
+                    if rv is None:
+                        rv = await self._classify_view()
+                except Exception as e:
+                    rv = app.handle_user_exception(e)
+                response = app.finalize_request(rv)
+            except Exception as e:
+                response = app.handle_exception(e)
+            status, headers, payload = response.status_code, response.headers.to_wsgi_list(), response.get_data()
+
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(k.lower().encode('latin1'), v.encode('latin1')) for k, v in headers],
+        })
+        await send({'type': 'http.response.body', 'body': payload})
+
+    async def _classify_view(self):
+        """与 blueprints.classify.classify 相同，合作方调用在事件循环中等待"""
+        symptoms, error = parse_symptoms(request.get_json(silent=True))
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
+        try:
+            response = await classify_symptoms_async(symptoms, self._get_partner().classify)
+        except PartnerAPIError as e:
+            body, status = partner_error_response(e)
+            return jsonify(body), status
+        return jsonify(response)
+
+
+def _environ(scope, body):
+    """ASGI scope -> WSGI environ，供 Flask 请求上下文使用"""
+    builder = EnvironBuilder(
+        path=scope['path'],
+        base_url=f"{scope.get('scheme', 'http')}://{_host(scope)}{scope.get('root_path', '')}",
+        method=scope['method'],
+        query_string=scope.get('query_string', b'').decode('latin1'),
+        headers=[(k.decode('latin1'), v.decode('latin1')) for k, v in scope.get('headers', [])],
+        data=body,
+    )
+    try:
+        environ = builder.get_environ()
+    finally:
+        builder.close()
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+    return environ
+
+
+def _host(scope):
+    server = scope.get('server')
+    if not server:
+        return 'localhost'
+    return f'{server[0]}:{server[1]}' if server[1] is not None else server[0]
+
+
+def create_asgi_app(config_name=None):
+    return AsyncClassifyApp(create_app(config_name))
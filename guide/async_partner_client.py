@@ -0,0 +1,135 @@
+# 合作方 API 的 asyncio 客户端，供 ASGI 模式（asgi.py）使用
+# 重试、退避和熔断规则与 PartnerClient 相同，等待合作方响应时不占用线程
+import asyncio
+import time
+
+import httpx
+
+from partner_client import (
+    CircuitBreaker,
+    PartnerAPIError,
+    PartnerUnavailableError,
+    backoff_delay,
+    parse_classification,
+)
+
+
+class AsyncPartnerClient:
+    """单个事件循环内共享；连接池上限即同时在途的合作方请求数"""
+
+    def __init__(self, url, connect_timeout=3.0, read_timeout=30.0, max_attempts=3,
+                 pool_size=100, backoff_base=0.2, backoff_max=5.0, breaker=None):
+        self.url = url
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+        self.requests = 0
+        self.failures = 0
+        self.retries = 0
+        self.in_flight = 0
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            config['PARTNER_API_URL'],
+            connect_timeout=config['PARTNER_API_CONNECT_TIMEOUT'],
+            read_timeout=config['PARTNER_API_TIMEOUT'],
+            max_attempts=config['PARTNER_API_RETRY'],
+            pool_size=config['ASYNC_PARTNER_POOL_SIZE'],
+            backoff_base=config['PARTNER_API_BACKOFF_BASE'],
+            backoff_max=config['PARTNER_API_BACKOFF_MAX'],
+            breaker=CircuitBreaker(
+                failure_threshold=config['PARTNER_BREAKER_FAILURE_THRESHOLD'],
+                reset_timeout=config['PARTNER_BREAKER_RESET_TIMEOUT'],
+            ),
+        )
+
+    def _attempt_timeout(self, deadline):
+        if deadline is None:
+            return httpx.USE_CLIENT_DEFAULT
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        return httpx.Timeout(min(self.read_timeout, remaining), connect=min(self.connect_timeout, remaining))
+
+    async def post(self, payload, deadline=None):
+        """deadline（time.monotonic 时间）含义同 PartnerClient.post"""
+        if not self.breaker.allow():
+            raise PartnerUnavailableError('合作方接口熔断中，暂停调用')
+
+        reachable = None  # 含义同 PartnerClient.post；被取消时为 None，只释放探测名额
+        last_error = None
+        attempts = 0
+        try:
+            for attempt in range(self.max_attempts):
+                if attempt:
+                    self.retries += 1
+                    delay = backoff_delay(attempt - 1, self.backoff_base, self.backoff_max)
+                    if deadline is not None:
+                        delay = min(delay, max(0.0, deadline - time.monotonic()))
+                    await asyncio.sleep(delay)
+                timeout = self._attempt_timeout(deadline)
+                if timeout is None:
+                    last_error = last_error or '超出调用截止时间'
+                    break
+                attempts += 1
+                self.requests += 1
+                self.in_flight += 1
+                try:
+                    response = await self.client.post(self.url, json=payload, timeout=timeout)
+                except (httpx.TransportError, httpx.DecodingError) as e:
+                    last_error = e
+                    continue
+                except httpx.RequestError as e:
+                    last_error = e
+                    break
+                finally:
+                    self.in_flight -= 1
+
+                if response.status_code >= 500:
+                    last_error = PartnerAPIError(f'合作方接口返回 {response.status_code}')
+                    continue
+                if response.status_code >= 400:
+                    reachable = True
+                    self.failures += 1
+                    raise PartnerAPIError(f'合作方接口返回 {response.status_code}: {response.text[:200]}')
+                try:
+                    data = response.json()
+                except ValueError as e:
+                    last_error = PartnerAPIError(f'合作方接口返回非 JSON 内容: {e}')
+                    continue
+                reachable = True
+                return data
+
+            reachable = False if attempts else None
+            self.failures += 1
+            raise PartnerAPIError(f'合作方接口调用失败（{attempts} 次尝试）: {last_error!r}')
+        finally:
+            if reachable:
+                self.breaker.record_success()
+            elif reachable is False:
+                self.breaker.record_failure()
+            else:
+                self.breaker.release()
+
+    async def classify(self, symptoms, deadline=None):
+        return parse_classification(await self.post({'symptoms': list(symptoms)}, deadline=deadline))
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    def stats(self):
+        return {
+            'requests': self.requests,
+            'failures': self.failures,
+            'retries': self.retries,
+            'in_flight': self.in_flight,
+            'breaker': self.breaker.stats(),
+        }
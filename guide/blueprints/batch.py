@@ -0,0 +1,49 @@
+from flask import Blueprint, current_app, jsonify, request
+
+from classify_service import classify_batch, parse_symptoms
+from triage_service import triage_batch
+
+batch_bp = Blueprint('batch', __name__)
+
+
+@batch_bp.route('/classify/batch', methods=['POST'])
+def classify_batch_view():
+    """批量症状分类，请求体 {"items": [{"symptoms": [...]}, ...]}"""
+    items, error = _batch_items('CLASSIFY_BATCH_MAX_ITEMS')
+    if error:
+        return error
+
+    # 不合法的条目不提交分类，在对应位置返回 parse_symptoms 给出的错误
+    parsed = [parse_symptoms(item) for item in items]
+    classified, stats = classify_batch([symptoms for symptoms, error in parsed if error is None])
+
+    classified = iter(classified)
+    results = [next(classified) if error is None else {'success': False, 'error': error}
+               for _, error in parsed]
+    stats['invalid'] = len(items) - stats['total']
+    stats['total'] = len(items)
+    return jsonify({'success': True, 'results': results, 'stats': stats})
+
+
+@batch_bp.route('/triage/batch', methods=['POST'])
+def triage_batch_view():
+    """批量急诊分诊，请求体 {"items": [{"session_id": ..., <同 /triage/ 的字段>}, ...]}"""
+    items, error = _batch_items('TRIAGE_BATCH_MAX_ITEMS')
+    if error:
+        return error
+
+    results, stats = triage_batch(items)
+    return jsonify({'success': True, 'results': results, 'stats': stats})
+
+
+def _batch_items(limit_key):
+    """取出请求体中的 items 并校验条数，返回 (items, 错误响应)"""
+    data = request.get_json(silent=True) or {}
+    items = data.get('items') if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        return None, (jsonify({'success': False, 'error': 'items 必须是非空列表'}), 400)
+
+    max_items = current_app.config[limit_key]
+    if len(items) > max_items:
+        return None, (jsonify({'success': False, 'error': f'单次最多提交 {max_items} 条'}), 400)
+    return items, None
@@ -0,0 +1,43 @@
+from flask import Blueprint, jsonify, request
+
+from classify_service import classify_symptoms, parse_symptoms, partner_error_response
+from partner_errors import PartnerAPIError
+from session_backend import get_session_backend
+from triage_service import SESSION_EXPIRED, triage_session
+
+classify_bp = Blueprint('classify', __name__, url_prefix='/classify')
+triage_bp = Blueprint('triage', __name__, url_prefix='/triage')
+
+
+@classify_bp.route('/', methods=['POST'])
+def classify():
+    """症状分类与科室推荐，请求体 {"symptoms": [...]}"""
+    symptoms, error = parse_symptoms(request.get_json(silent=True))
+    if error:
+        return jsonify({'success': False, 'error': error}), 400
+
+    try:
+        response = classify_symptoms(symptoms)
+    except PartnerAPIError as e:
+        body, status = partner_error_response(e)
+        return jsonify(body), status
+    return jsonify(response)
+
+
+@classify_bp.route('/result/<result_id>', methods=['GET'])
+def classify_result(result_id):
+    """取回 /classify/ 缓存的分类结果"""
+    result = get_session_backend().get(result_id)
+    if result is None:
+        return jsonify({'success': False, 'error': '结果不存在或已过期'}), 404
+    return jsonify(dict(result, success=True, result_id=result_id))
+
+
+@triage_bp.route('/', methods=['POST'])
+def triage():
+    """急诊分诊，请求体字段见 read.md"""
+    response, error = triage_session(request.get_json(silent=True))
+    if error:
+        status = 404 if error == SESSION_EXPIRED else 400
+        return jsonify({'success': False, 'error': error}), status
+    return jsonify(response)
@@ -0,0 +1,23 @@
+from flask import Blueprint, current_app, jsonify
+
+from db_pool import pool_stats
+from exts import db
+
+metrics_bp = Blueprint('metrics', __name__, url_prefix='/metrics')
+
+
+@metrics_bp.route('/', methods=['GET'])
+def metrics():
+    """运行状态：数据库连接池、合作方连接池/熔断器、会话存储、分类记忆缓存与请求合并"""
+    ext = current_app.extensions
+    memo = ext.get('classify_memo')
+    return jsonify({
+        'db_pool': pool_stats(db.engine),
+        'partner_client': ext['partner_client'].stats() if ext.get('partner_client') else None,
+        'session_backend': ext['session_backend'].stats(),
+        'classify_memo': memo.stats() if memo else None,
+        'classify_singleflight': ext['classify_singleflight'].stats(),
+        'partner_hedger': ext['partner_hedger'].stats(),
+        'triage_table': ext['triage_table'].stats() if ext.get('triage_table') else None,
+        'async_partner_client': ext['async_partner_client'].stats() if ext.get('async_partner_client') else None,
+    })
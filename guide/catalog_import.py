@@ -0,0 +1,323 @@
+# 疾病目录导入：从 CSV / JSONL 文件流式导入科室、疾病映射和同义词
+# 按固定大小分块读取，每块只查询本块涉及的现有记录，写入后立即提交，内存占用与文件大小无关；
+# 可重复执行（已存在的记录按 name_key 比对，变化的更新，相同的跳过），引用不到科室/疾病的行记为拒绝
+# 用法: python catalog_import.py --departments departments.csv --mappings mappings.jsonl --synonyms synonyms.csv
+#       python catalog_import.py --export-seed data/   # 把 add.py 中的内置数据导出为 JSONL
+# 字段: departments: name, director, phone, description
+#       mappings:    disease_name, department, confidence
+#       synonyms:    disease_name, synonym, score
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from itertools import islice
+
+from sqlalchemy import func, insert, select, update
+
+from model import Department, DiseaseMapping, DiseaseSynonym
+from normalize import normalize_name
+
+CHUNK_SIZE = 1000
+MAX_REJECT_SAMPLES = 20
+
+
+class RejectedRow(ValueError):
+    """数据行不合法或引用不到科室/疾病"""
+
+
+def read_records(path):
+    """逐行读取 .csv（带表头）或 .jsonl，返回 (行号, dict)；无法解析或不是 JSON 对象的行返回 (行号, RejectedRow)"""
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        if path.endswith('.csv'):
+            for line_no, row in enumerate(csv.DictReader(f), start=2):
+                yield line_no, row
+        else:
+            for line_no, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    yield line_no, RejectedRow(f'JSON 解析失败: {e}')
+                    continue
+                if not isinstance(record, dict):
+                    record = RejectedRow(f'不是 JSON 对象: {line[:50]}')
+                yield line_no, record
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _text(record, field, required=True):
+    value = record.get(field)
+    if value is not None and not isinstance(value, str):
+        raise RejectedRow(f'{field} 不是字符串: {value!r}')
+    value = value.strip() if value is not None else value
+    if required and not value:
+        raise RejectedRow(f'缺少字段 {field}')
+    return value or None
+
+
+def _score(record, field, default=1.0):
+    value = record.get(field)
+    if value in (None, ''):
+        return default
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise RejectedRow(f'{field} 不是数字: {value!r}')
+    if not 0 <= value <= 1:
+        raise RejectedRow(f'{field} 超出 0~1: {value}')
+    return value
+
+
+class ImportStats:
+    def __init__(self, table):
+        self.table = table
+        self.read = 0
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.rejected = 0
+        self.batches = 0
+        self.samples = []
+
+    def reject(self, line_no, error, rejects_file=None):
+        self.rejected += 1
+        if len(self.samples) < MAX_REJECT_SAMPLES:
+            self.samples.append(f'第 {line_no} 行: {error}')
+        if rejects_file is not None:
+            rejects_file.write(json.dumps({'table': self.table, 'line': line_no, 'error': str(error)},
+                                          ensure_ascii=False) + '\n')
+
+    def as_dict(self):
+        return {k: getattr(self, k) for k in ('read', 'inserted', 'updated', 'unchanged', 'rejected', 'batches')}
+
+
+class CatalogImporter:
+    """三张表依次导入；科室表规模小，常驻内存用于解析映射的科室引用"""
+
+    def __init__(self, session, chunk_size=CHUNK_SIZE, rejects_file=None):
+        self.session = session
+        self.chunk_size = chunk_size
+        self.rejects_file = rejects_file
+        self._departments = None
+
+    def _parse(self, records, stats, parse):
+        """校验并归一化一块数据，同一块内重复的键只保留最后一条"""
+        rows = {}
+        for line_no, record in records:
+            stats.read += 1
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                key, row = parse(record)
+            except RejectedRow as e:
+                stats.reject(line_no, e, self.rejects_file)
+                continue
+            rows[key] = (line_no, row)
+        return rows
+
+    def _write(self, model, stats, to_insert, to_update):
+        if to_insert:
+            self.session.execute(insert(model.__table__), to_insert)
+        if to_update:
+            self.session.execute(update(model), to_update)
+        self.session.commit()
+        stats.inserted += len(to_insert)
+        stats.updated += len(to_update)
+        stats.batches += 1
+
+    def department_ids(self):
+        if self._departments is None:
+            self._departments = dict(
+                self.session.execute(select(Department.name_key, Department.id)).all()
+            )
+        return self._departments
+
+    def import_departments(self, records):
+        stats = ImportStats('departments')
+
+        def parse(record):
+            name = _text(record, 'name')
+            return normalize_name(name), {
+                'name': name,
+                'director': _text(record, 'director'),
+                'phone': _text(record, 'phone', required=False),
+                'description': _text(record, 'description', required=False),
+            }
+
+        fields = ('director', 'phone', 'description')
+        for chunk in chunked(records, self.chunk_size):
+            rows = self._parse(chunk, stats, parse)
+            existing = {
+                row.name_key: row for row in self.session.execute(
+                    select(Department.id, Department.name_key, *(getattr(Department, f) for f in fields))
+                    .where(Department.name_key.in_(list(rows)))
+                )
+            }
+            to_insert, to_update = [], []
+            for key, (_, row) in rows.items():
+                current = existing.get(key)
+                if current is None:
+                    to_insert.append(dict(row, name_key=key, created_at=datetime.now()))
+                elif any(getattr(current, f) != row[f] for f in fields):
+                    to_update.append({'id': current.id, **{f: row[f] for f in fields}})
+                else:
+                    stats.unchanged += 1
+            self._write(Department, stats, to_insert, to_update)
+        self._departments = None
+        return stats
+
+    def import_mappings(self, records):
+        stats = ImportStats('mappings')
+        departments = self.department_ids()
+
+        def parse(record):
+            disease_name = _text(record, 'disease_name')
+            department = _text(record, 'department')
+            department_id = departments.get(normalize_name(department))
+            if department_id is None:
+                raise RejectedRow(f'找不到科室 {department}')
+            key = (normalize_name(disease_name), department_id)
+            return key, {'disease_name': disease_name, 'confidence': _score(record, 'confidence')}
+
+        for chunk in chunked(records, self.chunk_size):
+            rows = self._parse(chunk, stats, parse)
+            existing = {}
+            for row_id, key, department_id, confidence in self.session.execute(
+                select(DiseaseMapping.id, DiseaseMapping.name_key, DiseaseMapping.department_id,
+                       DiseaseMapping.confidence)
+                .where(DiseaseMapping.name_key.in_(list({key for key, _ in rows})))
+                .order_by(DiseaseMapping.id)
+            ):
+                existing.setdefault((key, department_id), (row_id, confidence))
+            to_insert, to_update = [], []
+            for (key, department_id), (_, row) in rows.items():
+                current = existing.get((key, department_id))
+                if current is None:
+                    to_insert.append(dict(row, name_key=key, department_id=department_id, created_at=datetime.now()))
+                elif current[1] != row['confidence']:
+                    to_update.append({'id': current[0], 'confidence': row['confidence']})
+                else:
+                    stats.unchanged += 1
+            self._write(DiseaseMapping, stats, to_insert, to_update)
+        return stats
+
+    def import_synonyms(self, records):
+        stats = ImportStats('synonyms')
+
+        def parse(record):
+            disease_name = _text(record, 'disease_name')
+            synonym = _text(record, 'synonym')
+            key = (normalize_name(disease_name), normalize_name(synonym))
+            return key, {'disease_name': disease_name, 'synonym': synonym, 'similarity_score': _score(record, 'score')}
+
+        for chunk in chunked(records, self.chunk_size):
+            rows = self._parse(chunk, stats, parse)
+            disease_keys = list({disease_key for disease_key, _ in rows})
+            # 同义词挂在该疾病 id 最小的映射上
+            mapping_ids = dict(self.session.execute(
+                select(DiseaseMapping.name_key, func.min(DiseaseMapping.id))
+                .where(DiseaseMapping.name_key.in_(disease_keys))
+                .group_by(DiseaseMapping.name_key)
+            ).all())
+            existing = {
+                (disease_key, key): (row_id, score)
+                for row_id, key, score, disease_key in self.session.execute(
+                    select(DiseaseSynonym.id, DiseaseSynonym.name_key, DiseaseSynonym.similarity_score,
+                           DiseaseMapping.name_key)
+                    .join(DiseaseMapping, DiseaseSynonym.mapping_id == DiseaseMapping.id)
+                    .where(DiseaseMapping.name_key.in_(disease_keys))
+                )
+            }
+            to_insert, to_update = [], []
+            for (disease_key, key), (line_no, row) in rows.items():
+                mapping_id = mapping_ids.get(disease_key)
+                if mapping_id is None:
+                    stats.reject(line_no, f"找不到疾病 {row['disease_name']}", self.rejects_file)
+                    continue
+                current = existing.get((disease_key, key))
+                if current is None:
+                    to_insert.append({'mapping_id': mapping_id, 'synonym': row['synonym'],
+                                      'similarity_score': row['similarity_score'], 'name_key': key})
+                elif current[1] != row['similarity_score']:
+                    to_update.append({'id': current[0], 'similarity_score': row['similarity_score']})
+                else:
+                    stats.unchanged += 1
+            self._write(DiseaseSynonym, stats, to_insert, to_update)
+        return stats
+
+
+def export_seed(directory):
+    """把 add.py 中内置的目录数据写成 JSONL，之后数据变更只需修改文件"""
+    from add import DEPARTMENTS, DISEASE_MAPPINGS, DISEASE_SYNONYMS
+
+    os.makedirs(directory, exist_ok=True)
+    for name, rows in (('departments', DEPARTMENTS), ('mappings', DISEASE_MAPPINGS), ('synonyms', DISEASE_SYNONYMS)):
+        path = os.path.join(directory, f'{name}.jsonl')
+        with open(path, 'w', encoding='utf-8') as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + '\n')
+        print(f'{path}: {len(rows)} 行')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='从 CSV/JSONL 流式导入疾病目录')
+    parser.add_argument('--departments', help='科室文件')
+    parser.add_argument('--mappings', help='疾病-科室映射文件')
+    parser.add_argument('--synonyms', help='疾病同义词文件')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='每批读取和提交的行数')
+    parser.add_argument('--rejects', help='被拒绝的行写入该 JSONL 文件')
+    parser.add_argument('--export-seed', metavar='DIR', help='把 add.py 内置数据导出为 JSONL 后退出')
+    args = parser.parse_args(argv)
+
+    if args.export_seed:
+        export_seed(args.export_seed)
+        return 0
+    if not (args.departments or args.mappings or args.synonyms):
+        parser.error('至少指定 --departments、--mappings、--synonyms 之一')
+
+    from add import create_session
+
+    session = create_session()
+    rejects_file = open(args.rejects, 'w', encoding='utf-8') if args.rejects else None
+    importer = CatalogImporter(session, chunk_size=args.chunk_size, rejects_file=rejects_file)
+    results = []
+    try:
+        # 顺序固定：映射引用科室，同义词引用映射
+        for path, run in ((args.departments, importer.import_departments),
+                          (args.mappings, importer.import_mappings),
+                          (args.synonyms, importer.import_synonyms)):
+            if path:
+                start = time.perf_counter()
+                stats = run(read_records(path))
+                results.append((path, stats, time.perf_counter() - start))
+    except Exception as e:
+        session.rollback()
+        print(f'导入中断（此前已提交的批次保留）: {e}')
+        return 1
+    finally:
+        session.close()
+        if rejects_file is not None:
+            rejects_file.close()
+
+    for path, stats, elapsed in results:
+        print(f'{stats.table} <- {path}: ' + json.dumps(stats.as_dict(), ensure_ascii=False) + f'，耗时 {elapsed:.2f} 秒')
+        for sample in stats.samples:
+            print(f'  拒绝 {sample}')
+    return 1 if any(stats.rejected for _, stats, _ in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+# 合作方分类结果的记忆化缓存
+# 前端症状选项是固定的，流量集中在少数组合上；命中时省去一次完整的合作方调用
+from flask import current_app
+
+from normalize import canonical_symptoms
+from result_store import ResultStore
+
+EXTENSION_KEY = 'classify_memo'
+
+
+class ClassifyMemo:
+    """以规范化症状集合为键缓存合作方的分类结果
+
+    键中带有模型版本号，合作方升级模型后修改 PARTNER_MODEL_VERSION 即可使旧结果全部失效。
+    """
+
+    def __init__(self, version, ttl=3600, max_entries=5000, max_bytes=16 * 1024 * 1024, clock=None):
+        self.version = version
+        kwargs = {} if clock is None else {'clock': clock}
+        self.store = ResultStore(ttl=ttl, max_entries=max_entries, max_bytes=max_bytes, **kwargs)
+
+    def key(self, symptoms):
+        canonical = canonical_symptoms(symptoms)
+        if not canonical:
+            return None
+        return f"{self.version}:" + '|'.join(canonical)
+
+    def get(self, symptoms):
+        key = self.key(symptoms)
+        return None if key is None else self.store.get(key)
+
+    def put(self, symptoms, classification):
+        key = self.key(symptoms)
+        if key is not None and classification is not None:
+            self.store.set(key, classification)
+
+    def get_or_compute(self, symptoms, compute):
+        """命中直接返回；未命中调用 compute(symptoms) 并缓存其结果，返回 (结果, 是否命中)"""
+        cached = self.get(symptoms)
+        if cached is not None:
+            return cached, True
+        classification = compute(symptoms)
+        self.put(symptoms, classification)
+        return classification, False
+
+    def invalidate(self):
+        self.store.clear()
+
+    def stats(self):
+        stats = self.store.stats()
+        stats['version'] = self.version
+        return stats
+
+
+def init_classify_memo(app):
+    if not app.config['CLASSIFY_MEMO_ENABLED']:
+        app.extensions[EXTENSION_KEY] = None
+        return
+    app.extensions[EXTENSION_KEY] = ClassifyMemo(
+        version=app.config['PARTNER_MODEL_VERSION'],
+        ttl=app.config['CLASSIFY_MEMO_TTL'],
+        max_entries=app.config['CLASSIFY_MEMO_MAX_ENTRIES'],
+    )
+
+
+def get_classify_memo():
+    """未启用时返回 None"""
+    return current_app.extensions.get(EXTENSION_KEY)
@@ -0,0 +1,223 @@
+# 症状分类流程：记忆缓存 -> 合作方模型 -> 内存索引解析科室 -> 写入会话存储
+# /classify/（WSGI 与 ASGI 两种入口）与 /classify/batch 共用
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+from flask import current_app
+
+from classify_memo import get_classify_memo
+from disease_index import recommend_departments
+from hedging import LatencyBudgetExceeded, get_hedger
+from normalize import canonical_symptoms
+from partner_errors import PartnerAPIError
+from session_backend import get_session_backend
+from singleflight import get_singleflight
+
+# 合作方失败且没有临时分类时返回给客户端的固定信息，具体原因只写日志
+PARTNER_UNAVAILABLE = '分类服务暂不可用，请稍后重试'
+
+
+def parse_symptoms(data):
+    """校验 /classify/ 请求体，返回 (症状列表, 错误信息)"""
+    symptoms = data.get('symptoms') if isinstance(data, dict) else None
+    if not isinstance(symptoms, list) or not symptoms:
+        return None, '症状列表不能为空'
+    if not all(isinstance(s, str) and s.strip() for s in symptoms):
+        return None, '症状必须为非空字符串'
+    return symptoms, None
+
+
+def build_result(symptoms, classification):
+    """缓存到会话存储中的结果，结构与 GET /classify/result/<result_id> 一致"""
+    ranking = recommend_departments(classification['disease'])
+    return {
+        'classification': classification,
+        'recommended_department': ranking[0] if ranking else None,
+        'recommended_departments': list(ranking),
+        'symptoms': list(symptoms),
+        'cached_at': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+    }
+
+
+def to_response(result_id, result):
+    return {
+        'success': True,
+        'result_id': result_id,
+        'classification': result['classification'],
+        'recommended_department': result['recommended_department'],
+        # 旧的缓存结果没有该字段
+        'recommended_departments': result.get('recommended_departments', []),
+    }
+
+
+def partner_error_response(error):
+    """合作方失败且没有临时分类时的 (响应体, 状态码)：超出延迟预算为 504，其余为 502"""
+    current_app.logger.error('Partner classify failed: %s', error)
+    status = 504 if isinstance(error, LatencyBudgetExceeded) else 502
+    return {'success': False, 'error': PARTNER_UNAVAILABLE}, status
+
+
+def classify_symptoms(symptoms):
+    """单条分类，合作方失败且没有临时分类时抛出 PartnerAPIError
+
+    记忆缓存未命中时，相同症状组合的并发请求合并为一次合作方调用，
+    各请求仍分别生成自己的 result_id。
+    """
+    memo = get_classify_memo()
+    classification = memo.get(symptoms) if memo is not None else None
+    if classification is None:
+        classification, _ = get_singleflight().do(
+            canonical_symptoms(symptoms), _call_partner, symptoms, memo
+        )
+    return store_result(symptoms, classification)
+
+
+async def classify_symptoms_async(symptoms, partner_classify):
+    """classify_symptoms 的 asyncio 版本（asgi.py）；partner_classify 为 AsyncPartnerClient.classify
+
+    与同步版本共用记忆缓存、single-flight、延迟预算和临时分类，科室解析和会话写入等阻塞操作在线程中执行。
+    """
+    memo = get_classify_memo()
+    classification = memo.get(symptoms) if memo is not None else None
+    if classification is None:
+        classification, _ = await get_singleflight().do_async(
+            canonical_symptoms(symptoms), _call_partner_async, partner_classify, symptoms, memo
+        )
+    # 科室解析在索引未命中时会查库（DISEASE_INDEX_DB_FALLBACK）；to_thread 复制上下文变量，线程内仍处于当前请求上下文
+    return await asyncio.to_thread(store_result, symptoms, classification)
+
+
+def store_result(symptoms, classification):
+    """生成 result_id，解析科室并写入会话存储，返回 /classify/ 响应"""
+    result_id = str(uuid.uuid4())
+    result = build_result(symptoms, classification)
+    get_session_backend().set(result_id, result)
+    return to_response(result_id, result)
+
+
+def _call_partner(symptoms, memo):
+    """在延迟预算内调用合作方（必要时对冲）；合作方失败、熔断或超出预算时返回本地临时分类"""
+    # 合作方客户端依赖 requests，第一次调用时才导入
+    from partner_client import get_partner_client
+    try:
+        classification = get_hedger().call(get_partner_client().classify, symptoms)
+    except PartnerAPIError as e:
+        return _provisional_or_raise(symptoms, e)
+    if memo is not None:
+        memo.put(symptoms, classification)
+    return classification
+
+
+async def _call_partner_async(partner_classify, symptoms, memo):
+    """_call_partner 的 asyncio 版本"""
+    try:
+        classification = await get_hedger().call_async(partner_classify, symptoms)
+    except PartnerAPIError as e:
+        # 第一次需要时会构建本地打分器（NumPy），不能阻塞事件循环
+        return await asyncio.to_thread(_provisional_or_raise, symptoms, e)
+    if memo is not None:
+        memo.put(symptoms, classification)
+    return classification
+
+
+def _provisional_or_raise(symptoms, error):
+    """合作方调用失败后的本地临时分类，给不出时重新抛出 error；临时分类不写入记忆缓存，下次请求仍会询问合作方"""
+    provisional = provisional_classification(symptoms)
+    if provisional is None:
+        raise error
+    current_app.logger.warning('Partner classify failed, using provisional result: %s', error)
+    return provisional
+
+
+def provisional_classification(symptoms):
+    """合作方失败或超出延迟预算时的本地分类结果，带 provisional 标记；无法给出时返回 None"""
+    classifier = current_app.extensions.get('provisional_classifier')
+    if classifier is None:
+        # 默认使用本地打分器，它依赖 NumPy，到这里才导入
+        from local_scorer import classify_provisional as classifier
+    classification = classifier(symptoms)
+    if classification is None:
+        return None
+    return dict(classification, provisional=True)
+
+
+def classify_batch(symptom_lists):
+    """批量分类
+
+    相同的规范化症状集合只处理一次；记忆缓存命中的在本地完成，其他请求正在查询的组合等待其结果，
+    其余一次性交给合作方客户端（批量接口或有限并发）。每条输入各自得到 result_id，所有结果一次写入会话存储。
+    返回 (与输入顺序一致的逐条结果, 统计信息)。
+    """
+    memo = get_classify_memo()
+    keys = [canonical_symptoms(symptoms) for symptoms in symptom_lists]
+
+    classifications = {}
+    pending = {}
+    for key, symptoms in zip(keys, symptom_lists):
+        if not key or key in classifications or key in pending:
+            continue
+        cached = memo.get(symptoms) if memo is not None else None
+        if cached is not None:
+            classifications[key] = cached
+        else:
+            pending[key] = symptoms
+    memo_hits = len(classifications)
+
+    coalesced = 0
+    if pending:
+        # 与 /classify/ 共用 single-flight：其他请求正在查询的组合直接等待其结果
+        outcomes, coalesced = get_singleflight().do_many(pending, lambda lists: _classify_many(lists, memo))
+        classifications.update(outcomes)
+
+    items = []
+    to_store = []
+    for key, symptoms in zip(keys, symptom_lists):
+        if not key:
+            items.append({'success': False, 'error': '症状列表不能为空'})
+            continue
+        outcome = classifications[key]
+        if isinstance(outcome, Exception):
+            items.append({'success': False, 'error': PARTNER_UNAVAILABLE})
+            continue
+        result_id = str(uuid.uuid4())
+        result = build_result(symptoms, outcome)
+        to_store.append((result_id, result))
+        items.append(to_response(result_id, result))
+
+    if to_store:
+        get_session_backend().set_many(to_store)
+
+    stats = {
+        'total': len(symptom_lists),
+        'unique': len({key for key in keys if key}),
+        'memo_hits': memo_hits,
+        'partner_requests': len(pending) - coalesced,
+        'coalesced': coalesced,
+    }
+    return items, stats
+
+
+def _classify_many(symptom_lists, memo):
+    """在与单条分类相同的延迟预算内一次交给合作方客户端批量分类（批量请求不对冲）
+
+    成功的结果写入记忆缓存；失败、熔断或超出预算的条目与 _call_partner 一样改用本地临时分类，
+    仍给不出结果的保留异常对象。
+    """
+    from partner_client import get_partner_client
+    outcomes = get_partner_client().classify_many(symptom_lists, deadline=get_hedger().deadline())
+    fallback = 0
+    for i, (symptoms, outcome) in enumerate(zip(symptom_lists, outcomes)):
+        if not isinstance(outcome, Exception):
+            if memo is not None:
+                memo.put(symptoms, outcome)
+            continue
+        provisional = provisional_classification(symptoms)
+        if provisional is None:
+            current_app.logger.error('Partner classify failed: %s', outcome)
+        else:
+            outcomes[i] = provisional
+            fallback += 1
+    if fallback:
+        current_app.logger.warning('Partner batch classify failed for %d items, using provisional results', fallback)
+    return outcomes
@@ -0,0 +1,22 @@
+# flask 命令行：一次性的数据库操作，不放在 create_app() 中，避免每个 worker 启动时执行
+# 用法: flask --app app init-db
+#       flask --app app migrate-schema
+import click
+
+from exts import db
+
+
+def register_commands(app):
+    @app.cli.command('init-db')
+    def init_db():
+        """按 model.py 创建缺失的数据表"""
+        db.create_all()
+        click.echo('数据表已创建')
+
+    @app.cli.command('migrate-schema')
+    def migrate_schema_command():
+        """已有数据库升级：name_key 列与查找索引"""
+        from migrate_schema import migrate
+
+        migrate(db.engine, log=click.echo)
+        click.echo('数据库结构升级完成')
@@ -0,0 +1,124 @@
+# 数据库连接池：带统计的 QueuePool
+# 记录每次取连接的等待时间（直方图）和取连接超时次数，配合 pool.status 中的占用/溢出数在 /metrics 展示
+import bisect
+import threading
+import time
+
+from sqlalchemy import create_engine, exc
+from sqlalchemy.pool import QueuePool
+
+# 等待时间直方图的桶上界（毫秒），最后一个桶为 +Inf
+WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000)
+
+
+class PoolMetrics:
+    def __init__(self, buckets=WAIT_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def observe(self, seconds, timed_out=False):
+        ms = seconds * 1000
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, ms)] += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+
+    def snapshot(self):
+        with self._lock:
+            observed = self.checkouts + self.timeouts
+            labels = [f'le_{b}ms' for b in self.buckets] + ['inf']
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'avg_wait_ms': round(self.total_wait * 1000 / observed, 3) if observed else 0.0,
+                'max_wait_ms': round(self.max_wait * 1000, 3),
+                'wait_histogram': dict(zip(labels, self.counts)),
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """统计取连接等待时间的 QueuePool，用法同 QueuePool（poolclass=InstrumentedQueuePool）"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+        self._depth = threading.local()
+
+    def _do_get(self):
+        # QueuePool._do_get 在竞争时会递归调用自身，只在最外层计时
+        if getattr(self._depth, 'value', 0):
+            return super()._do_get()
+        self._depth.value = 1
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self._depth.value = 0
+            self.metrics.observe(time.perf_counter() - start, timed_out)
+
+    def recreate(self):
+        # 连接失效后引擎会重建连接池，统计延续下去
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+# 只有 QueuePool 接受的引擎参数，其他连接池收到会使 create_engine 抛出 TypeError
+QUEUE_POOL_OPTIONS = ('pool_size', 'max_overflow', 'pool_timeout', 'pool_use_lifo')
+
+
+def use_instrumented_pool(options, uri):
+    """在引擎参数中指定统计连接池；sqlite 内存库保持 Flask-SQLAlchemy 默认的 StaticPool
+    不使用 QueuePool 时去掉 QUEUE_POOL_OPTIONS 中的参数
+    """
+    options = dict(options)
+    if not (uri.startswith('sqlite') and (uri.rstrip('/').endswith(':memory:') or uri in ('sqlite://', 'sqlite:///'))):
+        options.setdefault('poolclass', InstrumentedQueuePool)
+    poolclass = options.get('poolclass')
+    if poolclass is None or not issubclass(poolclass, QueuePool):
+        for key in QUEUE_POOL_OPTIONS:
+            options.pop(key, None)
+    return options
+
+
+def init_db_pool(app):
+    """在 db.init_app(app) 之前调用"""
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = use_instrumented_pool(
+        app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}), app.config['SQLALCHEMY_DATABASE_URI']
+    )
+
+
+def create_pooled_engine(uri, options):
+    """脚本（add.py 等）使用的引擎，连接池参数与应用一致"""
+    return create_engine(uri, **use_instrumented_pool(options, uri))
+
+
+def pool_stats(engine):
+    pool = engine.pool
+    stats = {'pool_class': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': max(0, pool.overflow()),
+            'max_overflow': pool._max_overflow,
+            'timeout': pool.timeout(),
+        })
+    metrics = getattr(pool, 'metrics', None)
+    if metrics is not None:
+        stats.update(metrics.snapshot())
+    return stats
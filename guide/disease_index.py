@@ -0,0 +1,342 @@
+# 疾病 -> 科室的进程内解析索引
+# create_app() 启动时从数据库构建一次，之后分类/分诊接口的科室解析不再访问数据库；
+# 每个疾病名/同义词的 top-k 科室推荐在构建时排好序并转换成接口结构，请求时直接取用。
+# 通过 db.session 修改科室、映射或同义词并提交后自动重建
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, literal, select, union_all
+from sqlalchemy.exc import SQLAlchemyError
+
+from exts import db
+from model import Department, DiseaseMapping, DiseaseSynonym
+from fuzzy_index import FuzzyIndex
+from normalize import normalize_name
+from synonym_matcher import SynonymMatcher
+
+EXTENSION_KEY = 'disease_index'
+DEFAULT_TOP_K = 3
+CATALOG_MODELS = (Department, DiseaseMapping, DiseaseSynonym)
+CATALOG_TABLES = frozenset(model.__table__ for model in CATALOG_MODELS)
+
+DepartmentCandidate = namedtuple(
+    'DepartmentCandidate',
+    ['department_id', 'department_name', 'disease_name', 'confidence']
+)
+
+
+def candidate_to_dict(candidate):
+    """转换为接口返回的 recommended_department 结构"""
+    return {
+        'department_id': candidate.department_id,
+        'department_name': candidate.department_name,
+        'disease_name': candidate.disease_name,
+        'confidence': candidate.confidence,
+    }
+
+
+class DiseaseIndex:
+    """只读索引：标准疾病名及同义词 -> 按可信度降序排列的科室候选，以及其前 top_k 个的接口结构"""
+
+    __slots__ = ('_entries', '_rankings', 'top_k', 'matcher', '_fuzzy', '_fuzzy_lock', 'mapping_count',
+                 'synonym_count', 'built_at')
+
+    def __init__(self, entries, matcher=None, mapping_count=0, synonym_count=0, top_k=DEFAULT_TOP_K):
+        self._entries = MappingProxyType(entries)
+        self.top_k = top_k
+        self._rankings = MappingProxyType({
+            key: tuple(candidate_to_dict(c) for c in candidates[:top_k])
+            for key, candidates in entries.items()
+        })
+        self.matcher = matcher
+        self._fuzzy = None
+        self._fuzzy_lock = threading.Lock()
+        self.mapping_count = mapping_count
+        self.synonym_count = synonym_count
+        self.built_at = time.time()
+
+    @property
+    def fuzzy(self):
+        """近似匹配索引，只在精确匹配和文本包含匹配都未命中时才需要，首次使用时构建"""
+        if self._fuzzy is None:
+            with self._fuzzy_lock:
+                if self._fuzzy is None:
+                    self._fuzzy = FuzzyIndex(
+                        (key, candidates[0].disease_name, candidates[0].confidence)
+                        for key, candidates in self._entries.items()
+                    )
+        return self._fuzzy
+
+    def resolve(self, name):
+        """返回候选元组，未命中时为空元组"""
+        return self._entries.get(normalize_name(name), ())
+
+    def best(self, name):
+        candidates = self.resolve(name)
+        return candidates[0] if candidates else None
+
+    def ranking(self, name):
+        """预先生成的 top-k 科室推荐（dict 元组），未命中时为空元组"""
+        return self._rankings.get(normalize_name(name), ())
+
+    def match_key(self, name):
+        """依次尝试精确匹配、文本包含匹配、近似匹配，返回最先命中的索引键，都未命中时返回 None"""
+        key = normalize_name(name)
+        if key in self._entries:
+            return key
+        for match, candidates in self.find_mentions(name):
+            if candidates:
+                return match.term
+        for hit, candidates in self.nearest(name, k=1):
+            if candidates:
+                return hit.term
+        return None
+
+    def lookup(self, name):
+        """按 match_key 的顺序查找，返回候选元组"""
+        return self._entries.get(self.match_key(name), ())
+
+    def lookup_ranking(self, name):
+        """按 match_key 的顺序查找，返回 top-k 科室推荐"""
+        return self._rankings.get(self.match_key(name), ())
+
+    def find_mentions(self, text):
+        """在自由文本中查找疾病提及，返回 [(Match, 候选元组)]"""
+        if self.matcher is None or not text:
+            return []
+        return [(m, self._entries.get(m.term, ())) for m in self.matcher.find_best(text)]
+
+    def nearest(self, text, k=3, min_similarity=0.6):
+        """近似查找，返回 [(FuzzyHit, 候选元组)]"""
+        return [
+            (hit, self._entries.get(hit.term, ()))
+            for hit in self.fuzzy.search(text, k=k, min_similarity=min_similarity)
+        ]
+
+    def names(self):
+        return self._entries.keys()
+
+    def __contains__(self, name):
+        return normalize_name(name) in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _rank(candidates):
+    """同一科室只保留最高可信度，再按可信度降序排列"""
+    best = {}
+    for c in candidates:
+        current = best.get(c.department_id)
+        if current is None or c.confidence > current.confidence:
+            best[c.department_id] = c
+    return tuple(sorted(best.values(), key=lambda c: (-c.confidence, c.department_id)))
+
+
+def build_disease_index(session, top_k=DEFAULT_TOP_K):
+    """用两条查询读出映射和同义词，在内存中组装索引"""
+    mapping_rows = session.query(
+        DiseaseMapping.id,
+        DiseaseMapping.disease_name,
+        DiseaseMapping.confidence,
+        Department.id,
+        Department.name,
+    ).join(Department, DiseaseMapping.department_id == Department.id).all()
+    synonym_rows = session.query(
+        DiseaseSynonym.mapping_id,
+        DiseaseSynonym.synonym,
+        DiseaseSynonym.similarity_score,
+    ).all()
+
+    by_disease = {}       # 标准疾病名 -> [候选]
+    mapping_disease = {}  # 映射ID -> 标准疾病名
+    for mapping_id, disease_name, confidence, dept_id, dept_name in mapping_rows:
+        confidence = 1.0 if confidence is None else confidence
+        by_disease.setdefault(disease_name, []).append(
+            DepartmentCandidate(dept_id, dept_name, disease_name, confidence)
+        )
+        mapping_disease[mapping_id] = disease_name
+
+    raw = {}
+    patterns = []
+    for disease_name, candidates in by_disease.items():
+        raw.setdefault(normalize_name(disease_name), []).extend(candidates)
+        patterns.append((disease_name, disease_name, 1.0))
+
+    # 同义词指向某一条映射，但解析时应得到该标准疾病的全部科室
+    for mapping_id, synonym, score in synonym_rows:
+        disease_name = mapping_disease.get(mapping_id)
+        if disease_name is None:
+            continue
+        score = 1.0 if score is None else score
+        patterns.append((synonym, disease_name, score))
+        raw.setdefault(normalize_name(synonym), []).extend(
+            c._replace(confidence=round(c.confidence * score, 4))
+            for c in by_disease[disease_name]
+        )
+
+    entries = {key: _rank(candidates) for key, candidates in raw.items() if key}
+    return DiseaseIndex(
+        entries, SynonymMatcher(patterns), len(mapping_rows), len(synonym_rows), top_k
+    )
+
+
+def query_department_candidates(session, name):
+    """索引未命中时的数据库兜底：标准疾病名或同义词，一条查询解析到该疾病的全部科室候选"""
+    key = normalize_name(name)
+    if not key:
+        return ()
+    direct = select(
+        DiseaseMapping.name_key.label('name_key'), literal(1.0).label('score')
+    ).where(DiseaseMapping.name_key == key)
+    via_synonym = select(
+        DiseaseMapping.name_key, DiseaseSynonym.similarity_score
+    ).join(DiseaseSynonym, DiseaseSynonym.mapping_id == DiseaseMapping.id).where(
+        DiseaseSynonym.name_key == key
+    )
+    matched = union_all(direct, via_synonym).subquery()
+    rows = session.execute(
+        select(
+            DiseaseMapping.disease_name, DiseaseMapping.confidence,
+            Department.id, Department.name, matched.c.score,
+        )
+        .join(Department, DiseaseMapping.department_id == Department.id)
+        .join(matched, matched.c.name_key == DiseaseMapping.name_key)
+    ).all()
+    return _rank(
+        DepartmentCandidate(
+            dept_id, dept_name, disease_name,
+            round((1.0 if confidence is None else confidence) * (1.0 if score is None else score), 4),
+        )
+        for disease_name, confidence, dept_id, dept_name, score in rows
+    )
+
+
+_reload_lock = threading.Lock()
+
+
+def _mark_catalog_flush(session, flush_context):
+    # after_flush 时 new/dirty/deleted 仍是本次 flush 之前的内容
+    if any(isinstance(obj, CATALOG_MODELS) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info['catalog_changed'] = True
+
+
+def _mark_catalog_execute(orm_execute_state):
+    """session.execute(insert/update/delete(...)) 形式的批量写入不经过 flush"""
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        if getattr(orm_execute_state.statement, 'table', None) in CATALOG_TABLES:
+            orm_execute_state.session.info['catalog_changed'] = True
+
+
+def _reload_after_commit(session):
+    if not session.info.pop('catalog_changed', False) or not has_app_context():
+        return
+    app = current_app._get_current_object()
+    try:
+        reload_disease_index(app)
+    except SQLAlchemyError as e:
+        # 丢弃旧索引，下次使用时重新构建
+        app.extensions.pop(EXTENSION_KEY, None)
+        app.logger.warning('Disease index reload after commit failed: %s', e)
+
+
+def _discard_catalog_flag(session):
+    session.info.pop('catalog_changed', None)
+
+
+CATALOG_LISTENERS = (
+    ('after_flush', _mark_catalog_flush),
+    ('do_orm_execute', _mark_catalog_execute),
+    ('after_commit', _reload_after_commit),
+    ('after_rollback', _discard_catalog_flag),
+)
+
+
+def watch_catalog_changes():
+    """db.session 提交了科室/映射/同义词的变更后重建索引
+
+    add.py、catalog_import.py 等脚本使用独立的会话，写入后需重启服务或调用 reload_disease_index()；
+    在此之前新增的疾病由 DISEASE_INDEX_DB_FALLBACK 兜底。
+    """
+    for name, listener in CATALOG_LISTENERS:
+        if not event.contains(db.session, name, listener):
+            event.listen(db.session, name, listener)
+
+
+def init_disease_index(app):
+    """在 create_app() 中调用，启动时构建一次索引
+
+    数据库不可用或尚未建表（例如执行 flask init-db 时）只记录警告，第一次使用时再构建。
+    """
+    watch_catalog_changes()
+    try:
+        reload_disease_index(app)
+    except SQLAlchemyError as e:
+        app.logger.warning('Disease index not built at startup: %s', e)
+
+
+def reload_disease_index(app=None):
+    """重新从数据库构建索引并原子替换，供数据变更后显式调用"""
+    if app is None:
+        app = current_app._get_current_object()
+    with _reload_lock:
+        with app.app_context():
+            index = build_disease_index(db.session, app.config['RECOMMEND_TOP_K'])
+        app.extensions[EXTENSION_KEY] = index
+        # 本地打分器缓存了疾病对应的科室，已构建的随索引一起重建
+        if app.extensions.get('local_scorer') is not None:
+            from local_scorer import init_local_scorer
+            init_local_scorer(app)
+    app.logger.info(
+        'Disease index loaded: %d keys, %d mappings, %d synonyms',
+        len(index), index.mapping_count, index.synonym_count
+    )
+    return index
+
+
+def get_disease_index():
+    index = current_app.extensions.get(EXTENSION_KEY)
+    if index is None:
+        index = reload_disease_index()
+    return index
+
+
+def resolve_department(disease_name):
+    """分类/分诊接口使用：返回最佳科室的 dict，找不到时返回 None"""
+    candidate = get_disease_index().best(disease_name)
+    return candidate_to_dict(candidate) if candidate else None
+
+
+def recommend_departments(disease_name):
+    """按可信度降序的 top-k 科室推荐（dict 元组）
+
+    精确匹配失败时继续尝试数据库（索引构建后新增的数据）、包含匹配和近似匹配。
+    返回的 dict 由索引内所有请求共享，调用方不要修改。
+    """
+    index = get_disease_index()
+    ranking = index.ranking(disease_name)
+    if not ranking and current_app.config['DISEASE_INDEX_DB_FALLBACK']:
+        candidates = query_department_candidates(db.session, disease_name)
+        ranking = tuple(candidate_to_dict(c) for c in candidates[:index.top_k])
+    if not ranking:
+        ranking = index.lookup_ranking(disease_name)
+    return ranking
+
+
+def lookup_department(disease_name):
+    """同 resolve_department，但按 recommend_departments 的顺序兜底"""
+    ranking = recommend_departments(disease_name)
+    return ranking[0] if ranking else None
+
+
+def find_disease_mentions(text):
+    """精确解析失败时使用：从合作方输出或症状描述中找出包含的疾病名"""
+    return get_disease_index().find_mentions(text)
+
+
+def find_nearest_diseases(text, k=3, min_similarity=0.6):
+    """精确与包含匹配都失败时使用：返回与标签最接近的 top-k 疾病"""
+    return get_disease_index().nearest(text, k=k, min_similarity=min_similarity)
@@ -0,0 +1,167 @@
+# 近似疾病名查找：字符二元组倒排索引粗筛 + 编辑距离精排
+# 用于合作方标签与目录差一两个字或字序颠倒的情况，可在每次分类请求中在线调用。
+# 倒排表是按词条长度排序的 NumPy 数组：查询时只取长度可能达到相似度阈值的区间，
+# 共享 gram 计数用 bincount 一次完成，不再逐个 ID 在 Python 中累加
+from collections import Counter, namedtuple
+
+from normalize import normalize_name
+
+FuzzyHit = namedtuple('FuzzyHit', ['term', 'disease_name', 'similarity', 'score'])
+
+# 字序颠倒（“白内障老年性”）按字符集合相似度计分，但略低于同等程度的逐字匹配
+REORDER_PENALTY = 0.9
+
+
+def _grams(key):
+    """带首尾边界的字符二元组，单字名也能产生两个 gram"""
+    padded = '\x02' + key + '\x03'
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+def edit_distance(a, b, limit=None):
+    """限制型 Damerau-Levenshtein（OSA）距离，相邻字互换计 1 次编辑
+
+    给定 limit 时，一旦确定距离超过 limit 即提前返回 limit + 1。
+    """
+    if a == b:
+        return 0
+    # 去掉公共前后缀（不改变 OSA 距离），近似名通常只剩很短的差异段
+    start, end_a, end_b = 0, len(a), len(b)
+    while start < end_a and start < end_b and a[start] == b[start]:
+        start += 1
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+    if not a or not b:
+        return len(a) or len(b)
+    if limit is not None and abs(len(a) - len(b)) > limit:
+        return limit + 1
+    n = len(b)
+    prev2 = None
+    prev = list(range(n + 1))
+    pa = None
+    for i, ca in enumerate(a, 1):
+        cur = [i] * (n + 1)
+        left = i
+        pb = None
+        for j, cb in enumerate(b, 1):
+            if ca == cb:
+                v = prev[j - 1]
+            else:
+                v = prev[j - 1] + 1
+                if prev[j] < v - 1:
+                    v = prev[j] + 1
+                if left < v - 1:
+                    v = left + 1
+                if ca == pb and pa == cb and prev2[j - 2] + 1 < v:
+                    v = prev2[j - 2] + 1
+            cur[j] = left = v
+            pb = cb
+        if limit is not None and min(cur) > limit:
+            return limit + 1
+        prev2, prev, pa = prev, cur, ca
+    return prev[-1]
+
+
+def _bag_similarity(a_bag, a_len, b_bag, b_len):
+    """字符多重集的 Dice 系数，与字序无关"""
+    common = sum((a_bag & b_bag).values())
+    return 2.0 * common / (a_len + b_len)
+
+
+def _length_range(length, min_similarity):
+    """能达到 min_similarity 的词条长度区间
+
+    逐字匹配的相似度不超过 短/长，字序颠倒的得分不超过 REORDER_PENALTY × 2短/(短+长)，取两者的并集。
+    """
+    if min_similarity <= 0:
+        return 0, 1 << 30
+    lo = min(length * min_similarity, length * min_similarity / (2 * REORDER_PENALTY - min_similarity))
+    hi = max(length / min_similarity, length * (2 * REORDER_PENALTY / min_similarity - 1))
+    return int(lo) if lo == int(lo) else int(lo) + 1, int(hi)
+
+
+class FuzzyIndex:
+    """只读近似匹配索引，构建后线程安全"""
+
+    __slots__ = ('_np', '_terms', '_bags', '_first_id', '_postings', '_gram_counts', 'rerank_limit')
+
+    def __init__(self, entries, rerank_limit=8):
+        """entries: 可迭代的 (词条, 标准疾病名, 权重)，权重取映射可信度与同义词相似度的乘积"""
+        import numpy as np
+
+        self._np = np
+        terms = {}
+        for term, disease_name, weight in entries:
+            key = normalize_name(term)
+            if key and key not in terms:
+                terms[key] = (key, disease_name, 1.0 if weight is None else weight)
+        # 词条按长度编号，倒排表（升序 ID）同时也按长度有序，长度区间对应一段连续的 ID
+        self._terms = sorted(terms.values(), key=lambda t: len(t[0]))
+        self._bags = [Counter(t[0]) for t in self._terms]
+        self._first_id = [0]
+        postings = {}
+        gram_counts = []
+        for term_id, (key, _, _) in enumerate(self._terms):
+            while len(self._first_id) <= len(key):
+                self._first_id.append(term_id)
+            grams = _grams(key)
+            gram_counts.append(len(grams))
+            for g in grams:
+                postings.setdefault(g, []).append(term_id)
+        self._first_id.append(len(self._terms))
+        self._postings = {g: np.array(ids, dtype=np.int32) for g, ids in postings.items()}
+        self._gram_counts = np.array(gram_counts, dtype=np.float64)
+        self.rerank_limit = rerank_limit
+
+    def __len__(self):
+        return len(self._terms)
+
+    def search(self, text, k=3, min_similarity=0.6):
+        """返回 top-k 近似命中，score = 字符相似度 × 目录权重"""
+        key = normalize_name(text)
+        if not key:
+            return []
+        np = self._np
+        grams = _grams(key)
+        lo, hi = _length_range(len(key), min_similarity)
+        first_id = self._first_id
+        id_lo = first_id[min(lo, len(first_id) - 1)]
+        id_hi = first_id[min(hi + 1, len(first_id) - 1)]
+        parts = []
+        for g in grams:
+            ids = self._postings.get(g)
+            if ids is not None:
+                parts.append(ids[ids.searchsorted(id_lo):ids.searchsorted(id_hi)])
+        if not parts:
+            return []
+        ids = np.concatenate(parts)
+        if not len(ids):
+            return []
+
+        # Dice 系数粗筛，只对少量候选计算编辑距离
+        shared = np.bincount(ids - id_lo)
+        candidates = np.flatnonzero(shared)
+        dice = 2.0 * shared[candidates] / (len(grams) + self._gram_counts[candidates + id_lo])
+        limit = self.rerank_limit
+        if len(candidates) > limit:
+            top = np.argpartition(-dice, limit - 1)[:limit]
+            candidates, dice = candidates[top], dice[top]
+        rough = (candidates[np.argsort(-dice, kind='stable')] + id_lo).tolist()
+
+        bag = Counter(key)
+        hits = []
+        for term_id in rough:
+            term, disease_name, weight = self._terms[term_id]
+            longest = max(len(key), len(term))
+            limit = int((1.0 - min_similarity) * longest)
+            similarity = 1.0 - edit_distance(key, term, limit) / longest
+            if similarity < min_similarity:
+                reordered = REORDER_PENALTY * _bag_similarity(bag, len(key), self._bags[term_id], len(term))
+                if reordered < min_similarity:
+                    continue
+                similarity = reordered
+            hits.append(FuzzyHit(term, disease_name, round(similarity, 4), round(similarity * weight, 4)))
+        hits.sort(key=lambda h: (-h.score, -h.similarity, h.term))
+        return hits[:k]
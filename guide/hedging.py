@@ -0,0 +1,225 @@
+# 合作方调用的延迟预算与对冲请求
+# 超过近期延迟分位数仍未返回时补发一次相同请求，先返回者胜出；
+# 总预算耗尽时抛出 LatencyBudgetExceeded，由调用方改用本地临时分类。
+# 预算截止时间同时作为合作方请求（含重试）的截止时间传给客户端，放弃等待的请求不会在后台继续占用线程
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from flask import current_app
+
+from partner_errors import PartnerAPIError
+
+EXTENSION_KEY = 'partner_hedger'
+
+
+class LatencyBudgetExceeded(PartnerAPIError):
+    """延迟预算内合作方没有返回（或对冲线程池已满未能发出请求）"""
+
+
+class LatencyTracker:
+    """最近 window 次成功调用的耗时，用于计算对冲阈值"""
+
+    def __init__(self, window=512, percentile=95, default=1.0, min_samples=20, floor=0.05):
+        self.percentile = percentile
+        self.default = default
+        self.min_samples = min_samples
+        self.floor = floor
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def threshold(self):
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return self.default
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return max(self.floor, ordered[index])
+
+
+class HedgedCaller:
+    """在延迟预算内调用合作方，必要时发出一次对冲请求
+
+    budget 为 0 时不启用，直接在当前线程调用。fn 须接受 deadline 关键字参数（time.monotonic 时间）。
+    线程池中执行和排队的请求合计不超过 max_workers + max_queue，已满时不再排队：
+    对冲请求直接放弃，首个请求抛出 LatencyBudgetExceeded。
+    """
+
+    def __init__(self, budget, tracker, max_workers=16, max_queue=None, hedge=True):
+        self.budget = budget
+        self.tracker = tracker
+        self.hedge = hedge
+        self.max_workers = max_workers
+        self.max_queue = max_workers if max_queue is None else max_queue
+        self._slots = threading.BoundedSemaphore(max_workers + self.max_queue)
+        self._executor = None
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.budget_exceeded = 0
+        self.rejected = 0
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _timed(self, fn, args, deadline=None):
+        start = time.monotonic()
+        result = fn(*args) if deadline is None else fn(*args, deadline=deadline)
+        self.tracker.record(time.monotonic() - start)
+        return result
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='partner-hedge')
+        return self._executor
+
+    def _submit(self, fn, args, deadline):
+        """提交到线程池；执行和排队的请求已达上限时返回 None"""
+        if not self._slots.acquire(blocking=False):
+            self._count('rejected')
+            return None
+        try:
+            future = self._get_executor().submit(self._timed, fn, args, deadline)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def deadline(self):
+        """按预算计算的截止时间（time.monotonic），未启用预算时为 None；供不经过 call 的批量调用使用"""
+        return time.monotonic() + self.budget if self.budget else None
+
+    def call(self, fn, *args):
+        """返回 fn(*args, deadline=...) 的结果；预算耗尽时抛出 LatencyBudgetExceeded"""
+        self._count('calls')
+        if not self.budget:
+            return self._timed(fn, args)
+
+        start = time.monotonic()
+        deadline = start + self.budget
+        hedge_at = start + self.tracker.threshold()
+        primary = self._submit(fn, args, deadline)
+        if primary is None:
+            raise LatencyBudgetExceeded('对冲线程池已满，未发出合作方请求')
+        pending = {primary}
+        hedge = None
+        can_hedge = self.hedge
+        last_error = None
+
+        try:
+            while pending:
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                wake = hedge_at if can_hedge and hedge_at < deadline else deadline
+                done, pending = wait(pending, timeout=max(0.0, wake - now), return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        if future is hedge:
+                            self._count('hedge_wins')
+                        return future.result()
+                    last_error = future.exception()
+                if pending and can_hedge and time.monotonic() >= hedge_at:
+                    can_hedge = False
+                    hedge = self._submit(fn, args, deadline)
+                    if hedge is not None:
+                        pending.add(hedge)
+                        self._count('hedged')
+        finally:
+            # 还在排队的请求不再发出；已在执行的会在 deadline 前后因超时结束
+            for future in pending:
+                future.cancel()
+
+        if not pending:
+            raise last_error
+        self._count('budget_exceeded')
+        raise LatencyBudgetExceeded(f'合作方在 {self.budget:g} 秒预算内未返回')
+
+    async def call_async(self, coro_fn, *args):
+        """call 的 asyncio 版本，供 ASGI 模式使用；预算耗尽或有结果后取消其余请求"""
+        self._count('calls')
+        if not self.budget:
+            return await self._timed_async(coro_fn, args)
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        deadline = start + self.budget
+        # 客户端的截止时间按 time.monotonic 计算
+        client_deadline = time.monotonic() + self.budget
+        hedge_at = start + self.tracker.threshold()
+        primary = asyncio.ensure_future(self._timed_async(coro_fn, args, client_deadline))
+        pending = {primary}
+        hedge = None
+        last_error = None
+
+        try:
+            while pending:
+                now = loop.time()
+                if now >= deadline:
+                    break
+                wake = hedge_at if hedge is None and self.hedge and hedge_at < deadline else deadline
+                done, pending = await asyncio.wait(pending, timeout=max(0.0, wake - now),
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._count('hedge_wins')
+                        return task.result()
+                    last_error = task.exception()
+                if pending and hedge is None and self.hedge and loop.time() >= hedge_at:
+                    hedge = asyncio.ensure_future(self._timed_async(coro_fn, args, client_deadline))
+                    pending.add(hedge)
+                    self._count('hedged')
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if not pending:
+            raise last_error
+        self._count('budget_exceeded')
+        raise LatencyBudgetExceeded(f'合作方在 {self.budget:g} 秒预算内未返回')
+
+    async def _timed_async(self, coro_fn, args, deadline=None):
+        start = time.monotonic()
+        result = await (coro_fn(*args) if deadline is None else coro_fn(*args, deadline=deadline))
+        self.tracker.record(time.monotonic() - start)
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                'budget': self.budget,
+                'hedge_threshold': round(self.tracker.threshold(), 4),
+                'calls': self.calls,
+                'hedged': self.hedged,
+                'hedge_wins': self.hedge_wins,
+                'budget_exceeded': self.budget_exceeded,
+                'rejected': self.rejected,
+            }
+
+
+def init_hedger(app):
+    app.extensions[EXTENSION_KEY] = HedgedCaller(
+        budget=app.config['CLASSIFY_LATENCY_BUDGET'],
+        tracker=LatencyTracker(
+            percentile=app.config['PARTNER_HEDGE_PERCENTILE'],
+            default=app.config['PARTNER_HEDGE_DEFAULT_DELAY'],
+        ),
+        max_workers=2 * app.config['PARTNER_API_POOL_SIZE'],
+        hedge=app.config['PARTNER_HEDGE_ENABLED'],
+    )
+
+
+def get_hedger():
+    return current_app.extensions[EXTENSION_KEY]
@@ -0,0 +1,504 @@
+# 并发压测：沿用原 text.py 的场景（完整流程、1/2/4 级分诊、错误输入），替代逐条顺序执行的脚本
+# 闭环模式：固定并发数，每个 worker 连续执行场景；开环模式：按到达率发起场景，不受服务端快慢影响，
+# 场景耗时从计划发起时刻算起（含排队），避免协同遗漏。统计各接口 p50/p95/p99、吞吐量和错误率，
+# 输出键有序的 JSON 报告，便于与上一版本对比（--compare）
+# 会话过期用可控时钟检查（--check-expiry，仅限 --in-process 且 SESSION_BACKEND=local），不再 sleep 等待
+# 用法: python loadtest.py --smoke                                   # 每个场景顺序执行一次
+#       python loadtest.py --mode closed --concurrency 20 --duration 60 --output report.json
+#       python loadtest.py --mode open --rate 50 --duration 60 --compare last_release.json
+#       python loadtest.py --in-process --config development --check-expiry
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import requests
+
+MAX_FAILURE_SAMPLES = 20
+
+# 与 read.md 中的分诊请求字段一致
+GLAUCOMA_TRIAGE = {
+    'pain_level': '剧痛',
+    'vision_changes': ['视力急剧下降', '虹视现象'],
+    'duration_hours': 6,
+    'associated_symptoms': ['恶心呕吐', '剧烈头痛'],
+    'trauma_history': False,
+    'chemical_exposure': False,
+}
+RETINA_TRIAGE = {
+    'pain_level': '中度疼痛',
+    'vision_changes': ['视力突然完全丧失', '眼前有黑影'],
+    'duration_hours': 12,
+    'associated_symptoms': [],
+    'trauma_history': False,
+    'chemical_exposure': False,
+}
+ROUTINE_TRIAGE = {
+    'pain_level': '轻微不适',
+    'vision_changes': ['看东西模糊'],
+    'duration_hours': 48,
+    'associated_symptoms': ['眼红', '分泌物多'],
+    'trauma_history': False,
+    'chemical_exposure': False,
+}
+LEVEL1_TRIAGE = {
+    'pain_level': '剧痛',
+    'vision_changes': ['视力突然完全丧失'],
+    'duration_hours': 2,
+    'associated_symptoms': ['化学物质进入眼睛'],
+    'trauma_history': True,
+    'chemical_exposure': True,
+}
+LEVEL2_TRIAGE = {
+    'pain_level': '剧痛',
+    'vision_changes': ['视力急剧下降', '眼前有黑影'],
+    'duration_hours': 6,
+    'associated_symptoms': [],
+    'trauma_history': False,
+    'chemical_exposure': False,
+}
+# 常规问题（read.md 第 3 节的 4 级）：不含 1~3 级列出的任何表现
+LEVEL4_TRIAGE = {
+    'pain_level': '轻微不适',
+    'vision_changes': [],
+    'duration_hours': 72,
+    'associated_symptoms': ['异物感', '流泪'],
+    'trauma_history': False,
+    'chemical_exposure': False,
+}
+
+
+class ScenarioFailed(Exception):
+    """状态码不符合预期、请求异常或结果校验失败"""
+
+
+class HttpTransport:
+    """对运行中的服务发请求，每个线程一个 requests.Session（连接复用）"""
+
+    def __init__(self, base_url, timeout=10):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def request(self, method, path, body=None):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        response = session.request(method, self.base_url + path, json=body, timeout=self.timeout)
+        try:
+            data = response.json()
+        except ValueError:
+            data = None
+        return response.status_code, data
+
+    def describe(self):
+        return self.base_url
+
+
+class InProcessTransport:
+    """通过 Flask test_client 在进程内调用，不经过网络，可替换应用内部的时钟"""
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def request(self, method, path, body=None):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.open(path, method=method, json=body)
+        return response.status_code, response.get_json(silent=True)
+
+    def describe(self):
+        return 'in-process'
+
+
+class OffsetClock:
+    """单调时钟加可调偏移量；advance() 让会话立即“过期”，其余行为与真实时钟一致"""
+
+    def __init__(self, base=time.monotonic):
+        self._base = base
+        self._offset = 0.0
+
+    def __call__(self):
+        return self._base() + self._offset
+
+    def advance(self, seconds):
+        self._offset += seconds
+
+
+class Recorder:
+    """线程安全地汇总每个请求和每个场景的耗时与结果"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = defaultdict(list)   # 接口 -> [耗时秒]
+        self.request_errors = Counter()
+        self.statuses = defaultdict(Counter)
+        self.scenarios = defaultdict(list)
+        self.scenario_failures = Counter()
+        self.failure_samples = []
+
+    def record_request(self, endpoint, elapsed, status, ok):
+        with self._lock:
+            self.requests[endpoint].append(elapsed)
+            self.statuses[endpoint][str(status)] += 1
+            if not ok:
+                self.request_errors[endpoint] += 1
+
+    def record_scenario(self, name, elapsed, error=None):
+        with self._lock:
+            self.scenarios[name].append(elapsed)
+            if error is not None:
+                self.scenario_failures[name] += 1
+                if len(self.failure_samples) < MAX_FAILURE_SAMPLES:
+                    self.failure_samples.append(f'{name}: {error}')
+
+
+class Flow:
+    """一次场景执行：发请求、计时、按预期状态校验"""
+
+    def __init__(self, transport, recorder):
+        self.transport = transport
+        self.recorder = recorder
+
+    def call(self, method, path, endpoint, body=None, expect_ok=True):
+        """expect_ok=True 期望 2xx，False 期望 4xx；不符合时抛出 ScenarioFailed"""
+        start = time.perf_counter()
+        try:
+            status, data = self.transport.request(method, path, body)
+        except Exception as e:
+            self.recorder.record_request(endpoint, time.perf_counter() - start, 'exception', False)
+            raise ScenarioFailed(f'{endpoint} 请求异常: {e}')
+        ok = 200 <= status < 300 if expect_ok else 400 <= status < 500
+        self.recorder.record_request(endpoint, time.perf_counter() - start, status, ok)
+        if not ok:
+            raise ScenarioFailed(f'{endpoint} 返回 {status}: {str(data)[:200]}')
+        return data
+
+    def classify(self, symptoms):
+        data = self.call('POST', '/classify/', 'POST /classify/', {'symptoms': symptoms})
+        return data['result_id'], data['classification']['disease']
+
+    def result(self, result_id, expect_ok=True):
+        return self.call('GET', f'/classify/result/{result_id}', 'GET /classify/result/<id>',
+                         expect_ok=expect_ok)
+
+    def triage(self, session_id, fields, expect_ok=True):
+        return self.call('POST', '/triage/', 'POST /triage/', dict(fields, session_id=session_id),
+                         expect_ok=expect_ok)
+
+
+def full_workflow(flow):
+    """分类 -> 读取缓存结果 -> 按疾病构造分诊请求"""
+    result_id, disease = flow.classify(['眼痛', '头痛', '视力模糊'])
+    flow.result(result_id)
+    if '青光眼' in disease:
+        fields = GLAUCOMA_TRIAGE
+    elif '视网膜' in disease:
+        fields = RETINA_TRIAGE
+    else:
+        fields = ROUTINE_TRIAGE
+    flow.triage(result_id, fields)
+
+
+def _expect_level(flow, symptoms, fields, level):
+    result_id, _ = flow.classify(symptoms)
+    data = flow.triage(result_id, fields)
+    actual = data['triage_result']['level']
+    if actual != level:
+        raise ScenarioFailed(f'期望 {level} 级，实际 {actual} 级')
+
+
+def level1_emergency(flow):
+    _expect_level(flow, ['眼痛', '视力模糊'], LEVEL1_TRIAGE, 1)
+
+
+def level2_emergency(flow):
+    _expect_level(flow, ['眼痛', '视力急剧下降'], LEVEL2_TRIAGE, 2)
+
+
+def level4_routine(flow):
+    _expect_level(flow, ['眼红', '异物感'], LEVEL4_TRIAGE, 4)
+
+
+def error_cases(flow):
+    """空症状、无效结果 ID、分诊缺少参数都应返回 4xx"""
+    flow.call('POST', '/classify/', 'POST /classify/', {'symptoms': []}, expect_ok=False)
+    flow.result('invalid_id', expect_ok=False)
+    flow.call('POST', '/triage/', 'POST /triage/', {'session_id': 'invalid_id'}, expect_ok=False)
+
+
+SCENARIOS = {
+    'full_workflow': full_workflow,
+    'level1_emergency': level1_emergency,
+    'level2_emergency': level2_emergency,
+    'level4_routine': level4_routine,
+    'error_cases': error_cases,
+}
+DEFAULT_MIX = 'full_workflow=4,level1_emergency=1,level2_emergency=1,level4_routine=3,error_cases=1'
+
+
+def check_session_expiry(flow, clock, ttl):
+    """创建会话后把时钟拨过 TTL，缓存结果和分诊都应返回 4xx"""
+    result_id, _ = flow.classify(['眼红', '异物感'])
+    flow.result(result_id)
+    clock.advance(ttl + 1)
+    flow.result(result_id, expect_ok=False)
+    flow.triage(result_id, ROUTINE_TRIAGE, expect_ok=False)
+
+
+def parse_mix(text):
+    """'name=weight,...' -> (名称列表, 权重列表)"""
+    names, weights = [], []
+    for part in text.split(','):
+        name, _, weight = part.strip().partition('=')
+        if name not in SCENARIOS:
+            raise ValueError(f'未知场景 {name}，可选: {", ".join(SCENARIOS)}')
+        names.append(name)
+        weights.append(float(weight or 1))
+    return names, weights
+
+
+def execute(name, transport, recorder, scheduled_at=None):
+    """执行一个场景；开环模式传入计划发起时刻，排队时间计入场景耗时"""
+    start = time.perf_counter() if scheduled_at is None else scheduled_at
+    error = None
+    try:
+        SCENARIOS[name](Flow(transport, recorder))
+    except ScenarioFailed as e:
+        error = str(e)
+    except Exception as e:
+        error = f'{type(e).__name__}: {e}'
+    recorder.record_scenario(name, time.perf_counter() - start, error)
+
+
+def run_closed(transport, recorder, mix, concurrency, duration, iterations=None, think_time=0.0, seed=None):
+    """固定 concurrency 个 worker，直到时长用完或总场景数达到 iterations"""
+    names, weights = mix
+    deadline = time.perf_counter() + duration
+    remaining = [iterations]
+    lock = threading.Lock()
+
+    def worker(index):
+        rng = random.Random(None if seed is None else seed + index)
+        while time.perf_counter() < deadline:
+            if iterations is not None:
+                with lock:
+                    if remaining[0] <= 0:
+                        return
+                    remaining[0] -= 1
+            execute(rng.choices(names, weights)[0], transport, recorder)
+            if think_time:
+                time.sleep(think_time)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def run_open(transport, recorder, mix, rate, duration, concurrency, poisson=True, seed=None):
+    """按 rate 个/秒发起场景（泊松到达或均匀间隔），最多 concurrency 个同时执行，其余排队"""
+    names, weights = mix
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    next_at = start
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while True:
+            next_at += rng.expovariate(rate) if poisson else 1.0 / rate
+            if next_at - start >= duration:
+                break
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(execute, rng.choices(names, weights)[0], transport, recorder, next_at)
+
+
+def percentile(sorted_values, p):
+    """最近秩法百分位"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies, errors):
+    values = sorted(latencies)
+    count = len(values)
+
+    def ms(value):
+        return None if value is None else round(value * 1000, 2)
+
+    return {
+        'count': count,
+        'errors': errors,
+        'error_rate': round(errors / count, 4) if count else 0.0,
+        'mean_ms': ms(sum(values) / count) if count else None,
+        'p50_ms': ms(percentile(values, 50)),
+        'p95_ms': ms(percentile(values, 95)),
+        'p99_ms': ms(percentile(values, 99)),
+        'max_ms': ms(values[-1]) if values else None,
+    }
+
+
+def build_report(recorder, config, elapsed):
+    endpoints = {
+        endpoint: dict(summarize(latencies, recorder.request_errors[endpoint]),
+                       status=dict(recorder.statuses[endpoint]))
+        for endpoint, latencies in recorder.requests.items()
+    }
+    scenarios = {
+        name: summarize(latencies, recorder.scenario_failures[name])
+        for name, latencies in recorder.scenarios.items()
+    }
+    total_requests = sum(e['count'] for e in endpoints.values())
+    total_scenarios = sum(s['count'] for s in scenarios.values())
+    return {
+        'config': config,
+        'elapsed_s': round(elapsed, 3),
+        'throughput': {
+            'requests_per_s': round(total_requests / elapsed, 2) if elapsed else 0.0,
+            'scenarios_per_s': round(total_scenarios / elapsed, 2) if elapsed else 0.0,
+        },
+        'totals': {
+            'requests': total_requests,
+            'request_errors': sum(recorder.request_errors.values()),
+            'scenarios': total_scenarios,
+            'scenario_failures': sum(recorder.scenario_failures.values()),
+        },
+        'endpoints': endpoints,
+        'scenarios': scenarios,
+        'failure_samples': recorder.failure_samples,
+    }
+
+
+def compare_reports(report, baseline):
+    """逐接口对比延迟百分位和错误率，返回可打印的行"""
+    lines = []
+
+    def delta(old, new):
+        if old is None or new is None:
+            return f'{old} -> {new}'
+        change = f' ({(new - old) / old * 100:+.1f}%)' if old else ''
+        return f'{old} -> {new}{change}'
+
+    old_tp, new_tp = baseline['throughput']['requests_per_s'], report['throughput']['requests_per_s']
+    lines.append(f'吞吐量 requests/s: {delta(old_tp, new_tp)}')
+    for endpoint in sorted(set(report['endpoints']) | set(baseline['endpoints'])):
+        old = baseline['endpoints'].get(endpoint, {})
+        new = report['endpoints'].get(endpoint, {})
+        parts = [f"{key[:-3]} {delta(old.get(key), new.get(key))}" for key in ('p50_ms', 'p95_ms', 'p99_ms')]
+        parts.append(f"error_rate {old.get('error_rate')} -> {new.get('error_rate')}")
+        lines.append(f'{endpoint}: ' + ', '.join(parts))
+    return lines
+
+
+def create_in_process_app(config_name, clock):
+    """进程内应用；本地会话存储换成可控时钟"""
+    from app import create_app
+    from result_store import init_result_store
+    from session_backend import init_session_backend
+
+    app = create_app(config_name)
+    if app.config['SESSION_BACKEND'] == 'local':
+        init_result_store(app, clock=clock)
+        init_session_backend(app)
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='分类/分诊接口并发压测')
+    parser.add_argument('--base-url', default='http://localhost:5000')
+    parser.add_argument('--timeout', type=float, default=10, help='单个 HTTP 请求超时（秒）')
+    parser.add_argument('--in-process', action='store_true', help='用 Flask test_client 在进程内压测')
+    parser.add_argument('--config', default=None, help='--in-process 时 create_app 的配置名')
+    parser.add_argument('--mode', choices=('closed', 'open'), default='closed')
+    parser.add_argument('--concurrency', type=int, default=10, help='闭环的 worker 数 / 开环的最大并发')
+    parser.add_argument('--rate', type=float, default=20, help='开环模式每秒发起的场景数')
+    parser.add_argument('--uniform', action='store_true', help='开环模式均匀到达（默认泊松到达）')
+    parser.add_argument('--duration', type=float, default=30, help='压测时长（秒）')
+    parser.add_argument('--iterations', type=int, help='闭环模式的场景总数上限')
+    parser.add_argument('--think-time', type=float, default=0.0, help='闭环模式每个场景之后的停顿（秒）')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='场景及权重，如 full_workflow=4,error_cases=1')
+    parser.add_argument('--seed', type=int, help='随机种子，固定场景序列')
+    parser.add_argument('--smoke', action='store_true', help='每个场景顺序执行一次（原 text.py 的用法）')
+    parser.add_argument('--check-expiry', action='store_true', help='压测结束后用可控时钟检查会话过期')
+    parser.add_argument('--output', help='JSON 报告写入该文件（缺省打印到标准输出）')
+    parser.add_argument('--compare', help='与之前的 JSON 报告对比')
+    parser.add_argument('--max-error-rate', type=float, default=0.01, help='场景失败率超过该值时返回 1')
+    args = parser.parse_args(argv)
+
+    clock = OffsetClock()
+    if args.in_process:
+        app = create_in_process_app(args.config, clock)
+        transport = InProcessTransport(app)
+    else:
+        if args.check_expiry:
+            parser.error('--check-expiry 需要 --in-process（远程服务的时钟无法替换）')
+        app = None
+        transport = HttpTransport(args.base_url, args.timeout)
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    recorder = Recorder()
+    config = {
+        'target': transport.describe(),
+        'mode': 'smoke' if args.smoke else args.mode,
+        'mix': args.mix,
+        'concurrency': args.concurrency,
+        'started_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+    start = time.perf_counter()
+    if args.smoke:
+        for name in SCENARIOS:
+            execute(name, transport, recorder)
+    elif args.mode == 'closed':
+        config.update(duration_s=args.duration, iterations=args.iterations, think_time_s=args.think_time)
+        run_closed(transport, recorder, mix, args.concurrency, args.duration,
+                   args.iterations, args.think_time, args.seed)
+    else:
+        config.update(duration_s=args.duration, rate=args.rate, arrivals='uniform' if args.uniform else 'poisson')
+        run_open(transport, recorder, mix, args.rate, args.duration, args.concurrency,
+                 not args.uniform, args.seed)
+    report = build_report(recorder, config, time.perf_counter() - start)
+
+    if args.check_expiry:
+        if app.config['SESSION_BACKEND'] != 'local':
+            report['expiry_check'] = {'passed': False, 'error': '仅支持 SESSION_BACKEND=local'}
+        else:
+            try:
+                check_session_expiry(Flow(transport, Recorder()), clock, app.config['RESULT_CACHE_TTL'])
+                report['expiry_check'] = {'passed': True}
+            except ScenarioFailed as e:
+                report['expiry_check'] = {'passed': False, 'error': str(e)}
+
+    text = json.dumps(report, ensure_ascii=False, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        for line in compare_reports(report, baseline):
+            print(line, file=sys.stderr)
+
+    totals = report['totals']
+    failure_rate = totals['scenario_failures'] / totals['scenarios'] if totals['scenarios'] else 0.0
+    expiry_ok = report.get('expiry_check', {}).get('passed', True)
+    return 0 if failure_rate <= args.max_error_rate and expiry_ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
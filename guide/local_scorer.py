@@ -0,0 +1,163 @@
+# 本地症状 -> 疾病打分器
+# 以前端症状选项为词表、本文件中手工整理的典型症状表（DISEASE_PROFILES）为权重构造 NumPy 矩阵，
+# 只保留疾病目录中能解析到科室的病种；一次矩阵乘法即可为单条或整批症状打分。
+# 用途：合作方失败或超出延迟预算时的临时分类（provisional）。
+# 依赖 NumPy，应用启动时不导入，第一次需要临时分类时才导入并构建
+import threading
+
+import numpy as np
+from flask import current_app
+
+from disease_index import candidate_to_dict, get_disease_index
+from normalize import normalize_name
+
+EXTENSION_KEY = 'local_scorer'
+
+_build_lock = threading.Lock()
+
+# 前端可选的症状（read.md）以及分类接口常见的症状词
+SYMPTOM_VOCABULARY = (
+    '轻微不适', '中度疼痛', '剧烈疼痛', '眼痛',
+    '视力逐渐下降', '视力急剧下降', '视力突然完全丧失', '看东西模糊', '看东西重影', '眼前有黑影', '闪光感',
+    '眼红', '分泌物多', '畏光', '流泪', '异物感', '头痛', '恶心呕吐', '眼部外伤', '化学物质进入眼睛',
+    '眼痒', '眼干', '眼睑肿胀', '眼睑下垂', '眼球突出', '虹视', '视物变形', '视野缺损', '夜盲',
+)
+
+# 同义表达 -> 词表中的标准症状
+SYMPTOM_ALIASES = {
+    '剧痛': '剧烈疼痛', '剧烈眼痛': '剧烈疼痛', '眼部剧痛': '剧烈疼痛',
+    '视力模糊': '看东西模糊', '视物模糊': '看东西模糊',
+    '视力下降': '视力逐渐下降', '视力突然下降': '视力急剧下降',
+    '复视': '看东西重影', '重影': '看东西重影',
+    '黑影': '眼前有黑影', '飞蚊症': '眼前有黑影',
+    '恶心': '恶心呕吐', '呕吐': '恶心呕吐', '剧烈头痛': '头痛',
+    '虹视现象': '虹视', '外伤': '眼部外伤', '化学伤': '化学物质进入眼睛',
+    '眼睛干涩': '眼干', '干涩': '眼干', '突眼': '眼球突出', '眼睑水肿': '眼睑肿胀',
+}
+
+# 疾病的典型症状及权重（0~1），只收录能够从症状区分的常见病种
+DISEASE_PROFILES = {
+    '急性闭角型青光眼': {'剧烈疼痛': 1.0, '眼痛': 1.0, '头痛': 0.9, '恶心呕吐': 0.9, '视力急剧下降': 0.8, '虹视': 0.8, '眼红': 0.6, '看东西模糊': 0.4},
+    '原发性闭角型青光眼': {'眼痛': 0.8, '头痛': 0.7, '虹视': 0.7, '看东西模糊': 0.5, '视力逐渐下降': 0.4, '恶心呕吐': 0.4},
+    '原发性开角型青光眼': {'视野缺损': 1.0, '视力逐渐下降': 0.8, '看东西模糊': 0.4, '轻微不适': 0.2},
+    '老年性白内障': {'视力逐渐下降': 1.0, '看东西模糊': 0.9, '畏光': 0.3, '看东西重影': 0.3},
+    '视网膜脱离': {'眼前有黑影': 1.0, '闪光感': 1.0, '视力急剧下降': 0.8, '视野缺损': 0.8},
+    '视网膜中央动脉阻塞': {'视力突然完全丧失': 1.0, '视力急剧下降': 0.6},
+    '玻璃体积血': {'眼前有黑影': 1.0, '视力急剧下降': 0.8},
+    '黄斑变性': {'视物变形': 1.0, '视力逐渐下降': 0.7, '看东西模糊': 0.6},
+    '糖尿病性视网膜病变': {'看东西模糊': 0.6, '视力逐渐下降': 0.7, '眼前有黑影': 0.5},
+    '视网膜色素变性': {'夜盲': 1.0, '视野缺损': 0.8, '视力逐渐下降': 0.4},
+    '细菌性角膜炎': {'眼红': 0.9, '分泌物多': 0.8, '畏光': 0.8, '眼痛': 0.8, '中度疼痛': 0.6, '流泪': 0.6, '视力逐渐下降': 0.4},
+    '病毒性角膜炎': {'眼红': 0.8, '畏光': 0.8, '流泪': 0.8, '异物感': 0.6, '眼痛': 0.6},
+    '角膜溃疡': {'眼痛': 0.9, '眼红': 0.8, '分泌物多': 0.7, '畏光': 0.7, '剧烈疼痛': 0.5, '视力急剧下降': 0.5},
+    '干眼症': {'眼干': 1.0, '异物感': 0.8, '轻微不适': 0.6, '眼红': 0.3, '流泪': 0.3, '看东西模糊': 0.3},
+    '过敏性结膜炎': {'眼痒': 1.0, '眼红': 0.8, '流泪': 0.6, '分泌物多': 0.4},
+    '翼状胬肉': {'异物感': 0.7, '眼红': 0.6},
+    '近视': {'看东西模糊': 1.0, '视力逐渐下降': 0.5},
+    '老视': {'看东西模糊': 0.8, '视力逐渐下降': 0.6},
+    '散光': {'看东西模糊': 0.8, '看东西重影': 0.5, '头痛': 0.3},
+    '弱视': {'看东西模糊': 0.6, '视力逐渐下降': 0.3},
+    '麻痹性斜视': {'看东西重影': 1.0, '头痛': 0.3},
+    '眼肌麻痹': {'看东西重影': 1.0, '眼睑下垂': 0.5, '头痛': 0.3},
+    '上睑下垂': {'眼睑下垂': 1.0},
+    '甲状腺相关眼病': {'眼球突出': 1.0, '看东西重影': 0.6, '眼干': 0.4, '眼红': 0.3},
+    '视神经炎': {'视力急剧下降': 1.0, '眼痛': 0.7, '视野缺损': 0.7},
+    '缺血性视神经病变': {'视力急剧下降': 0.9, '视野缺损': 0.9},
+    '前葡萄膜炎': {'畏光': 1.0, '眼痛': 0.8, '眼红': 0.8, '看东西模糊': 0.5},
+    '眼内炎': {'剧烈疼痛': 0.9, '视力急剧下降': 0.9, '眼红': 0.8, '分泌物多': 0.4},
+    '泪囊炎': {'流泪': 1.0, '分泌物多': 0.8},
+    '泪道阻塞': {'流泪': 1.0},
+    '化学性眼烧伤': {'化学物质进入眼睛': 1.0, '剧烈疼痛': 0.8, '眼红': 0.6, '流泪': 0.6},
+    '眼球破裂伤': {'眼部外伤': 1.0, '剧烈疼痛': 0.8, '视力急剧下降': 0.8},
+    '眼球钝挫伤': {'眼部外伤': 1.0, '眼痛': 0.7, '眼睑肿胀': 0.5},
+    '眼内异物': {'异物感': 1.0, '眼部外伤': 0.8, '眼痛': 0.6},
+    '角膜外伤': {'眼部外伤': 0.8, '异物感': 0.8, '眼痛': 0.7, '流泪': 0.6},
+    '前房积血': {'眼部外伤': 0.9, '视力急剧下降': 0.6},
+}
+
+
+class LocalScorer:
+    """症状向量 x (N×V) 与权重矩阵 W (V×D) 相乘，得分为余弦相似度"""
+
+    def __init__(self, index, profiles=DISEASE_PROFILES, vocabulary=SYMPTOM_VOCABULARY, aliases=SYMPTOM_ALIASES):
+        self.vocabulary = tuple(vocabulary)
+        self._position = {normalize_name(s): i for i, s in enumerate(self.vocabulary)}
+        for alias, target in aliases.items():
+            self._position[normalize_name(alias)] = self._position[normalize_name(target)]
+
+        # 只保留目录中存在、可以解析到科室的疾病
+        self.diseases = tuple(d for d in profiles if index.best(d) is not None)
+        self.departments = tuple(candidate_to_dict(index.best(d)) for d in self.diseases)
+        weights = np.zeros((len(self.vocabulary), len(self.diseases)), dtype=np.float32)
+        for j, disease in enumerate(self.diseases):
+            for symptom, weight in profiles[disease].items():
+                weights[self._position[normalize_name(symptom)], j] = weight
+        norms = np.linalg.norm(weights, axis=0)
+        norms[norms == 0] = 1.0
+        self.weights = weights / norms
+
+    def encode(self, symptom_lists):
+        """症状列表 -> 0/1 矩阵；词表外的症状忽略"""
+        x = np.zeros((len(symptom_lists), len(self.vocabulary)), dtype=np.float32)
+        position = self._position
+        for row, symptoms in enumerate(symptom_lists):
+            for symptom in symptoms:
+                col = position.get(normalize_name(symptom))
+                if col is not None:
+                    x[row, col] = 1.0
+        return x
+
+    def score(self, x):
+        """x: (N×V)，返回 (N×D) 余弦相似度"""
+        norms = np.linalg.norm(x, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (x / norms) @ self.weights
+
+    def top_k(self, symptom_lists, k=3):
+        """批量打分，每条返回 [(疾病名, 得分, 科室dict)]，按得分降序，得分为 0 的不返回"""
+        scores = self.score(self.encode(symptom_lists))
+        k = min(k, scores.shape[1])
+        if k == 0:
+            return [[] for _ in symptom_lists]
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        results = []
+        for row_ids, row_scores in zip(top.tolist(), top_scores.tolist()):
+            results.append([
+                (self.diseases[j], round(s, 4), self.departments[j])
+                for j, s in zip(row_ids, row_scores) if s > 0
+            ])
+        return results
+
+    def classify(self, symptoms):
+        """单条分类，返回与合作方相同结构的 {'disease', 'confidence'}，无法判断时返回 None"""
+        best = self.top_k([symptoms], k=1)[0]
+        if not best:
+            return None
+        disease, score, _ = best[0]
+        return {'disease': disease, 'confidence': score}
+
+
+def init_local_scorer(app):
+    """立即构建打分器（疾病索引重建时调用）"""
+    with app.app_context():
+        scorer = LocalScorer(get_disease_index())
+    app.extensions[EXTENSION_KEY] = scorer
+    return scorer
+
+
+def get_local_scorer():
+    """首次使用时构建"""
+    scorer = current_app.extensions.get(EXTENSION_KEY)
+    if scorer is None:
+        with _build_lock:
+            scorer = current_app.extensions.get(EXTENSION_KEY) or init_local_scorer(current_app._get_current_object())
+    return scorer
+
+
+def classify_provisional(symptoms):
+    """合作方失败或超出延迟预算时的默认临时分类器"""
+    return get_local_scorer().classify(symptoms)
@@ -0,0 +1,325 @@
+# 热点路径微基准：疾病 -> 科室解析、会话存储读写、分诊级别与建议计算
+# 疾病索引分别在种子目录（add.py）和合成的大目录（默认 5 万条映射）上测量，数据写入内存 SQLite 后用
+# build_disease_index 构建，与线上一致。结果为每次操作的纳秒数（报告多轮的中位数、最快值和离散度）；
+# 可保存为基线，之后按中位数对比，任何一项变慢超过阈值（再加上两次测量的离散度余量）时返回 1
+# 用法: python microbench.py                                  # 全部运行并打印
+#       python microbench.py --save bench/baseline.json
+#       python microbench.py --compare bench/baseline.json --threshold 0.2 --noise 3
+#       python microbench.py --only 'index.*' --catalog synthetic --rows 50000
+import argparse
+import fnmatch
+import gc
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from catalog_import import CatalogImporter
+from disease_index import build_disease_index
+from exts import db
+from fuzzy_index import FuzzyIndex
+from result_store import ResultStore
+from session_backend import LocalSessionBackend
+from triage import ASSOCIATED_OPTIONS, PAIN_OPTIONS, VISION_OPTIONS, evaluate_triage, triage_inputs
+from triage_table import TriageTable
+
+SYNTHETIC_ROWS = 50000
+MODIFIERS = ('急性', '慢性', '先天性', '继发性', '复发性', '外伤性', '老年性', '儿童', '双眼', '单眼',
+             '原发性', '难治性', '进行性', '家族性', '药物性', '感染性')
+
+
+class Bench:
+    """一个基准项：setup() 返回 (fn, inputs)，测量 fn(x) 对每个输入的平均耗时
+
+    每轮至少 min_time 秒，共 repeat 轮；计时期间关闭 GC（同 timeit），避免回收时机落在哪一轮造成的抖动。
+    """
+
+    def __init__(self, name, setup, min_time=0.2, repeat=7):
+        self.name = name
+        self.setup = setup
+        self.min_time = min_time
+        self.repeat = repeat
+
+    def run(self):
+        fn, inputs = self.setup()
+        # 先跑一遍预热并估算循环次数，使每轮至少 min_time 秒
+        start = time.perf_counter()
+        for x in inputs:
+            fn(x)
+        once = time.perf_counter() - start
+        loops = max(1, int(self.min_time / once)) if once > 0 else 1
+        samples = []
+        gc_enabled = gc.isenabled()
+        gc.collect()
+        gc.disable()
+        try:
+            for _ in range(self.repeat):
+                start = time.perf_counter_ns()
+                for _ in range(loops):
+                    for x in inputs:
+                        fn(x)
+                samples.append((time.perf_counter_ns() - start) / (loops * len(inputs)))
+        finally:
+            if gc_enabled:
+                gc.enable()
+        median = statistics.median(samples)
+        return {
+            'ns_per_op': round(median, 1),
+            'min_ns': round(min(samples), 1),
+            # 离散度：各轮与中位数偏差的中位数 / 中位数
+            'spread': round(statistics.median(abs(s - median) for s in samples) / median, 4) if median else 0.0,
+            'ops': loops * len(inputs) * self.repeat,
+        }
+
+
+def seed_catalog():
+    from add import DEPARTMENTS, DISEASE_MAPPINGS, DISEASE_SYNONYMS
+    return DEPARTMENTS, DISEASE_MAPPINGS, DISEASE_SYNONYMS
+
+
+def synthetic_catalog(rows=SYNTHETIC_ROWS, seed=0):
+    """在种子目录基础上生成 rows 条映射：修饰词 + 种子疾病名 + 编号，约三成疾病对应两个科室，半数带同义词"""
+    rng = random.Random(seed)
+    departments, base_mappings, _ = seed_catalog()
+    departments = list(departments) + [
+        {'name': f"{d['name']}{i}病区", 'director': d['director']}
+        for i in range(1, 9) for d in departments
+    ]
+    department_names = [d['name'] for d in departments]
+    bases = [m['disease_name'] for m in base_mappings]
+    mappings, synonyms = [], []
+    i = 0
+    while len(mappings) < rows:
+        i += 1
+        base = bases[i % len(bases)]
+        name = f'{rng.choice(MODIFIERS)}{base}{i}型'
+        for department in rng.sample(department_names, 2 if rng.random() < 0.3 else 1):
+            mappings.append({'disease_name': name, 'department': department,
+                             'confidence': round(rng.uniform(0.6, 1.0), 2)})
+        if rng.random() < 0.5:
+            synonyms.append({'disease_name': name, 'synonym': f'{base}{i}号', 'score': round(rng.uniform(0.8, 0.99), 2)})
+    return departments, mappings[:rows], synonyms
+
+
+def load_index(catalog):
+    """把目录导入内存 SQLite，再按线上方式构建疾病索引，返回 (索引, 会话)"""
+    departments, mappings, synonyms = catalog
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine)
+    session = Session(engine)
+    importer = CatalogImporter(session, chunk_size=5000)
+    for method, records in ((importer.import_departments, departments),
+                            (importer.import_mappings, mappings),
+                            (importer.import_synonyms, synonyms)):
+        method(enumerate(records, start=1))
+    return build_disease_index(session), session
+
+
+def index_benches(label, catalog, sample=2000, seed=0):
+    state = {}
+
+    def index():
+        if 'index' not in state:
+            state['index'], state['session'] = load_index(catalog)
+            rng = random.Random(seed)
+            names = [m['disease_name'] for m in catalog[1]] + [s['synonym'] for s in catalog[2]]
+            state['names'] = rng.sample(names, min(sample, len(names)))
+        return state['index']
+
+    def ranking():
+        return index().ranking, state['names']
+
+    def mention():
+        index()
+        return index().lookup_ranking, [f'考虑{name}可能性大' for name in state['names'][:200]]
+
+    def fuzzy():
+        index()
+        # 去掉一个字符，走近似匹配
+        return index().lookup_ranking, [name[:-2] + name[-1] for name in state['names'][:50] if len(name) > 3]
+
+    def fuzzy_search():
+        # 直接测近似索引本身：删一个字、删首字、字序轮换三种查询
+        index()
+        names = state['names']
+        queries = [name[:-2] + name[-1] for name in names[:100] if len(name) > 3]
+        queries += [name[1:] for name in names[100:150]] + [name[3:] + name[:3] for name in names[150:200]]
+        return index().fuzzy.search, queries
+
+    def fuzzy_build():
+        entries = [(key, candidates[0].disease_name, candidates[0].confidence)
+                   for key, candidates in ((key, index().resolve(key)) for key in index().names())]
+        return (lambda _: FuzzyIndex(entries)), [None]
+
+    def build():
+        index()
+        return (lambda _: build_disease_index(state['session'])), [None]
+
+    return [
+        Bench(f'index.ranking[{label}]', ranking),
+        Bench(f'index.lookup_mention[{label}]', mention),
+        Bench(f'index.lookup_fuzzy[{label}]', fuzzy),
+        # 构建一次即为一个样本，种子目录上每轮也要重复多次，否则单次计时的抖动会被当成回归
+        Bench(f'index.build[{label}]', build, min_time=0.5, repeat=5),
+        Bench(f'fuzzy.search[{label}]', fuzzy_search),
+        Bench(f'fuzzy.build[{label}]', fuzzy_build, min_time=0.5, repeat=5),
+    ]
+
+
+def sample_result(rng):
+    """与 classify_service.build_result 相同结构的会话内容"""
+    department = {'department_id': rng.randrange(1, 20), 'department_name': '青光眼科',
+                  'disease_name': '急性闭角型青光眼', 'confidence': 0.95}
+    return {
+        'classification': {'disease': '急性闭角型青光眼', 'confidence': 0.92},
+        'recommended_department': department,
+        'recommended_departments': [department, dict(department, department_id=21, confidence=0.8)],
+        'symptoms': ['眼痛', '头痛', '视力模糊'],
+        'cached_at': datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def session_benches(entries=10000, seed=0):
+    rng = random.Random(seed)
+    keys = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(entries)]
+    value = sample_result(rng)
+
+    def filled():
+        backend = LocalSessionBackend(ResultStore(ttl=600, max_entries=entries))
+        for key in keys:
+            backend.set(key, value)
+        return backend
+
+    def write():
+        backend = LocalSessionBackend(ResultStore(ttl=600, max_entries=entries))
+        return (lambda key: backend.set(key, value)), keys
+
+    def read():
+        return filled().get, rng.sample(keys, 2000)
+
+    def read_many():
+        backend = filled()
+        return backend.get_many, [rng.sample(keys, 50) for _ in range(100)]
+
+    return [
+        Bench('session.local.set', write),
+        Bench('session.local.get', read),
+        Bench('session.local.get_many50', read_many),
+    ]
+
+
+def triage_requests(count=2000, seed=0):
+    """随机组合的分诊请求体"""
+    rng = random.Random(seed)
+    return [
+        {
+            'pain_level': rng.choice(PAIN_OPTIONS),
+            'vision_changes': rng.sample(VISION_OPTIONS, rng.randint(0, 2)),
+            'duration_hours': rng.choice((1, 6, 12, 30, 48, 100)),
+            'associated_symptoms': rng.sample(ASSOCIATED_OPTIONS, rng.randint(0, 2)),
+            'trauma_history': rng.random() < 0.1,
+            'chemical_exposure': rng.random() < 0.05,
+        }
+        for _ in range(count)
+    ]
+
+
+def triage_benches():
+    requests = triage_requests()
+
+    def table():
+        return TriageTable().evaluate_request, requests
+
+    def rules():
+        return (lambda data: evaluate_triage(**triage_inputs(data))), requests
+
+    return [
+        Bench('triage.memo', table),
+        Bench('triage.rules', rules),
+    ]
+
+
+def compare(results, baseline, threshold, noise=3.0):
+    """按中位数对比，返回 (打印行, 变慢超过阈值的基准名列表)
+
+    允许的比值为 1 + threshold + noise × (基线离散度 + 本次离散度)：抖动大的项（亚微秒级操作、单次构建）
+    需要更明显的变慢才算回归。旧基线没有离散度时按 0 计。
+    """
+    lines, regressions = [], []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old is None:
+            lines.append(f'{name:40s} {result["ns_per_op"]:>14,.0f} ns  (无基线)')
+            continue
+        ratio = result['ns_per_op'] / old['ns_per_op'] if old['ns_per_op'] else 1.0
+        limit = 1 + threshold + noise * (old.get('spread', 0.0) + result.get('spread', 0.0))
+        flag = ''
+        if ratio > limit:
+            regressions.append(name)
+            flag = '  <-- 变慢'
+        lines.append(f'{name:40s} {old["ns_per_op"]:>14,.0f} -> {result["ns_per_op"]:>14,.0f} ns  '
+                     f'({ratio:.2f}x, 上限 {limit:.2f}x){flag}')
+    return lines, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='解析/会话/分诊热点路径微基准')
+    parser.add_argument('--only', action='append', help='只运行名称匹配的基准（glob，可多次指定）')
+    parser.add_argument('--catalog', choices=('seed', 'synthetic', 'all'), default='all')
+    parser.add_argument('--rows', type=int, default=SYNTHETIC_ROWS, help='合成目录的映射条数')
+    parser.add_argument('--save', help='结果保存为基线 JSON')
+    parser.add_argument('--compare', help='与基线 JSON 对比')
+    parser.add_argument('--threshold', type=float, default=0.3, help='比基线慢超过该比例视为回归')
+    parser.add_argument('--noise', type=float, default=3.0, help='阈值之外再按离散度的多少倍放宽')
+    args = parser.parse_args(argv)
+
+    benches = []
+    if args.catalog in ('seed', 'all'):
+        benches += index_benches('seed', seed_catalog())
+    if args.catalog in ('synthetic', 'all'):
+        benches += index_benches(f'synthetic{args.rows // 1000}k', synthetic_catalog(args.rows))
+    benches += session_benches() + triage_benches()
+    if args.only:
+        benches = [b for b in benches if any(fnmatch.fnmatch(b.name, p) for p in args.only)]
+
+    results = {}
+    for bench in benches:
+        results[bench.name] = bench.run()
+        if not args.compare:
+            print(f'{bench.name:40s} {results[bench.name]["ns_per_op"]:>14,.0f} ns/op', flush=True)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({
+                'meta': {
+                    'python': platform.python_version(),
+                    'machine': platform.machine(),
+                    'node': platform.node(),
+                    'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                },
+                'results': results,
+            }, f, ensure_ascii=False, indent=2, sort_keys=True)
+        print(f'基线已保存到 {args.save}')
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline['meta'].get('node') != platform.node():
+            print(f"注意: 基线来自 {baseline['meta'].get('node')}，不同机器的结果不可直接比较")
+        lines, regressions = compare(results, baseline['results'], args.threshold, args.noise)
+        print('\n'.join(lines))
+        if regressions:
+            print(f'{len(regressions)} 项比基线慢 {args.threshold:.0%} 以上（已计入离散度）: {", ".join(regressions)}')
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
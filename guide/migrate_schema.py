@@ -0,0 +1,97 @@
+# 数据库结构升级：归一化查找列 name_key 与查找/唯一索引
+# 可重复执行，已完成的步骤会跳过。已有数据库执行一次即可，新库由 `flask --app app init-db` 直接按 model.py 建表
+# 用法: python migrate_schema.py
+import sys
+
+from sqlalchemy import bindparam, func, inspect, select, text
+
+from app_config import DB_URI, DB_ENGINE_OPTIONS
+from db_pool import create_pooled_engine
+from model import Department, DiseaseMapping, DiseaseSynonym
+from normalize import normalize_name
+
+# (模型, name_key 的来源列)
+KEYED_MODELS = (
+    (Department, 'name'),
+    (DiseaseMapping, 'disease_name'),
+    (DiseaseSynonym, 'synonym'),
+)
+# 被新的复合索引覆盖、可以删除的旧索引
+OBSOLETE_INDEXES = {
+    'disease_mappings': ('ix_disease_mappings_disease_name', 'ix_disease_mappings_lookup',
+                         'ix_disease_mappings_name_key'),
+}
+
+
+def add_key_columns(conn, inspector, log):
+    for model, _ in KEYED_MODELS:
+        table = model.__table__
+        existing = {c['name'] for c in inspector.get_columns(table.name)}
+        if 'name_key' in existing:
+            continue
+        column_type = table.c.name_key.type.compile(dialect=conn.dialect)
+        log(f'{table.name}: 添加列 name_key {column_type}')
+        conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN name_key {column_type}'))
+
+
+def backfill_keys(conn, log):
+    """name_key 需要 NFKC 归一化，数据库函数做不到，在 Python 中计算后批量回写"""
+    for model, source in KEYED_MODELS:
+        table = model.__table__
+        rows = conn.execute(select(table.c.id, table.c[source], table.c.name_key)).all()
+        updates = [
+            {'row_id': row_id, 'key': normalize_name(value)}
+            for row_id, value, key in rows if key != normalize_name(value)
+        ]
+        if not updates:
+            continue
+        log(f'{table.name}: 回填 name_key {len(updates)} 行')
+        conn.execute(
+            table.update().where(table.c.id == bindparam('row_id')).values(name_key=bindparam('key')),
+            updates,
+        )
+
+
+def remove_duplicate_synonyms(conn, log):
+    """建唯一索引前删除重复的 (mapping_id, synonym)，保留 id 最小的一条"""
+    table = DiseaseSynonym.__table__
+    keep = select(func.min(table.c.id)).group_by(table.c.mapping_id, table.c.synonym)
+    duplicates = conn.execute(select(table.c.id).where(table.c.id.not_in(keep))).scalars().all()
+    if duplicates:
+        log(f'{table.name}: 删除重复同义词 {len(duplicates)} 行')
+        conn.execute(table.delete().where(table.c.id.in_(duplicates)))
+
+
+def sync_indexes(conn, inspector, log):
+    for model, _ in KEYED_MODELS:
+        table = model.__table__
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            if index.name not in existing:
+                log(f'{table.name}: 创建索引 {index.name}')
+                index.create(conn)
+        for name in OBSOLETE_INDEXES.get(table.name, ()):
+            if name in existing:
+                log(f'{table.name}: 删除旧索引 {name}')
+                conn.execute(text(f'DROP INDEX {name} ON {table.name}' if conn.dialect.name == 'mysql'
+                                  else f'DROP INDEX {name}'))
+
+
+def migrate(engine, log=print):
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        add_key_columns(conn, inspector, log)
+        backfill_keys(conn, log)
+        remove_duplicate_synonyms(conn, log)
+        # 加列之后重新读取结构信息
+        sync_indexes(conn, inspect(conn), log)
+
+
+def main():
+    migrate(create_pooled_engine(DB_URI, DB_ENGINE_OPTIONS))
+    print('数据库结构升级完成')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,239 @@
+# 本地 Redis 协议替身服务，供测试和无 Redis 的开发机使用
+# 只实现会话存储用到的命令子集（RESP2），数据仅保存在内存中
+# 用法: python mini_redis.py --port 6390，然后设置 SESSION_REDIS_URL=redis://127.0.0.1:6390/0
+import argparse
+import inspect
+import socketserver
+import threading
+import time
+
+
+class _Store:
+    def __init__(self):
+        self.data = {}     # key -> value(bytes)
+        self.expires = {}  # key -> 过期时间（time.monotonic 毫秒）
+        self.lock = threading.Lock()
+
+    def _alive(self, key):
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.monotonic() * 1000:
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def _purge(self):
+        now = time.monotonic() * 1000
+        for key in [k for k, d in self.expires.items() if d <= now]:
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+
+
+class _Error(Exception):
+    pass
+
+
+def _encode(reply):
+    if reply is None:
+        return b'$-1\r\n'
+    if isinstance(reply, _Error):
+        return b'-ERR ' + str(reply).encode() + b'\r\n'
+    if isinstance(reply, bool):
+        return b':%d\r\n' % int(reply)
+    if isinstance(reply, int):
+        return b':%d\r\n' % reply
+    if isinstance(reply, str):
+        return b'+' + reply.encode() + b'\r\n'
+    if isinstance(reply, bytes):
+        return b'$%d\r\n%s\r\n' % (len(reply), reply)
+    if isinstance(reply, list):
+        return b'*%d\r\n' % len(reply) + b''.join(_encode(r) for r in reply)
+    raise TypeError(type(reply))
+
+
+class _Handler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        while True:
+            try:
+                args = self._read_command()
+            except (ConnectionError, ValueError):
+                return
+            if args is None:
+                return
+            try:
+                reply = self.server.execute(args)
+            except _Error as e:
+                reply = e
+            self.wfile.write(_encode(reply))
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            return line.split()  # inline 命令，例如 telnet 中的 PING
+        args = []
+        for _ in range(int(line[1:])):
+            header = self.rfile.readline()
+            if not header.startswith(b'$'):
+                raise ValueError('bad bulk header')
+            length = int(header[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+
+class MiniRedisServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0):
+        super().__init__((host, port), _Handler)
+        self.store = _Store()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'redis://{host}:{port}/0'
+
+    def start(self):
+        """在后台线程中运行，返回自身便于链式调用"""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def execute(self, args):
+        if not args:
+            raise _Error('empty command')
+        name = args[0].decode().upper()
+        handler = getattr(self, 'cmd_' + name.lower(), None)
+        if handler is None:
+            raise _Error(f"unknown command '{name}'")
+        # 参数个数先对照方法签名检查，不让 TypeError 从处理函数里抛出断开连接
+        try:
+            inspect.signature(handler).bind(*args[1:])
+        except TypeError:
+            raise _Error(f"wrong number of arguments for '{name.lower()}' command") from None
+        with self.store.lock:
+            return handler(*args[1:])
+
+    # ---- 命令实现（调用时已持有锁） ----
+    def cmd_ping(self, message=None):
+        return 'PONG' if message is None else message
+
+    def cmd_echo(self, message):
+        return message
+
+    def cmd_select(self, db):
+        return 'OK'
+
+    def cmd_client(self, *args):
+        return 'OK'
+
+    def cmd_get(self, key):
+        s = self.store
+        return s.data[key] if s._alive(key) else None
+
+    def cmd_mget(self, *keys):
+        return [self.cmd_get(key) for key in keys]
+
+    def cmd_set(self, key, value, *options):
+        s = self.store
+        ttl_ms = None
+        nx = xx = False
+        opts = [o.decode().upper() for o in options]
+        i = 0
+        while i < len(opts):
+            if opts[i] in ('EX', 'PX'):
+                if i + 1 >= len(opts):
+                    raise _Error('syntax error')
+                ttl_ms = int(opts[i + 1]) * (1000 if opts[i] == 'EX' else 1)
+                i += 2
+            elif opts[i] == 'NX':
+                nx, i = True, i + 1
+            elif opts[i] == 'XX':
+                xx, i = True, i + 1
+            else:
+                raise _Error('syntax error')
+        exists = s._alive(key)
+        if (nx and exists) or (xx and not exists):
+            return None
+        s.data[key] = value
+        if ttl_ms is None:
+            s.expires.pop(key, None)
+        else:
+            s.expires[key] = time.monotonic() * 1000 + ttl_ms
+        return 'OK'
+
+    def cmd_mset(self, *pairs):
+        for i in range(0, len(pairs), 2):
+            self.cmd_set(pairs[i], pairs[i + 1])
+        return 'OK'
+
+    def cmd_del(self, *keys):
+        s = self.store
+        removed = 0
+        for key in keys:
+            if s._alive(key):
+                del s.data[key]
+                s.expires.pop(key, None)
+                removed += 1
+        return removed
+
+    def cmd_exists(self, *keys):
+        return sum(1 for key in keys if self.store._alive(key))
+
+    def cmd_pexpire(self, key, ms):
+        s = self.store
+        if not s._alive(key):
+            return 0
+        s.expires[key] = time.monotonic() * 1000 + int(ms)
+        return 1
+
+    def cmd_expire(self, key, seconds):
+        return self.cmd_pexpire(key, int(seconds) * 1000)
+
+    def cmd_pttl(self, key):
+        s = self.store
+        if not s._alive(key):
+            return -2
+        deadline = s.expires.get(key)
+        return -1 if deadline is None else int(deadline - time.monotonic() * 1000)
+
+    def cmd_ttl(self, key):
+        ttl = self.cmd_pttl(key)
+        return ttl if ttl < 0 else (ttl + 999) // 1000
+
+    def cmd_dbsize(self):
+        self.store._purge()
+        return len(self.store.data)
+
+    def cmd_flushdb(self, *args):
+        self.store.data.clear()
+        self.store.expires.clear()
+        return 'OK'
+
+    cmd_flushall = cmd_flushdb
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地 Redis 协议替身服务')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6390)
+    args = parser.parse_args()
+    server = MiniRedisServer(args.host, args.port)
+    print(f"mini redis listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
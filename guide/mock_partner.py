@@ -0,0 +1,317 @@
+# 合作方模型 API 的本地替身服务，供离线开发、压测和回归测试使用
+# 返回种子目录（add.py 或 catalog_import.py 导出的 JSONL）中的真实疾病名，相同症状集合总是得到相同结果；
+# 延迟分布、超时、5xx 比例和慢速分段响应均可配置，运行中也可通过 POST /_profile 调整
+# 用法: python mock_partner.py --port 5001 --latency lognormal:80:0.5 --error-rate 0.02 --timeout-rate 0.01
+#       然后设置 PARTNER_API_URL=http://localhost:5001/mock_api、PARTNER_API_BATCH_URL=http://localhost:5001/mock_api/batch
+# 接口: POST /mock_api        {"symptoms": [...]}      -> {"disease": ..., "confidence": ...}
+#       POST /mock_api/batch  {"batch": [[...], ...]}  -> {"results": [...]}
+#       GET  /_stats  各类结果计数；GET/POST /_profile  查看/修改故障配置
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ERROR_STATUSES = (500, 502, 503)
+
+
+def parse_latency(spec):
+    """'fixed:50' | 'uniform:20:200' | 'normal:100:30' | 'lognormal:80:0.5' | 'exp:100'，单位毫秒"""
+    kind, *params = spec.split(':')
+    try:
+        params = [float(p) for p in params]
+    except ValueError:
+        raise ValueError(f'延迟参数必须是数字: {spec}')
+    expected = {'fixed': 1, 'uniform': 2, 'normal': 2, 'lognormal': 2, 'exp': 1}
+    if kind not in expected or len(params) != expected[kind]:
+        raise ValueError(f'无法解析延迟分布 {spec}，可选 fixed:ms、uniform:lo:hi、normal:mean:std、'
+                         f'lognormal:median:sigma、exp:mean')
+    return kind, tuple(params)
+
+
+def sample_latency(latency, rng):
+    """按分布采样一次延迟（秒）"""
+    kind, params = latency
+    if kind == 'fixed':
+        ms = params[0]
+    elif kind == 'uniform':
+        ms = rng.uniform(*params)
+    elif kind == 'normal':
+        ms = rng.gauss(*params)
+    elif kind == 'lognormal':
+        median, sigma = params
+        ms = median * rng.lognormvariate(0, sigma)
+    else:
+        ms = rng.expovariate(1 / params[0]) if params[0] > 0 else 0
+    return max(ms, 0) / 1000
+
+
+class Profile:
+    """故障配置；各比例按请求独立抽样，优先级 超时 > 5xx > 慢速响应"""
+
+    FIELDS = ('latency', 'batch_item_ms', 'error_rate', 'timeout_rate', 'hang_seconds',
+              'drip_rate', 'drip_chunk', 'drip_interval_ms', 'synonym_rate', 'unknown_rate')
+
+    def __init__(self, latency='lognormal:80:0.5', batch_item_ms=5.0, error_rate=0.0, timeout_rate=0.0,
+                 hang_seconds=60.0, drip_rate=0.0, drip_chunk=8, drip_interval_ms=200.0,
+                 synonym_rate=0.2, unknown_rate=0.0):
+        self.latency = parse_latency(latency) if isinstance(latency, str) else latency
+        self.batch_item_ms = batch_item_ms
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.hang_seconds = hang_seconds
+        self.drip_rate = drip_rate
+        self.drip_chunk = drip_chunk
+        self.drip_interval_ms = drip_interval_ms
+        self.synonym_rate = synonym_rate
+        self.unknown_rate = unknown_rate
+
+    def update(self, values):
+        for key, value in values.items():
+            if key not in self.FIELDS:
+                raise ValueError(f'未知配置项 {key}')
+            setattr(self, key, parse_latency(value) if key == 'latency' else type(getattr(self, key))(value))
+
+    def as_dict(self):
+        data = {key: getattr(self, key) for key in self.FIELDS}
+        kind, params = self.latency
+        data['latency'] = ':'.join([kind, *(f'{p:g}' for p in params)])
+        return data
+
+
+class Catalog:
+    """疾病标签：按症状集合的哈希稳定地选出标准疾病名，部分请求返回同义词或目录外的名称"""
+
+    def __init__(self, mappings, synonyms):
+        self.diseases = sorted({m['disease_name'] for m in mappings})
+        self.synonyms = {}
+        for s in synonyms:
+            self.synonyms.setdefault(s['disease_name'], []).append(s['synonym'])
+        if not self.diseases:
+            raise ValueError('疾病目录为空')
+
+    @classmethod
+    def from_seed(cls):
+        from add import DISEASE_MAPPINGS, DISEASE_SYNONYMS
+        return cls(DISEASE_MAPPINGS, DISEASE_SYNONYMS)
+
+    @classmethod
+    def from_directory(cls, directory):
+        """读取 catalog_import.py --export-seed 导出的 mappings.jsonl、synonyms.jsonl"""
+        def read(name):
+            path = os.path.join(directory, f'{name}.jsonl')
+            if not os.path.exists(path):
+                return []
+            with open(path, encoding='utf-8') as f:
+                return [json.loads(line) for line in f if line.strip()]
+        return cls(read('mappings'), read('synonyms'))
+
+    def classify(self, symptoms, profile, rng):
+        key = '|'.join(sorted({str(s).strip() for s in symptoms}))
+        digest = hashlib.sha1(key.encode('utf-8')).digest()
+        disease = self.diseases[int.from_bytes(digest[:4], 'big') % len(self.diseases)]
+        confidence = round(0.6 + digest[4] / 255 * 0.39, 2)
+        if rng.random() < profile.unknown_rate:
+            return {'disease': f'{disease}（待定）', 'confidence': round(confidence / 2, 2)}
+        synonyms = self.synonyms.get(disease)
+        if synonyms and rng.random() < profile.synonym_rate:
+            disease = synonyms[digest[5] % len(synonyms)]
+        return {'disease': disease, 'confidence': confidence}
+
+
+class MockPartner:
+    def __init__(self, catalog, profile, seed=None):
+        self.catalog = catalog
+        self.profile = profile
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counts = {key: 0 for key in ('requests', 'batch_requests', 'items', 'ok', 'errors', 'timeouts',
+                                          'dripped', 'bad_requests', 'in_flight')}
+
+    def count(self, key, delta=1):
+        with self._lock:
+            self.counts[key] += delta
+
+    def draw(self):
+        """一次请求的随机结果：(延迟秒, 结局, 状态码)，结局为 ok / error / timeout / drip"""
+        with self._lock:
+            rng, profile = self._rng, self.profile
+            latency = sample_latency(profile.latency, rng)
+            roll = rng.random()
+            if roll < profile.timeout_rate:
+                return profile.hang_seconds, 'timeout', 504
+            roll -= profile.timeout_rate
+            if roll < profile.error_rate:
+                return latency, 'error', rng.choice(ERROR_STATUSES)
+            roll -= profile.error_rate
+            return latency, 'drip' if roll < profile.drip_rate else 'ok', 200
+
+    def classify(self, symptoms):
+        with self._lock:
+            return self.catalog.classify(symptoms, self.profile, self._rng)
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counts)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive，便于观察客户端连接池的复用
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, data, drip=False):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if not drip:
+            self.wfile.write(body)
+            return
+        # 慢速分段：响应头立即返回，响应体每隔 drip_interval_ms 写 drip_chunk 字节
+        profile = self.server.mock.profile
+        for i in range(0, len(body), profile.drip_chunk):
+            self.wfile.write(body[i:i + profile.drip_chunk])
+            self.wfile.flush()
+            time.sleep(profile.drip_interval_ms / 1000)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b'null')
+        except ValueError:
+            return None
+
+    def do_GET(self):
+        mock = self.server.mock
+        if self.path == '/_stats':
+            self._send_json(200, mock.stats())
+        elif self.path == '/_profile':
+            self._send_json(200, mock.profile.as_dict())
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        mock = self.server.mock
+        data = self._read_json()
+        if self.path == '/_profile':
+            try:
+                mock.profile.update(data if isinstance(data, dict) else {})
+            except (TypeError, ValueError) as e:
+                self._send_json(400, {'error': str(e)})
+                return
+            self._send_json(200, mock.profile.as_dict())
+            return
+        if self.path == '/mock_api':
+            symptoms = data.get('symptoms') if isinstance(data, dict) else None
+            batch = None
+        elif self.path == '/mock_api/batch':
+            batch = data.get('batch') if isinstance(data, dict) else None
+            symptoms = None
+        else:
+            self._send_json(404, {'error': 'not found'})
+            return
+        if not isinstance(symptoms if batch is None else batch, list):
+            mock.count('bad_requests')
+            self._send_json(400, {'error': '请求体缺少 symptoms 或 batch 列表'})
+            return
+
+        mock.count('requests')
+        mock.count('in_flight')
+        try:
+            latency, outcome, status = mock.draw()
+            if batch is not None:
+                mock.count('batch_requests')
+                mock.count('items', len(batch))
+                if outcome != 'timeout':
+                    latency += len(batch) * mock.profile.batch_item_ms / 1000
+            else:
+                mock.count('items')
+            time.sleep(latency)
+            if outcome == 'timeout':
+                mock.count('timeouts')
+                self._send_json(status, {'error': 'mock timeout'})
+            elif outcome == 'error':
+                mock.count('errors')
+                self._send_json(status, {'error': 'mock upstream failure'})
+            else:
+                mock.count('dripped' if outcome == 'drip' else 'ok')
+                if batch is None:
+                    result = mock.classify(symptoms)
+                else:
+                    result = {'results': [mock.classify(s if isinstance(s, list) else []) for s in batch]}
+                self._send_json(status, result, drip=outcome == 'drip')
+        except (BrokenPipeError, ConnectionResetError):
+            # 客户端已超时断开
+            pass
+        finally:
+            mock.count('in_flight', -1)
+
+
+class MockPartnerServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, mock, verbose=False):
+        super().__init__(address, _Handler)
+        self.mock = mock
+        self.verbose = verbose
+
+
+def serve_in_thread(mock, host='127.0.0.1', port=0):
+    """在后台线程启动，返回 (server, base_url)；port=0 时自动分配端口，用于压测脚本内嵌"""
+    server = MockPartnerServer((host, port), mock)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='合作方模型 API 本地替身')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5001)
+    parser.add_argument('--catalog', help='含 mappings.jsonl / synonyms.jsonl 的目录，缺省使用 add.py 的种子数据')
+    parser.add_argument('--latency', default='lognormal:80:0.5',
+                        help='延迟分布（毫秒）: fixed:ms | uniform:lo:hi | normal:mean:std | lognormal:median:sigma | exp:mean')
+    parser.add_argument('--batch-item-ms', type=float, default=5.0, help='批量接口每条额外耗时')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='返回 5xx 的比例')
+    parser.add_argument('--timeout-rate', type=float, default=0.0, help='挂起 --hang-seconds 后返回 504 的比例')
+    parser.add_argument('--hang-seconds', type=float, default=60.0)
+    parser.add_argument('--drip-rate', type=float, default=0.0, help='慢速分段返回响应体的比例')
+    parser.add_argument('--drip-chunk', type=int, default=8, help='慢速响应每段字节数')
+    parser.add_argument('--drip-interval-ms', type=float, default=200.0, help='慢速响应分段间隔')
+    parser.add_argument('--synonym-rate', type=float, default=0.2, help='返回同义词而非标准疾病名的比例')
+    parser.add_argument('--unknown-rate', type=float, default=0.0, help='返回目录外疾病名的比例')
+    parser.add_argument('--seed', type=int, help='随机种子，固定延迟与故障序列')
+    parser.add_argument('--verbose', action='store_true', help='打印每个请求')
+    args = parser.parse_args(argv)
+
+    try:
+        profile = Profile(
+            latency=args.latency, batch_item_ms=args.batch_item_ms, error_rate=args.error_rate,
+            timeout_rate=args.timeout_rate, hang_seconds=args.hang_seconds, drip_rate=args.drip_rate,
+            drip_chunk=args.drip_chunk, drip_interval_ms=args.drip_interval_ms,
+            synonym_rate=args.synonym_rate, unknown_rate=args.unknown_rate,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    catalog = Catalog.from_directory(args.catalog) if args.catalog else Catalog.from_seed()
+    server = MockPartnerServer((args.host, args.port), MockPartner(catalog, profile, args.seed), args.verbose)
+    print(f'mock partner listening on http://{args.host}:{args.port}/mock_api '
+          f'({len(catalog.diseases)} diseases, profile {json.dumps(profile.as_dict(), ensure_ascii=False)})')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,5 +1,16 @@
 from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
 from exts import db 
+from normalize import normalize_name
+
+
+def _key_default(source):
+    """Core 层批量插入未提供 name_key 时，由原始名称计算"""
+    return lambda context: normalize_name(context.get_current_parameters().get(source))
+
 
 class Department(db.Model):
     __tablename__ = 'departments'
@@ -10,6 +21,12 @@ class Department(db.Model):
     phone = db.Column(db.String(20), nullable=True)                   # 联系电话
     description = db.Column(db.Text, nullable=True)                   # 科室简介
     created_at = db.Column(db.DateTime, default=datetime.now)         # 创建时间
+    name_key = db.Column(db.String(100), index=True, default=_key_default('name'))  # 归一化名称，用于忽略大小写/全半角的查找
+
+    @db.validates('name')
+    def _set_name_key(self, key, value):
+        self.name_key = normalize_name(value)
+        return value
 
     def __repr__(self):
         return f"<Department {self.name}>"
@@ -18,15 +35,33 @@ class DiseaseMapping(db.Model):
     __tablename__ = 'disease_mappings'
     
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    disease_name = db.Column(db.String(200), nullable=False, index=True)  # 标准疾病名
+    disease_name = db.Column(db.String(200), nullable=False)  # 标准疾病名
     department_id = db.Column(db.Integer, db.ForeignKey('departments.id'), nullable=False)
     confidence = db.Column(db.Float, default=1.0)  # 映射可信度
     created_at = db.Column(db.DateTime, default=datetime.now)
+    name_key = db.Column(db.String(200), default=_key_default('disease_name'))  # 归一化疾病名
+
+    # 按 name_key 取科室候选只需读索引；以 name_key 开头，同时充当 name_key 的索引
+    __table_args__ = (
+        db.Index('ix_disease_mappings_key_lookup', name_key, department_id, confidence),
+    )
+
+    @db.validates('disease_name')
+    def _set_name_key(self, key, value):
+        self.name_key = normalize_name(value)
+        return value
     
-    department = db.relationship('Department', backref='disease_mappings')
+    # 多对一关系随映射一起 JOIN 读出；反向集合按需加载，批量场景用 selectinload
+    department = db.relationship(
+        'Department', lazy='joined', innerjoin=True,
+        backref=db.backref('disease_mappings', lazy='select'),
+    )
     
     def __repr__(self):
-        return f"<DiseaseMapping {self.disease_name} -> {self.department.name}>"
+        # 不在 repr 中触发懒加载，科室未加载时只显示科室ID
+        department = self.__dict__.get('department')
+        target = department.name if department is not None else f'department_id={self.department_id}'
+        return f"<DiseaseMapping {self.disease_name} -> {target}>"
 
 class DiseaseSynonym(db.Model):
     __tablename__ = 'disease_synonyms'
@@ -35,5 +70,54 @@ class DiseaseSynonym(db.Model):
     mapping_id = db.Column(db.Integer, db.ForeignKey('disease_mappings.id'), nullable=False)
     synonym = db.Column(db.String(200), nullable=False, index=True)  # 同义词/别名
     similarity_score = db.Column(db.Float, default=1.0)  # 相似度分数
+    name_key = db.Column(db.String(200), index=True, default=_key_default('synonym'))  # 归一化同义词
+
+    # 同一映射下同义词不重复；以 mapping_id 开头，同时充当 mapping_id 的索引
+    __table_args__ = (
+        db.Index('uq_disease_synonyms_mapping_synonym', mapping_id, synonym, unique=True),
+    )
+
+    @db.validates('synonym')
+    def _set_name_key(self, key, value):
+        self.name_key = normalize_name(value)
+        return value
     
-    mapping = db.relationship('DiseaseMapping', backref='synonyms')
+    # 同义词 -> 映射 -> 科室 一条 JOIN 查询读出
+    mapping = db.relationship(
+        'DiseaseMapping', lazy='joined', innerjoin=True,
+        backref=db.backref('synonyms', lazy='select'),
+    )
+
+    def __repr__(self):
+        return f"<DiseaseSynonym {self.synonym} -> mapping_id={self.mapping_id}>"
+
+
+# 表名 -> name_key 的来源列
+KEY_SOURCES = {
+    Department.__tablename__: 'name',
+    DiseaseMapping.__tablename__: 'disease_name',
+    DiseaseSynonym.__tablename__: 'synonym',
+}
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _sync_name_key(state):
+    """批量 update() 不经过 @validates，修改名称时在同一条语句中补上 name_key。
+
+    列上的 onupdate 做不到：它在每条未设置 name_key 的 UPDATE（包括只改可信度的）中都会执行，
+    而此时语句里没有名称可算。名称是 SQL 表达式时无法在 Python 中计算，需要调用方自行给出 name_key
+    """
+    if not state.is_update:
+        return
+    source = KEY_SOURCES.get(getattr(state.statement.table, 'name', None))
+    if source is None:
+        return
+    if isinstance(state.parameters, list):  # 按主键批量更新（executemany）
+        state.parameters = [
+            dict(row, name_key=normalize_name(row[source])) if source in row and 'name_key' not in row else row
+            for row in state.parameters
+        ]
+        return
+    values = state.statement.compile().params
+    if source in values and 'name_key' not in values:
+        state.statement = state.statement.values(name_key=normalize_name(values[source]))
@@ -0,0 +1,14 @@
+import unicodedata
+
+
+def normalize_name(name):
+    """疾病名/同义词的归一化键：全角转半角、去除空白、忽略大小写"""
+    if not name:
+        return ''
+    name = unicodedata.normalize('NFKC', name)
+    return ''.join(name.split()).casefold()
+
+
+def canonical_symptoms(symptoms):
+    """症状列表的规范形式：逐项归一化、去重、排序，与前端选择顺序无关"""
+    return tuple(sorted({key for key in map(normalize_name, symptoms) if key}))
@@ -0,0 +1,346 @@
+# 合作方模型 API 客户端
+# 由 app 持有（第一次调用合作方时创建），每个 worker 一个实例：连接池复用 keep-alive 连接、连接/读取超时分开、
+# 指数退避加抖动重试、熔断器在合作方故障时快速失败
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import requests
+from flask import current_app
+from requests.adapters import HTTPAdapter
+
+from partner_errors import PartnerAPIError, PartnerUnavailableError
+
+EXTENSION_KEY = 'partner_client'
+
+_init_lock = threading.Lock()
+
+
+def backoff_delay(attempt, base, cap):
+    """full jitter：在 [0, min(上限, base * 2^attempt)] 内随机取等待时间"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """连续失败达到阈值后打开；冷却期过后放行一个探测请求（半开），成功则关闭"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.rejected = 0
+        self.trips = 0
+        self._probing = False
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self._clock() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.trips += 1
+                self.state = self.OPEN
+                self.opened_at = self._clock()
+                self._probing = False
+
+    def release(self):
+        """调用方放弃了请求（被取消或本地异常），没有得到合作方的结果：只释放半开探测名额，不改变状态"""
+        with self._lock:
+            self._probing = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.failures,
+                'trips': self.trips,
+                'rejected': self.rejected,
+            }
+
+
+# 可重试的传输层错误：连接失败、超时、响应体传输中断或解码失败
+RETRYABLE_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.ContentDecodingError,
+)
+
+
+class PartnerClient:
+    """合作方分类接口客户端，线程安全"""
+
+    def __init__(self, url, connect_timeout=3.0, read_timeout=30.0, max_attempts=3,
+                 pool_size=10, backoff_base=0.2, backoff_max=5.0, breaker=None,
+                 batch_url=None, batch_size=1, max_parallel=4):
+        self.url = url
+        self.batch_url = batch_url
+        self.batch_size = max(1, batch_size)
+        # 批量并发不能超过连接池大小，否则只是在连接池上排队
+        self.max_parallel = max(1, min(max_parallel, pool_size))
+        self._executor = None
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.pool_size = pool_size
+
+        # pool_block=True：并发超过连接池大小时排队等待，而不是临时新建再丢弃连接
+        self._adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount('http://', self._adapter)
+        self.session.mount('https://', self._adapter)
+
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+        self.retries = 0
+        self.in_flight = 0
+
+    def _sleep_backoff(self, attempt, deadline=None):
+        delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+        if deadline is not None:
+            delay = min(delay, max(0.0, deadline - time.monotonic()))
+        time.sleep(delay)
+
+    def _count(self, name, delta=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + delta)
+
+    def _attempt_timeout(self, timeout, deadline):
+        """本次尝试的 (连接, 读取) 超时；给定 deadline（time.monotonic 时间）时不超过剩余时间，已到期返回 None"""
+        timeout = timeout or self.timeout
+        if deadline is None:
+            return timeout
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        if isinstance(timeout, tuple):
+            return tuple(min(t, remaining) for t in timeout)
+        return min(timeout, remaining)
+
+    def post(self, payload, url=None, timeout=None, deadline=None):
+        """发送请求并返回解析后的 JSON；连接错误、超时和 5xx 会重试，4xx 直接失败
+
+        deadline 为整个调用（含重试和退避）的截止时间，每次尝试的超时取剩余时间，到期不再重试。
+        所有失败都以 PartnerAPIError 抛出；熔断器的结果记录放在 finally 中，
+        任何异常退出都不会让半开状态的探测名额一直被占用。
+        """
+        if not self.breaker.allow():
+            raise PartnerUnavailableError('合作方接口熔断中，暂停调用')
+
+        reachable = None  # True: 合作方给出了明确响应；False: 重试耗尽；None: 未得出结论
+        last_error = None
+        attempts = 0
+        try:
+            for attempt in range(self.max_attempts):
+                if attempt:
+                    self._count('retries')
+                    self._sleep_backoff(attempt - 1, deadline)
+                attempt_timeout = self._attempt_timeout(timeout, deadline)
+                if attempt_timeout is None:
+                    last_error = last_error or '超出调用截止时间'
+                    break
+                attempts += 1
+                self._count('requests')
+                self._count('in_flight')
+                try:
+                    response = self.session.post(url or self.url, json=payload, timeout=attempt_timeout)
+                except RETRYABLE_ERRORS as e:
+                    last_error = e
+                    continue
+                except requests.RequestException as e:
+                    # 请求无法发出（URL 非法、重定向过多等），重试没有意义
+                    last_error = e
+                    break
+                finally:
+                    self._count('in_flight', -1)
+
+                if response.status_code >= 500:
+                    last_error = PartnerAPIError(f'合作方接口返回 {response.status_code}')
+                    continue
+                if response.status_code >= 400:
+                    # 请求本身有问题，重试没有意义；合作方是可达的，不计入熔断
+                    reachable = True
+                    self._count('failures')
+                    raise PartnerAPIError(f'合作方接口返回 {response.status_code}: {response.text[:200]}')
+                try:
+                    data = response.json()
+                except ValueError as e:
+                    last_error = PartnerAPIError(f'合作方接口返回非 JSON 内容: {e}')
+                    continue
+                reachable = True
+                return data
+
+            # 一次都没发出（截止时间已过）时不计入熔断
+            reachable = False if attempts else None
+            self._count('failures')
+            raise PartnerAPIError(f'合作方接口调用失败（{attempts} 次尝试）: {last_error}')
+        finally:
+            if reachable:
+                self.breaker.record_success()
+            elif reachable is False:
+                self.breaker.record_failure()
+            else:
+                self.breaker.release()
+
+    def classify(self, symptoms, deadline=None):
+        """返回 {'disease': ..., 'confidence': ...}"""
+        return parse_classification(self.post({'symptoms': list(symptoms)}, deadline=deadline))
+
+    def classify_many(self, symptom_lists, deadline=None):
+        """批量分类，返回与输入顺序一致的列表，单项失败时对应位置为异常对象
+
+        配置了 PARTNER_API_BATCH_URL 时按 batch_size 分块调用合作方批量接口，
+        否则逐条调用；两种方式的并发都受 max_parallel 限制。
+        deadline 含义同 post，对整个批次生效：等待并发名额时已过截止时间的请求不再发出。
+        """
+        symptom_lists = [list(s) for s in symptom_lists]
+        if not symptom_lists:
+            return []
+        if self.batch_url and self.batch_size > 1:
+            chunks = [symptom_lists[i:i + self.batch_size] for i in range(0, len(symptom_lists), self.batch_size)]
+            results = []
+            for chunk_result in self._map(partial(self._classify_chunk, deadline=deadline), chunks):
+                results.extend(chunk_result)
+            return results
+        return list(self._map(partial(self._classify_one, deadline=deadline), symptom_lists))
+
+    def _map(self, fn, items):
+        if len(items) == 1 or self.max_parallel == 1:
+            return map(fn, items)
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.max_parallel, thread_name_prefix='partner')
+        return self._executor.map(fn, items)
+
+    def _classify_one(self, symptoms, deadline=None):
+        try:
+            return self.classify(symptoms, deadline=deadline)
+        except PartnerAPIError as e:
+            return e
+
+    def _classify_chunk(self, chunk, deadline=None):
+        """批量接口约定：请求 {'batch': [症状列表...]}，返回 {'results': [分类结果...]}"""
+        try:
+            data = self.post({'batch': chunk}, url=self.batch_url, deadline=deadline)
+            results = data.get('results') if isinstance(data, dict) else None
+            if not isinstance(results, list) or len(results) != len(chunk):
+                raise PartnerAPIError('合作方批量接口返回条数与请求不一致')
+        except PartnerAPIError as e:
+            return [e] * len(chunk)
+        parsed = []
+        for item in results:
+            try:
+                parsed.append(parse_classification(item))
+            except PartnerAPIError as e:
+                parsed.append(e)
+        return parsed
+
+    def pool_stats(self):
+        pools = []
+        for key in list(self._adapter.poolmanager.pools.keys()):
+            pool = self._adapter.poolmanager.pools.get(key)
+            if pool is None:
+                continue
+            idle = sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool else 0
+            pools.append({
+                'host': pool.host,
+                'port': pool.port,
+                'maxsize': self.pool_size,
+                'connections_opened': pool.num_connections,
+                'requests': pool.num_requests,
+                'idle': idle,
+            })
+        return pools
+
+    def stats(self):
+        with self._lock:
+            counters = {
+                'requests': self.requests,
+                'failures': self.failures,
+                'retries': self.retries,
+                'in_flight': self.in_flight,
+            }
+        counters['pool'] = self.pool_stats()
+        counters['breaker'] = self.breaker.stats()
+        return counters
+
+
+def parse_classification(data):
+    """兼容合作方直接返回或包在 classification/data 字段中的结果"""
+    if isinstance(data, dict):
+        for wrapper in ('classification', 'data'):
+            if isinstance(data.get(wrapper), dict):
+                data = data[wrapper]
+                break
+    if not isinstance(data, dict) or not data.get('disease'):
+        raise PartnerAPIError(f'合作方返回结果缺少疾病名: {data!r}'[:300])
+    confidence = data.get('confidence')
+    if confidence is not None:
+        try:
+            confidence = float(confidence)
+        except (TypeError, ValueError):
+            raise PartnerAPIError(f'合作方返回的可信度不是数值: {confidence!r}'[:300]) from None
+    return {'disease': data['disease'], 'confidence': confidence}
+
+
+def init_partner_client(app):
+    app.extensions[EXTENSION_KEY] = PartnerClient(
+        app.config['PARTNER_API_URL'],
+        connect_timeout=app.config['PARTNER_API_CONNECT_TIMEOUT'],
+        read_timeout=app.config['PARTNER_API_TIMEOUT'],
+        max_attempts=app.config['PARTNER_API_RETRY'],
+        pool_size=app.config['PARTNER_API_POOL_SIZE'],
+        backoff_base=app.config['PARTNER_API_BACKOFF_BASE'],
+        backoff_max=app.config['PARTNER_API_BACKOFF_MAX'],
+        breaker=CircuitBreaker(
+            failure_threshold=app.config['PARTNER_BREAKER_FAILURE_THRESHOLD'],
+            reset_timeout=app.config['PARTNER_BREAKER_RESET_TIMEOUT'],
+        ),
+        batch_url=app.config['PARTNER_API_BATCH_URL'],
+        batch_size=app.config['PARTNER_API_BATCH_SIZE'],
+        max_parallel=app.config['PARTNER_API_MAX_PARALLEL'],
+    )
+
+
+def get_partner_client():
+    """第一次调用合作方时按配置创建客户端，启动时不导入 requests、不建连接池"""
+    app = current_app._get_current_object()
+    client = app.extensions.get(EXTENSION_KEY)
+    if client is None:
+        with _init_lock:
+            if EXTENSION_KEY not in app.extensions:
+                init_partner_client(app)
+        client = app.extensions[EXTENSION_KEY]
+    return client
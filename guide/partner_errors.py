@@ -0,0 +1,10 @@
+# 合作方调用的异常类型
+# 单独成模块，路由和分类流程捕获异常时不必导入 requests（partner_client 在第一次调用合作方时才导入）
+
+
+class PartnerAPIError(Exception):
+    """合作方调用失败（重试耗尽或返回不可用的结果）"""
+
+
+class PartnerUnavailableError(PartnerAPIError):
+    """熔断器打开，未实际发出请求"""
@@ -0,0 +1,60 @@
+# 每个请求的 SQL 条数与数据库耗时
+# 通过引擎的 before/after_cursor_execute 事件累计到 flask.g，请求结束时（after_request）写入日志；
+# 超过 SQL_REQUEST_WARN_QUERIES 条时记 warning，便于发现 N+1 之类的回归。
+# ASGI 模式的 POST /classify/ 同样在 Flask 请求上下文中执行（见 asgi.py），一并统计
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+from exts import db
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _finish(conn)
+
+
+def _handle_error(exception_context):
+    """执行出错时不会触发 after_cursor_execute，在这里弹出开始时间，否则残留在连接上，之后的计时全部错位"""
+    if exception_context.connection is not None and exception_context.execution_context is not None:
+        _finish(exception_context.connection)
+
+
+def _finish(conn):
+    if not has_request_context():
+        return
+    starts = conn.info.get('query_start')
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    g.sql_count = g.get('sql_count', 0) + 1
+    g.sql_time = g.get('sql_time', 0.0) + elapsed
+
+
+def query_stats():
+    """当前请求到目前为止的 (SQL 条数, 数据库耗时秒)"""
+    return g.get('sql_count', 0), g.get('sql_time', 0.0)
+
+
+def init_query_stats(app):
+    """在 db.init_app(app) 之后调用"""
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
+    warn_at = app.config['SQL_REQUEST_WARN_QUERIES']
+
+    @app.after_request
+    def log_query_stats(response):
+        count, seconds = query_stats()
+        if count:
+            log = app.logger.warning if warn_at and count > warn_at else app.logger.info
+            log('%s %s -> %d: %d SQL, %.1f ms DB', request.method, request.path,
+                response.status_code, count, seconds * 1000)
+        return response
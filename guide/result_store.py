@@ -0,0 +1,150 @@
+# 分类结果 / 会话缓存
+# 替代原来的普通字典：条目数与字节数硬上限、LRU 淘汰、按条目过期（最小堆，无全量扫描）、线程安全
+import heapq
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+EXTENSION_KEY = 'result_store'
+
+
+def _sizeof(value):
+    """按 JSON 序列化后的字节数估算条目大小"""
+    return len(json.dumps(value, ensure_ascii=False, default=str).encode('utf-8'))
+
+
+class ResultStore:
+    """带 TTL 的 LRU 存储
+
+    - get/set/delete 均为 O(1)（过期清理为摊还 O(log n)）
+    - 过期时间放在最小堆中，每次写入只弹出已到期的堆顶，不做全量扫描
+    - 存入的值视为只读，get 直接返回同一对象
+    - 单个值超过 max_bytes 时不写入（也不淘汰其他条目），set 返回 False
+    """
+
+    def __init__(self, ttl=600, max_entries=10000, max_bytes=64 * 1024 * 1024, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._data = OrderedDict()  # key -> (value, expires_at, size)
+        self._expiry = []           # (expires_at, key)，被覆盖/淘汰的旧条目惰性删除
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.oversized = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[1] <= self._clock():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, ttl=None):
+        """写入成功返回 True；值本身超过 max_bytes 时返回 False，同一键的旧值一并删除以免读到过期内容"""
+        size = _sizeof(value)
+        with self._lock:
+            now = self._clock()
+            if key in self._data:
+                self._remove(key)
+            if size > self.max_bytes:
+                self.oversized += 1
+                return False
+            expires_at = now + (self.ttl if ttl is None else ttl)
+            self._data[key] = (value, expires_at, size)
+            self._bytes += size
+            heapq.heappush(self._expiry, (expires_at, key))
+            self._purge(now)
+            while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+            if len(self._expiry) > 2 * len(self._data) + 64:
+                self._compact()
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            if key not in self._data:
+                return False
+            self._remove(key)
+            return True
+
+    def purge_expired(self):
+        """清理已过期条目，返回清理数量；只处理到期部分，可被定时任务频繁调用"""
+        with self._lock:
+            return self._purge(self._clock())
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._expiry.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._data),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'expirations': self.expirations,
+                'evictions': self.evictions,
+                'oversized': self.oversized,
+            }
+
+    # 以下方法须在持有锁时调用
+    def _remove(self, key):
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+
+    def _purge(self, now):
+        removed = 0
+        heap = self._expiry
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            entry = self._data.get(key)
+            if entry is not None and entry[1] == expires_at:
+                self._remove(key)
+                self.expirations += 1
+                removed += 1
+        return removed
+
+    def _compact(self):
+        """堆中失效记录过多时重建，避免堆随覆盖写无限增长"""
+        self._expiry = [(entry[1], key) for key, entry in self._data.items()]
+        heapq.heapify(self._expiry)
+
+
+def init_result_store(app, clock=time.monotonic):
+    """clock 可替换为可控时钟，用于在不等待的情况下测试过期"""
+    app.extensions[EXTENSION_KEY] = ResultStore(
+        ttl=app.config['RESULT_CACHE_TTL'],
+        max_entries=app.config['RESULT_CACHE_MAX_ENTRIES'],
+        max_bytes=app.config['RESULT_CACHE_MAX_BYTES'],
+        clock=clock,
+    )
+
+
+def get_result_store():
+    return current_app.extensions[EXTENSION_KEY]
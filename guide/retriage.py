@@ -0,0 +1,155 @@
+# 历史分诊数据批量重评估
+# 调整 triage.py 中的规则后，用新旧两套规则对历史 /triage/ 输入整体重新分级，输出各级别差异报告。
+# 输入先编码为列式数组（位掩码 + 持续时间），每条规则对全量数据做一次向量化判断，不逐条调用 evaluate_triage
+# 用法: python retriage.py history.jsonl --rules new_rules.json [--baseline-rules old.json | --against-recorded]
+#       历史文件每行一个 /triage/ 请求体，可带 "level" 或 "triage_result": {"level": ...} 记录当时的级别
+import argparse
+import json
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from triage import DEFAULT_LEVEL, RULES, SUGGESTED_TIME, encode_flags, load_rules, triage_inputs
+
+Columns = namedtuple('Columns', ['flags', 'duration', 'recorded_level'])
+
+
+def read_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def recorded_level(data):
+    """历史记录中的级别：缺失为 0，不是 1~4 的整数（写错的、字符串等）为 -1"""
+    level = data.get('level') or (data.get('triage_result') or {}).get('level')
+    if level is None:
+        return 0
+    if isinstance(level, bool) or not isinstance(level, int) or level not in SUGGESTED_TIME:
+        return -1
+    return level
+
+
+def encode_records(records):
+    """历史请求 -> 列式数组；缺失的持续时间记为 NaN，历史级别见 recorded_level"""
+    flags, duration, recorded = [], [], []
+    for data in records:
+        inputs = triage_inputs(data)
+        flags.append(encode_flags(
+            inputs['pain'], inputs['vision_changes'], inputs['associated_symptoms'],
+            inputs['trauma_history'], inputs['chemical_exposure'],
+        ))
+        hours = inputs['duration_hours']
+        duration.append(float(hours) if isinstance(hours, (int, float)) else np.nan)
+        recorded.append(recorded_level(data))
+    return Columns(
+        np.array(flags, dtype=np.uint32),
+        np.array(duration, dtype=np.float32),
+        np.array(recorded, dtype=np.int8),
+    )
+
+
+def load_columns(path):
+    """.npz 为 save_columns 保存的列式缓存，其余按 JSONL 解析"""
+    if path.endswith('.npz'):
+        with np.load(path) as data:
+            return Columns(data['flags'], data['duration'], data['recorded_level'])
+    return encode_records(read_jsonl(path))
+
+
+def save_columns(path, columns):
+    np.savez_compressed(path, flags=columns.flags, duration=columns.duration, recorded_level=columns.recorded_level)
+
+
+def match_rules(flags, duration, rules=RULES):
+    """向量化的 triage.match_rule：返回每行第一条命中规则的下标，未命中为 len(rules)"""
+    index = np.full(len(flags), len(rules), dtype=np.int16)
+    # 倒序覆盖，最终留下的是顺序最靠前的命中规则
+    for i in range(len(rules) - 1, -1, -1):
+        rule = rules[i]
+        hit = (flags & rule.all_mask) == rule.all_mask
+        if rule.any_mask:
+            hit &= (flags & rule.any_mask) != 0
+        if rule.max_hours is not None:
+            hit &= duration < rule.max_hours  # NaN 比较结果为 False，与单条评估一致
+        index[hit] = i
+    return index
+
+
+def evaluate_levels(columns, rules=RULES):
+    levels = np.array([rule.level for rule in rules] + [DEFAULT_LEVEL], dtype=np.int8)
+    return levels[match_rules(columns.flags, columns.duration, rules)]
+
+
+def diff_report(before, after):
+    """两组级别的对比：各级别数量、级别转移矩阵、升级（更紧急）/降级数量
+
+    任一侧不是有效级别（SUGGESTED_TIME 中的 1~4）的记录不参与统计，数量记在 invalid 中。
+    """
+    levels = sorted(SUGGESTED_TIME)
+    before, after = np.asarray(before, dtype=np.int64), np.asarray(after, dtype=np.int64)
+    valid = np.isin(before, levels) & np.isin(after, levels)
+    invalid = int(len(valid) - np.count_nonzero(valid))
+    before, after = before[valid], after[valid]
+    size = max(levels) + 1
+    transitions = np.bincount(before * size + after, minlength=size * size).reshape(size, size)
+    return {
+        'total': int(len(after)),
+        'invalid': invalid,
+        'changed': int(np.count_nonzero(before != after)),
+        'more_urgent': int(np.count_nonzero(after < before)),
+        'less_urgent': int(np.count_nonzero(after > before)),
+        'before': {str(level): int(np.count_nonzero(before == level)) for level in levels},
+        'after': {str(level): int(np.count_nonzero(after == level)) for level in levels},
+        'transitions': {
+            str(b): {str(a): int(transitions[b, a]) for a in levels if transitions[b, a]}
+            for b in levels if transitions[b].any()
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='用新规则批量重评估历史分诊数据')
+    parser.add_argument('history', help='历史分诊输入（JSONL 或 .npz 列式缓存）')
+    parser.add_argument('--rules', help='新规则 JSON，缺省为 triage.py 中的当前规则')
+    parser.add_argument('--baseline-rules', help='对比基准规则 JSON，缺省为 triage.py 中的当前规则')
+    parser.add_argument('--against-recorded', action='store_true', help='与历史记录中的级别对比')
+    parser.add_argument('--save-columns', help='把编码后的列式数据保存为 .npz，下次直接加载')
+    parser.add_argument('--output', help='报告输出路径，缺省打印到标准输出')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    columns = load_columns(args.history)
+    encoded = time.perf_counter()
+    if args.save_columns:
+        save_columns(args.save_columns, columns)
+
+    candidate = load_rules(args.rules) if args.rules else RULES
+    after = evaluate_levels(columns, candidate)
+    if args.against_recorded:
+        known = columns.recorded_level != 0  # 写错的级别（-1）保留，在报告的 invalid 中计数
+        before, after = columns.recorded_level[known], after[known]
+    else:
+        before = evaluate_levels(columns, load_rules(args.baseline_rules) if args.baseline_rules else RULES)
+    evaluated = time.perf_counter()
+
+    report = diff_report(before, after)
+    report['timing'] = {
+        'load_seconds': round(encoded - start, 3),
+        'evaluate_seconds': round(evaluated - encoded, 3),
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,142 @@
+# 分类结果/会话存储后端
+# local：进程内 ResultStore，仅适用于单进程部署
+# redis：Redis 协议后端，多 worker/多主机共享 result_id，过期交给 Redis 原生 TTL
+import json
+import threading
+
+from flask import current_app
+
+from result_store import EXTENSION_KEY as RESULT_STORE_KEY
+
+EXTENSION_KEY = 'session_backend'
+
+
+class LocalSessionBackend:
+    """基于进程内 ResultStore 的后端"""
+
+    name = 'local'
+
+    def __init__(self, store):
+        self.store = store
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ttl=None):
+        self.store.set(key, value, ttl)
+
+    def delete(self, key):
+        return self.store.delete(key)
+
+    def get_many(self, keys):
+        return [self.store.get(key) for key in keys]
+
+    def set_many(self, items, ttl=None):
+        for key, value in items:
+            self.store.set(key, value, ttl)
+
+    def stats(self):
+        stats = self.store.stats()
+        stats['backend'] = self.name
+        return stats
+
+
+class RedisSessionBackend:
+    """Redis 协议后端：连接池复用连接，批量读写走 MGET / pipeline，值以 JSON 存储"""
+
+    name = 'redis'
+
+    def __init__(self, url, ttl=600, prefix='guide:result:', pool_size=16, socket_timeout=2.0):
+        import redis
+
+        self.ttl = ttl
+        self.prefix = prefix
+        self.pool = redis.BlockingConnectionPool.from_url(
+            url,
+            max_connections=pool_size,
+            timeout=socket_timeout,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=socket_timeout,
+            protocol=2,
+        )
+        self.client = redis.Redis(connection_pool=self.pool)
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, key):
+        return self.prefix + key
+
+    def _ttl_ms(self, ttl):
+        return int((self.ttl if ttl is None else ttl) * 1000)
+
+    def _decode(self, raws):
+        """JSON 解码并在锁内累计命中/未命中"""
+        values = [None if raw is None else json.loads(raw) for raw in raws]
+        misses = values.count(None)
+        with self._stats_lock:
+            self.hits += len(values) - misses
+            self.misses += misses
+        return values
+
+    def get(self, key):
+        return self._decode([self.client.get(self._key(key))])[0]
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self._key(key), json.dumps(value, ensure_ascii=False), px=self._ttl_ms(ttl))
+
+    def delete(self, key):
+        return bool(self.client.delete(self._key(key)))
+
+    def get_many(self, keys):
+        """一次 MGET 取回多个会话，结果与 keys 顺序一致，缺失/过期为 None"""
+        if not keys:
+            return []
+        return self._decode(self.client.mget([self._key(k) for k in keys]))
+
+    def set_many(self, items, ttl=None):
+        """多条写入合并为一次 pipeline 往返"""
+        px = self._ttl_ms(ttl)
+        pipe = self.client.pipeline(transaction=False)
+        for key, value in items:
+            pipe.set(self._key(key), json.dumps(value, ensure_ascii=False), px=px)
+        pipe.execute()
+
+    def stats(self):
+        with self._stats_lock:
+            stats = {'backend': self.name, 'hits': self.hits, 'misses': self.misses,
+                     'pool_max_connections': self.pool.max_connections}
+        stats.update(self._pool_usage())
+        return stats
+
+    def _pool_usage(self):
+        """连接池用量；redis-py 没有公开计数，读取 BlockingConnectionPool 的内部属性，版本不同取不到时省略"""
+        connections = getattr(self.pool, '_connections', None)
+        queue = getattr(getattr(self.pool, 'pool', None), 'queue', None)
+        if connections is None or queue is None:
+            return {}
+        created = len(connections)
+        # 队列里预先放了 None 占位，非 None 的才是空闲连接
+        idle = sum(1 for conn in list(queue) if conn is not None)
+        return {'pool_created_connections': created, 'pool_in_use_connections': created - idle}
+
+
+def init_session_backend(app):
+    """按 SESSION_BACKEND 配置创建后端；local 复用 create_app() 中的 ResultStore"""
+    backend = app.config['SESSION_BACKEND']
+    if backend == 'redis':
+        app.extensions[EXTENSION_KEY] = RedisSessionBackend(
+            app.config['SESSION_REDIS_URL'],
+            ttl=app.config['RESULT_CACHE_TTL'],
+            prefix=app.config['SESSION_KEY_PREFIX'],
+            pool_size=app.config['SESSION_REDIS_POOL_SIZE'],
+            socket_timeout=app.config['SESSION_REDIS_TIMEOUT'],
+        )
+    elif backend == 'local':
+        app.extensions[EXTENSION_KEY] = LocalSessionBackend(app.extensions[RESULT_STORE_KEY])
+    else:
+        raise ValueError(f"未知的 SESSION_BACKEND: {backend}")
+
+
+def get_session_backend():
+    return current_app.extensions[EXTENSION_KEY]
@@ -0,0 +1,165 @@
+# 相同键的并发调用合并（single-flight）
+# 同一时刻相同症状组合只有一个合作方请求在途，其余请求等待并共享结果；
+# 线程（WSGI）和协程（ASGI，do_async）共用同一组在途调用
+import asyncio
+import threading
+
+from flask import current_app
+
+EXTENSION_KEY = 'classify_singleflight'
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'error', 'waiters', 'futures')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+        self.futures = []  # 协程等待者的 (事件循环, Future)
+
+    def finish(self):
+        """唤醒所有等待者；须在调用已从 SingleFlight._calls 移除后执行，此后不会再有新的等待者"""
+        self.event.set()
+        for loop, future in self.futures:
+            loop.call_soon_threadsafe(_wake, future)
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class SingleFlight:
+    """线程安全；结果只在调用期间共享，调用结束即移除，不做缓存"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.leaders = 0
+        self.shared = 0
+
+    def do(self, key, fn, *args):
+        """返回 (结果, 是否复用了其他请求的结果)；fn 抛出的异常会传给所有等待者"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                call.waiters += 1
+                self.shared += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args)
+            return call.result, False
+        except BaseException as e:  # 包括 KeyboardInterrupt、GeneratorExit 等，等待者不能当作成功结果
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.finish()
+
+    async def do_async(self, key, fn, *args):
+        """do 的 asyncio 版本，fn 为协程函数；等待其他线程或协程的在途调用时不阻塞事件循环"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                call.waiters += 1
+                self.shared += 1
+                future = loop.create_future()
+                call.futures.append((loop, future))
+
+        if not leader:
+            await future
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = await fn(*args)
+            return call.result, False
+        except BaseException as e:  # 包括 KeyboardInterrupt、GeneratorExit 等，等待者不能当作成功结果
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.finish()
+
+    def do_many(self, items, fn):
+        """批量版本：items 为 {键: 参数}
+
+        已有在途调用的键等待其结果；其余键由本次调用负责，参数一次性交给 fn(参数列表)，
+        fn 返回与参数顺序一致的结果列表，单项失败时对应位置为异常对象。
+        返回 ({键: 结果或异常对象}, 复用了其他请求结果的键数)。
+        """
+        led, joined = {}, {}
+        with self._lock:
+            for key in items:
+                call = self._calls.get(key)
+                if call is None:
+                    led[key] = self._calls[key] = _Call()
+                    self.leaders += 1
+                else:
+                    call.waiters += 1
+                    self.shared += 1
+                    joined[key] = call
+
+        outcomes = {}
+        try:
+            if led:
+                for (key, call), outcome in zip(led.items(), fn([items[key] for key in led])):
+                    if isinstance(outcome, Exception):
+                        call.error = outcome
+                    else:
+                        call.result = outcome
+                    outcomes[key] = outcome
+        except BaseException as e:
+            for key, call in led.items():
+                if key not in outcomes:
+                    call.error = e
+            raise
+        finally:
+            with self._lock:
+                for key in led:
+                    self._calls.pop(key, None)
+            for call in led.values():
+                call.finish()
+
+        for key, call in joined.items():
+            call.event.wait()
+            if call.error is not None and not isinstance(call.error, Exception):
+                raise call.error  # 负责的调用被中断，不作为单项失败返回
+            outcomes[key] = call.error if call.error is not None else call.result
+        return outcomes, len(joined)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'leaders': self.leaders,
+                'shared': self.shared,
+            }
+
+
+def init_singleflight(app):
+    app.extensions[EXTENSION_KEY] = SingleFlight()
+
+
+def get_singleflight():
+    return current_app.extensions[EXTENSION_KEY]
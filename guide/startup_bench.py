@@ -0,0 +1,95 @@
+# 冷启动基准：在全新的 Python 进程中测量 import 耗时、create_app() 耗时和第一个请求的耗时
+# 多次运行取中位数，超过预算时返回非 0，可放在 CI 或发布前检查中
+# 用法: python startup_bench.py [--runs 5] [--budget-ms 1500] [--path /metrics/] [--config production]
+#       python startup_bench.py --importtime   # 同时列出累计耗时最多的模块
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# 子进程中执行的测量代码；结果以一行 JSON 输出到标准输出
+CHILD = r'''
+import json, sys, time
+start = time.perf_counter()
+import app as app_module
+imported = time.perf_counter()
+application = app_module.create_app(sys.argv[1] or None)
+created = time.perf_counter()
+response = application.test_client().open(sys.argv[3], method=sys.argv[2])
+done = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'first_request_ms': (done - created) * 1000,
+    'total_ms': (done - start) * 1000,
+    'status': response.status_code,
+    'modules': len(sys.modules),
+}))
+'''
+
+
+def run_once(config, method, path, importtime=False):
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ['-X', 'importtime']
+    cmd += ['-c', CHILD, config or '', method, path]
+    proc = subprocess.run(cmd, cwd=HERE, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f'启动失败:\n{proc.stderr[-2000:]}')
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    if importtime:
+        result['slowest_imports'] = slowest_imports(proc.stderr)
+    return result
+
+
+def slowest_imports(stderr, top=10):
+    """解析 -X importtime 输出，返回 app 直接导入的模块中累计耗时最多的 [(模块, 毫秒)]"""
+    children = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # 每层嵌套多缩进两格；子模块先于父模块输出，遇到顶层模块时结算
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0:
+            if name.strip() == 'app':
+                return sorted(children, key=lambda m: -m[1])[:top]
+            children = []
+        elif depth == 1:
+            children.append((name.strip(), int(cumulative) / 1000))
+    return []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='应用冷启动耗时基准')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=1500, help='total_ms 中位数的预算')
+    parser.add_argument('--config', default=None, help='create_app 的配置名，缺省取 FLASK_ENV')
+    parser.add_argument('--method', default='GET')
+    parser.add_argument('--path', default='/metrics/', help='第一个请求的路径')
+    parser.add_argument('--importtime', action='store_true', help='最后一次运行附带 -X importtime 统计')
+    args = parser.parse_args(argv)
+
+    runs = [run_once(args.config, args.method, args.path) for _ in range(args.runs)]
+    keys = ('import_ms', 'create_app_ms', 'first_request_ms', 'total_ms')
+    report = {
+        'runs': args.runs,
+        'median': {k: round(statistics.median(r[k] for r in runs), 1) for k in keys},
+        'max': {k: round(max(r[k] for r in runs), 1) for k in keys},
+        'first_request_status': runs[-1]['status'],
+        'modules_loaded': runs[-1]['modules'],
+        'budget_ms': args.budget_ms,
+    }
+    if args.importtime:
+        report['slowest_imports'] = run_once(args.config, args.method, args.path, importtime=True)['slowest_imports']
+    report['within_budget'] = report['median']['total_ms'] <= args.budget_ms
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0 if report['within_budget'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
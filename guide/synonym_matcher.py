@@ -0,0 +1,91 @@
+# 多模式匹配（Aho-Corasick 自动机）
+# 一次线性扫描找出文本中出现的全部疾病名/同义词，用于合作方输出和用户自由文本
+from collections import deque, namedtuple
+
+from normalize import normalize_name
+
+Match = namedtuple('Match', ['start', 'end', 'term', 'disease_name', 'score'])
+
+
+def _is_word_char(ch):
+    return ch.isascii() and ch.isalnum()
+
+
+class SynonymMatcher:
+    """编译后的只读自动机，构建后线程安全"""
+
+    __slots__ = ('_goto', '_fail', '_out', 'pattern_count')
+
+    def __init__(self, patterns):
+        """patterns: 可迭代的 (词条, 标准疾病名, 权重)，权重即 similarity_score"""
+        self._goto = [{}]
+        self._out = [()]
+        self.pattern_count = 0
+        for term, disease_name, score in patterns:
+            key = normalize_name(term)
+            if key:
+                self._add(key, (key, disease_name, 1.0 if score is None else score))
+        self._fail = self._link()
+
+    def _add(self, key, payload):
+        node = 0
+        for ch in key:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._out.append(())
+            node = nxt
+        if payload not in self._out[node]:
+            self._out[node] += (payload,)
+            self.pattern_count += 1
+
+    def _link(self):
+        """BFS 构建失配指针，并把后缀节点的输出合并到当前节点"""
+        fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                f = fail[node]
+                while f and ch not in self._goto[f]:
+                    f = fail[f]
+                link = self._goto[f].get(ch, 0)
+                fail[child] = link if link != child else 0
+                if self._out[fail[child]]:
+                    self._out[child] += self._out[fail[child]]
+        return fail
+
+    def find_all(self, text):
+        """返回文本中全部命中（位置基于归一化后的文本），按权重、长度降序"""
+        text = normalize_name(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        matches = []
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for key, disease_name, score in out[node]:
+                start = i - len(key) + 1
+                # 英文缩写（DR、KC 等）要求独立成词，避免误中 "dry" 之类的单词
+                if _is_word_char(key[0]) and start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if _is_word_char(key[-1]) and i + 1 < len(text) and _is_word_char(text[i + 1]):
+                    continue
+                matches.append(Match(start, i + 1, key, disease_name, score))
+        matches.sort(key=lambda m: (-m.score, -(m.end - m.start), m.start))
+        return matches
+
+    def find_best(self, text):
+        """去掉被更长命中完全覆盖的子串命中，例如“急性青光眼发作”中的“急性青光眼”"""
+        matches = self.find_all(text)
+        return [
+            m for m in matches
+            if not any(
+                o.start <= m.start and m.end <= o.end and (o.end - o.start) > (m.end - m.start)
+                for o in matches
+            )
+        ]
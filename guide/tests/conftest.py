@@ -0,0 +1,60 @@
+# guide/ 下的模块按扁平方式互相导入（与 python app.py 的运行方式一致），测试时把该目录加入 sys.path
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def partner():
+    """本地合作方替身（固定 5ms 延迟、无故障），返回 (MockPartner, 模型接口 URL)"""
+    from mock_partner import Catalog, MockPartner, Profile, serve_in_thread
+
+    mock = MockPartner(Catalog.from_seed(), Profile(latency='fixed:5', synonym_rate=0.0), seed=0)
+    server, base_url = serve_in_thread(mock)
+    yield mock, f'{base_url}/mock_api'
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def seeded_db(tmp_path):
+    """写入种子科室/疾病数据的 SQLite 文件，返回数据库 URL"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from add import bulk_seed
+    from exts import db
+
+    url = f"sqlite:///{tmp_path / 'guide.db'}"
+    engine = create_engine(url)
+    db.metadata.create_all(engine)
+    with Session(engine) as session:
+        bulk_seed(session)
+    engine.dispose()
+    return url
+
+
+@pytest.fixture
+def app(monkeypatch, seeded_db, partner):
+    from app import create_app
+    from app_config import Config, config
+
+    class TestingConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = seeded_db
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+        PARTNER_API_URL = partner[1]
+        PARTNER_API_TIMEOUT = 2
+        PARTNER_API_RETRY = 1
+        PARTNER_HEDGE_ENABLED = False
+
+    monkeypatch.setitem(config, 'testing', TestingConfig)
+    return create_app('testing')
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,65 @@
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+import add
+from add import bulk_seed
+from model import Department, DiseaseMapping, DiseaseSynonym
+
+
+@pytest.fixture
+def engine(seeded_db):
+    engine = create_engine(seeded_db)
+    yield engine
+    engine.dispose()
+
+
+def _counts(engine):
+    with Session(engine) as session:
+        return {model.__name__: session.scalar(select(func.count()).select_from(model))
+                for model in (Department, DiseaseMapping, DiseaseSynonym)}
+
+
+def test_bulk_seed_is_idempotent(engine):
+    before = _counts(engine)
+    with Session(engine) as session:
+        report = bulk_seed(session)
+    for name, stats in report.items():
+        assert stats['inserted'] == 0 and stats['updated'] == 0, name
+        assert stats['unchanged'] > 0
+    assert _counts(engine) == before
+
+
+def test_bulk_seed_updates_changed_rows_only(engine):
+    mappings = [dict(dm) for dm in add.DISEASE_MAPPINGS]
+    mappings[0]['confidence'] = 0.5
+    with Session(engine) as session:
+        report = bulk_seed(session, mappings=mappings)
+    assert report['mappings']['updated'] == 1 and report['mappings']['inserted'] == 0
+    with Session(engine) as session:
+        confidence = session.scalar(select(DiseaseMapping.confidence)
+                                    .where(DiseaseMapping.disease_name == mappings[0]['disease_name']))
+    assert confidence == 0.5
+
+
+def test_reset_reseeds_in_one_transaction(engine):
+    before = _counts(engine)
+    with Session(engine) as session:
+        report = bulk_seed(session, reset=True)
+    assert report['departments']['inserted'] > 0
+    assert _counts(engine) == before
+
+
+def test_failed_reset_rolls_back_delete(engine, monkeypatch):
+    before = _counts(engine)
+    insert_rows = add._insert_rows
+
+    def failing_insert(session, model, rows):
+        if model is DiseaseSynonym:
+            raise RuntimeError('写入失败')
+        insert_rows(session, model, rows)
+
+    monkeypatch.setattr(add, '_insert_rows', failing_insert)
+    monkeypatch.setattr(add, '_Session', sessionmaker(bind=engine))
+    assert add.bulk_main(reset=True) == 1
+    assert _counts(engine) == before
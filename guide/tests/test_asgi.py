@@ -0,0 +1,108 @@
+import asyncio
+import threading
+
+import httpx
+from flask import request
+
+import classify_service
+from asgi import AsyncClassifyApp
+from classify_service import PARTNER_UNAVAILABLE
+
+
+def post_classify(app, symptoms):
+    """在新的事件循环中通过 ASGI 接口发送 POST /classify/，返回 (响应 JSON, 事件循环线程)"""
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://guide') as client:
+            response = await client.post('/classify/', json={'symptoms': symptoms})
+        if app.partner is not None:
+            await app.partner.aclose()
+            app.partner = None
+        return response.json()
+
+    loop_thread = {}
+
+    async def main():
+        loop_thread['ident'] = threading.get_ident()
+        return await run()
+
+    return asyncio.run(main()), loop_thread['ident']
+
+
+def test_blocking_work_runs_off_the_event_loop(app, monkeypatch):
+    threads = []
+    original = classify_service.build_result
+
+    def build_result(*args):
+        threads.append(threading.get_ident())
+        return original(*args)
+
+    monkeypatch.setattr(classify_service, 'build_result', build_result)
+    body, loop_ident = post_classify(AsyncClassifyApp(app), ['眼痛', '头痛'])
+
+    assert body['success'] and body['recommended_department']
+    assert threads and loop_ident not in threads
+
+
+def test_provisional_result_is_built_off_the_event_loop(app, partner, monkeypatch):
+    mock, _ = partner
+    mock.profile.update({'latency': 'fixed:2000'})
+    app.config['CLASSIFY_LATENCY_BUDGET'] = 0.05
+    app.extensions['partner_hedger'].budget = 0.05
+    threads = []
+
+    def classifier(symptoms):
+        threads.append(threading.get_ident())
+        return {'disease': '急性闭角型青光眼', 'confidence': 0.5}
+
+    app.extensions['provisional_classifier'] = classifier
+    body, loop_ident = post_classify(AsyncClassifyApp(app), ['眼痛', '头痛'])
+
+    assert body['classification']['provisional'] is True
+    assert threads and loop_ident not in threads
+
+
+def test_partner_failure_falls_back_to_provisional(app, partner):
+    mock, _ = partner
+    mock.profile.error_rate = 1.0
+    body, _ = post_classify(AsyncClassifyApp(app), ['眼痛', '头痛', '恶心呕吐', '虹视'])
+    assert body['success'] and body['classification']['provisional'] is True
+
+
+def post_raw(app, payload):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://guide') as client:
+            response = await client.post('/classify/', json=payload)
+        if app.partner is not None:
+            await app.partner.aclose()
+        return response
+
+    return asyncio.run(run())
+
+
+def test_asgi_classify_runs_flask_request_hooks(app):
+    seen = []
+    app.before_request(lambda: seen.append(('before', request.path)))
+
+    @app.after_request
+    def after(response):
+        seen.append(('after', response.status_code))
+        response.headers['X-Hooked'] = '1'
+        return response
+
+    response = post_raw(AsyncClassifyApp(app), {'symptoms': ['眼痛']})
+    assert response.status_code == 200 and response.headers['x-hooked'] == '1'
+    assert seen == [('before', '/classify/'), ('after', 200)]
+
+
+def test_asgi_errors_match_wsgi_route(app, client, partner):
+    asgi_app = AsyncClassifyApp(app)
+    invalid = post_raw(asgi_app, {'symptoms': []})
+    assert invalid.status_code == 400
+    assert invalid.json() == client.post('/classify/', json={'symptoms': []}).get_json()
+
+    mock, _ = partner
+    mock.profile.error_rate = 1.0
+    failed = post_raw(asgi_app, {'symptoms': ['完全无关的描述']})
+    assert failed.status_code == 502
+    assert failed.json() == {'success': False, 'error': PARTNER_UNAVAILABLE}
+    assert client.post('/classify/', json={'symptoms': ['完全无关的描述']}).get_json() == failed.json()
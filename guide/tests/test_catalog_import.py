@@ -0,0 +1,53 @@
+import json
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from catalog_import import CatalogImporter, read_records
+from model import DiseaseMapping
+
+
+@pytest.fixture
+def session(seeded_db):
+    engine = create_engine(seeded_db)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def _write_jsonl(path, lines):
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return str(path)
+
+
+def test_malformed_jsonl_rows_are_rejected_individually(session, tmp_path):
+    good = {'disease_name': '导入测试病', 'department': '白内障科', 'confidence': 0.9}
+    path = _write_jsonl(tmp_path / 'mappings.jsonl', [
+        json.dumps(good, ensure_ascii=False),
+        '[1, 2, 3]',
+        '42',
+        '"白内障"',
+        '{"disease_name": 123, "department": "白内障科"}',
+        '{"disease_name": "另一种病", "department": ["白内障科"]}',
+        '{broken',
+        json.dumps(dict(good, disease_name='导入测试病二'), ensure_ascii=False),
+    ])
+    before = session.scalar(select(func.count()).select_from(DiseaseMapping))
+
+    stats = CatalogImporter(session).import_mappings(read_records(path))
+
+    assert stats.read == 8 and stats.rejected == 6 and stats.inserted == 2
+    assert any('不是 JSON 对象' in s for s in stats.samples)
+    assert any('disease_name 不是字符串' in s for s in stats.samples)
+    assert session.scalar(select(func.count()).select_from(DiseaseMapping)) == before + 2
+
+
+def test_non_string_department_name_is_rejected(session, tmp_path):
+    path = _write_jsonl(tmp_path / 'departments.jsonl', [
+        '{"name": 123, "director": "某人"}',
+        '{"name": "导入测试科", "director": "某人", "phone": 1001}',
+        '{"name": "导入测试二科", "director": "某人", "phone": "020-9999"}',
+    ])
+    stats = CatalogImporter(session).import_departments(read_records(path))
+    assert stats.rejected == 2 and stats.inserted == 1
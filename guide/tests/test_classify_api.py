@@ -0,0 +1,99 @@
+import time
+
+from classify_service import PARTNER_UNAVAILABLE
+
+
+def test_classify_then_result_and_triage(client):
+    response = client.post('/classify/', json={'symptoms': ['眼痛', '头痛', '视力模糊']})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['success'] and body['classification']['disease']
+
+    cached = client.get(f"/classify/result/{body['result_id']}").get_json()
+    assert cached['classification'] == body['classification']
+    assert cached['symptoms'] == ['眼痛', '头痛', '视力模糊']
+
+    triage = client.post('/triage/', json={'session_id': body['result_id'], 'pain_description': '剧烈疼痛',
+                                           'duration_hours': 2})
+    assert triage.status_code == 200
+    assert triage.get_json()['triage_result']['level'] in (1, 2, 3, 4)
+
+
+def test_classify_validation_and_missing_result(client):
+    assert client.post('/classify/', json={'symptoms': []}).status_code == 400
+    assert client.get('/classify/result/nope').status_code == 404
+    assert client.post('/triage/', json={'session_id': 'nope', 'duration_hours': 1}).status_code == 404
+
+
+def test_repeated_classify_is_served_from_memo(app, client, partner):
+    mock, _ = partner
+    first = client.post('/classify/', json={'symptoms': ['眼红', '流泪']}).get_json()
+    # 顺序和空白不同，规范化后是同一组症状
+    second = client.post('/classify/', json={'symptoms': [' 流泪', '眼红']}).get_json()
+
+    assert mock.stats()['requests'] == 1
+    assert second['classification'] == first['classification']
+    assert second['result_id'] != first['result_id']
+    memo = app.extensions['classify_memo'].stats()
+    assert memo['hits'] == 1 and memo['entries'] == 1
+
+
+def test_batch_reports_parse_error_per_item(client, partner):
+    mock, _ = partner
+    items = [{'symptoms': ['眼红']}, {'symptoms': []}, {'symptoms': ['眼痛', 3]}, 'oops', {'symptoms': ['眼红']}]
+    body = client.post('/classify/batch', json={'items': items}).get_json()
+
+    results = body['results']
+    assert [r['success'] for r in results] == [True, False, False, False, True]
+    assert results[1]['error'] == '症状列表不能为空'
+    assert results[2]['error'] == '症状必须为非空字符串'
+    assert results[3]['error'] == '症状列表不能为空'
+    assert results[0]['classification'] == results[4]['classification']
+    assert body['stats']['total'] == 5 and body['stats']['invalid'] == 3
+    assert mock.stats()['requests'] == 1
+
+
+def test_partner_failure_falls_back_to_provisional(client, partner):
+    mock, _ = partner
+    mock.profile.error_rate = 1.0
+    body = client.post('/classify/', json={'symptoms': ['眼痛', '头痛', '恶心呕吐', '虹视']}).get_json()
+    assert body['success']
+    assert body['classification']['provisional'] is True
+    assert '青光眼' in body['classification']['disease']
+    assert body['recommended_department']['department_name']
+
+
+def test_partner_failure_without_provisional_result_is_502(client, partner):
+    mock, _ = partner
+    mock.profile.error_rate = 1.0
+    # 词表外的症状，本地打分器给不出结果
+    response = client.post('/classify/', json={'symptoms': ['完全无关的描述']})
+    assert response.status_code == 502
+    assert response.get_json()['success'] is False
+
+
+def test_batch_partner_failure_falls_back_per_item(app, client, partner):
+    mock, _ = partner
+    mock.profile.error_rate = 1.0
+    app.extensions['provisional_classifier'] = (
+        lambda symptoms: {'disease': '原发性闭角型青光眼', 'confidence': 0.5} if '虹视' in symptoms else None
+    )
+    items = [{'symptoms': ['眼痛', '虹视']}, {'symptoms': ['完全无关的描述']}]
+    results = client.post('/classify/batch', json={'items': items}).get_json()['results']
+
+    assert results[0]['success'] and results[0]['classification']['provisional'] is True
+    assert results[1] == {'success': False, 'error': PARTNER_UNAVAILABLE}
+    # 临时结果不写入记忆缓存
+    assert app.extensions['classify_memo'].stats()['entries'] == 0
+
+
+def test_batch_respects_latency_budget(app, client, partner):
+    mock, _ = partner
+    mock.profile.update({'latency': 'fixed:500'})
+    app.extensions['partner_hedger'].budget = 0.1
+    app.extensions['provisional_classifier'] = lambda symptoms: {'disease': '干眼症', 'confidence': 0.4}
+    start = time.monotonic()
+    results = client.post('/classify/batch', json={'items': [{'symptoms': ['眼干']}, {'symptoms': ['眼痒']}]}
+                          ).get_json()['results']
+    assert time.monotonic() - start < 0.4
+    assert all(r['success'] and r['classification']['provisional'] for r in results)
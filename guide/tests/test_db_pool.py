@@ -0,0 +1,47 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.pool import NullPool, StaticPool
+
+from app_config import engine_options
+from db_pool import InstrumentedQueuePool, create_pooled_engine, pool_stats, use_instrumented_pool
+
+
+def test_file_database_uses_instrumented_pool(tmp_path):
+    options = use_instrumented_pool(engine_options(pool_size=2, max_overflow=1), f"sqlite:///{tmp_path / 'a.db'}")
+    assert options['poolclass'] is InstrumentedQueuePool
+    assert options['pool_size'] == 2 and options['max_overflow'] == 1
+
+
+@pytest.mark.parametrize('uri', ['sqlite://', 'sqlite:///:memory:'])
+def test_memory_database_drops_queue_pool_options(uri):
+    options = use_instrumented_pool(engine_options(pool_size=2, max_overflow=1), uri)
+    assert 'poolclass' not in options
+    assert not {'pool_size', 'max_overflow', 'pool_timeout'} & set(options)
+    assert options['pool_pre_ping'] is True
+
+    engine = create_pooled_engine(uri, engine_options(pool_size=2, max_overflow=1))
+    with engine.connect() as conn:
+        assert conn.execute(text('select 1')).scalar() == 1
+    engine.dispose()
+
+
+def test_explicit_non_queue_pool_is_kept(tmp_path):
+    options = use_instrumented_pool(dict(engine_options(pool_size=2, max_overflow=1), poolclass=NullPool),
+                                    f"sqlite:///{tmp_path / 'a.db'}")
+    assert options['poolclass'] is NullPool and 'pool_size' not in options
+
+
+def test_create_app_with_memory_database(monkeypatch):
+    from app import create_app
+    from app_config import Config, config
+    from exts import db
+
+    class MemoryConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+    monkeypatch.setitem(config, 'memory', MemoryConfig)
+    app = create_app('memory')
+    with app.app_context():
+        assert isinstance(db.engine.pool, StaticPool)
+        assert pool_stats(db.engine)['pool_class'] == 'StaticPool'
@@ -0,0 +1,73 @@
+import threading
+import time
+
+import pytest
+
+from hedging import HedgedCaller, LatencyBudgetExceeded, LatencyTracker
+from partner_client import PartnerClient
+
+
+def make_caller(budget=0.1, **kwargs):
+    return HedgedCaller(budget, LatencyTracker(default=10), **kwargs)
+
+
+def test_deadline_is_passed_to_the_call():
+    caller = make_caller(budget=1)
+    seen = []
+
+    def fn(x, deadline):
+        seen.append(deadline - time.monotonic())
+        return x
+
+    assert caller.call(fn, 'ok') == 'ok'
+    assert 0.9 < seen[0] <= 1
+
+
+def test_queued_call_is_cancelled_when_budget_runs_out():
+    caller = make_caller(budget=0.05, max_workers=1, max_queue=1, hedge=False)
+    release = threading.Event()
+    ran = []
+
+    def blocking(name, deadline):
+        ran.append(name)
+        release.wait(2)
+        return name
+
+    with pytest.raises(LatencyBudgetExceeded):
+        caller.call(blocking, 'a')
+    with pytest.raises(LatencyBudgetExceeded):
+        caller.call(blocking, 'b')
+    release.set()
+    caller._executor.shutdown(wait=True)
+    assert ran == ['a']
+    assert caller.stats()['budget_exceeded'] == 2
+
+
+def test_full_pool_rejects_instead_of_queueing():
+    caller = make_caller(budget=0.05, max_workers=1, max_queue=0, hedge=False)
+    release = threading.Event()
+
+    with pytest.raises(LatencyBudgetExceeded):
+        caller.call(lambda deadline: release.wait(2))
+    start = time.monotonic()
+    with pytest.raises(LatencyBudgetExceeded, match='线程池已满'):
+        caller.call(lambda deadline: 'never')
+    assert time.monotonic() - start < 0.02
+    assert caller.stats()['rejected'] == 1
+    release.set()
+
+
+def test_abandoned_partner_request_ends_at_the_deadline(partner):
+    mock, url = partner
+    mock.profile.update({'latency': 'fixed:3000'})
+    client = PartnerClient(url, read_timeout=30, max_attempts=3, backoff_base=0)
+    caller = make_caller(budget=0.2, hedge=False)
+
+    start = time.monotonic()
+    with pytest.raises(LatencyBudgetExceeded):
+        caller.call(client.classify, ['眼痛'])
+    caller._executor.shutdown(wait=True)
+    # 后台请求不再按 30 秒读超时 × 3 次重试继续占用线程
+    assert time.monotonic() - start < 1
+    assert client.stats()['in_flight'] == 0
+    assert mock.stats()['requests'] == 1
@@ -0,0 +1,14 @@
+import pytest
+
+from loadtest import LEVEL1_TRIAGE, LEVEL2_TRIAGE, LEVEL4_TRIAGE
+from triage import evaluate_triage, triage_inputs
+
+
+@pytest.mark.parametrize('fields, level', [(LEVEL1_TRIAGE, 1), (LEVEL2_TRIAGE, 2), (LEVEL4_TRIAGE, 4)])
+def test_smoke_scenarios_match_default_rules(fields, level):
+    assert evaluate_triage(**triage_inputs(fields))['level'] == level
+
+
+def test_trauma_alone_is_not_escalated():
+    assert evaluate_triage(trauma_history=True)['level'] == 4
+    assert evaluate_triage(vision_changes=['视力急剧下降'], trauma_history=True)['level'] == 1
@@ -0,0 +1,21 @@
+from microbench import Bench, compare
+
+
+def test_compare_uses_median_and_allows_for_spread():
+    baseline = {'steady': {'ns_per_op': 100.0, 'spread': 0.01},
+                'noisy': {'ns_per_op': 100.0, 'spread': 0.1},
+                'old': {'ns_per_op': 100.0, 'min_ns': 90.0}}
+    results = {'steady': {'ns_per_op': 140.0, 'min_ns': 100.0, 'spread': 0.01},
+               'noisy': {'ns_per_op': 160.0, 'min_ns': 100.0, 'spread': 0.1},
+               'old': {'ns_per_op': 125.0, 'min_ns': 200.0, 'spread': 0.0},
+               'new': {'ns_per_op': 50.0, 'min_ns': 40.0, 'spread': 0.0}}
+    lines, regressions = compare(results, baseline, threshold=0.3, noise=3.0)
+    # steady: 上限 1.36x；noisy: 上限 1.9x；old 基线没有离散度，按 0 计
+    assert regressions == ['steady']
+    assert len(lines) == 4 and '无基线' in lines[-1]
+
+
+def test_bench_reports_spread():
+    result = Bench('noop', lambda: ((lambda x: x), [1, 2, 3]), min_time=0.01, repeat=3).run()
+    assert result['ns_per_op'] > 0 and result['spread'] >= 0
+    assert result['ops'] >= 9
@@ -0,0 +1,59 @@
+import pytest
+from sqlalchemy import create_engine, select, text, update
+from sqlalchemy.orm import Session
+
+from migrate_schema import migrate
+from model import Department, DiseaseMapping
+
+
+@pytest.fixture
+def session(seeded_db):
+    engine = create_engine(seeded_db)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def _mapping(session):
+    return session.scalars(select(DiseaseMapping).order_by(DiseaseMapping.id)).first()
+
+
+def test_bulk_update_by_primary_key_refreshes_name_key(session):
+    mapping = _mapping(session)
+    session.execute(update(DiseaseMapping), [{'id': mapping.id, 'disease_name': 'Ｔｅｓｔ 病'}])
+    session.commit()
+    assert session.scalar(select(DiseaseMapping.name_key).where(DiseaseMapping.id == mapping.id)) == 'test病'
+
+
+def test_update_statement_refreshes_name_key(session):
+    department = session.scalars(select(Department)).first()
+    session.execute(update(Department).where(Department.id == department.id).values(name='新 科室'))
+    session.execute(update(Department.__table__).where(Department.id == department.id).values(name='ＮＥＷ'))
+    session.commit()
+    assert session.scalar(select(Department.name_key).where(Department.id == department.id)) == 'new'
+
+
+def test_update_without_name_keeps_name_key(session):
+    mapping = _mapping(session)
+    key = mapping.name_key
+    session.execute(update(DiseaseMapping).where(DiseaseMapping.id == mapping.id).values(confidence=0.5))
+    session.execute(update(DiseaseMapping), [{'id': mapping.id, 'confidence': 0.4}])
+    session.commit()
+    session.refresh(mapping)
+    assert mapping.name_key == key and mapping.confidence == 0.4
+
+
+def test_migrate_replaces_old_lookup_index(seeded_db):
+    engine = create_engine(seeded_db)
+    with engine.begin() as conn:
+        conn.execute(text('DROP INDEX ix_disease_mappings_key_lookup'))
+        conn.execute(text('CREATE INDEX ix_disease_mappings_lookup '
+                          'ON disease_mappings (disease_name, confidence DESC, department_id)'))
+    migrate(engine, log=lambda message: None)
+    with engine.connect() as conn:
+        indexes = {row[1] for row in conn.execute(text("PRAGMA index_list('disease_mappings')"))}
+        plan = conn.execute(text('EXPLAIN QUERY PLAN SELECT department_id, confidence FROM disease_mappings '
+                                 'WHERE name_key = :key'), {'key': '青光眼'}).all()
+    engine.dispose()
+    assert 'ix_disease_mappings_key_lookup' in indexes and 'ix_disease_mappings_lookup' not in indexes
+    assert 'COVERING INDEX ix_disease_mappings_key_lookup' in plan[0][-1]
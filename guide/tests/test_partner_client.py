@@ -0,0 +1,172 @@
+import asyncio
+
+import httpx
+import pytest
+import requests
+
+from async_partner_client import AsyncPartnerClient
+from partner_client import CircuitBreaker, PartnerAPIError, PartnerClient, PartnerUnavailableError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_client(url, clock, attempts=1):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+    return PartnerClient(url, max_attempts=attempts, backoff_base=0, breaker=breaker)
+
+
+def test_classify_against_mock_partner(partner):
+    mock, url = partner
+    client = PartnerClient(url, max_attempts=1)
+    result = client.classify(['眼痛', '头痛'])
+    assert result['disease'] and 0 < result['confidence'] < 1
+    assert mock.stats()['requests'] == 1
+
+
+def test_breaker_opens_after_threshold_and_probes_after_reset(partner):
+    mock, url = partner
+    mock.profile.error_rate = 1.0
+    clock = FakeClock()
+    client = make_client(url, clock)
+    for _ in range(2):
+        with pytest.raises(PartnerAPIError):
+            client.classify(['眼痛'])
+    assert client.breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(PartnerUnavailableError):
+        client.classify(['眼痛'])
+    assert mock.stats()['requests'] == 2
+
+    # 冷却期过后放行一个探测请求，成功后关闭
+    mock.profile.error_rate = 0.0
+    clock.now += 31
+    client.classify(['眼痛'])
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_client_error_does_not_trip_breaker(partner):
+    _, url = partner
+    client = make_client(url, FakeClock())
+    for _ in range(3):
+        with pytest.raises(PartnerAPIError):
+            client.post({'not_symptoms': 1})
+    assert client.breaker.state == CircuitBreaker.CLOSED
+    assert client.failures == 3
+
+
+def test_broken_response_body_is_retried_and_wrapped(monkeypatch):
+    client = make_client('http://partner.invalid/api', FakeClock(), attempts=3)
+    calls = []
+
+    def post(*args, **kwargs):
+        calls.append(kwargs['timeout'])
+        raise requests.exceptions.ChunkedEncodingError('connection broken')
+
+    monkeypatch.setattr(client.session, 'post', post)
+    with pytest.raises(PartnerAPIError, match='3 次尝试'):
+        client.post({'symptoms': ['眼痛']}, timeout=0.5)
+    assert calls == [0.5, 0.5, 0.5]
+    assert client.breaker.failures == 1
+    assert client.stats()['in_flight'] == 0
+
+
+def test_invalid_request_is_not_retried(monkeypatch):
+    client = make_client('http://partner.invalid/api', FakeClock(), attempts=3)
+    calls = []
+
+    def post(*args, **kwargs):
+        calls.append(1)
+        raise requests.exceptions.InvalidURL('bad url')
+
+    monkeypatch.setattr(client.session, 'post', post)
+    with pytest.raises(PartnerAPIError, match='1 次尝试'):
+        client.post({'symptoms': ['眼痛']})
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize('confidence', ['high', [0.9], {'value': 0.9}])
+def test_non_numeric_confidence_is_a_partner_error(monkeypatch, confidence):
+    client = make_client('http://partner.invalid/api', FakeClock())
+    client.batch_url, client.batch_size = 'http://partner.invalid/batch', 10
+    monkeypatch.setattr(client, 'post', lambda payload, **kwargs: (
+        {'results': [{'disease': '干眼症', 'confidence': confidence}, {'disease': '近视', 'confidence': '0.8'}]}
+        if 'batch' in payload else {'disease': '干眼症', 'confidence': confidence}
+    ))
+    with pytest.raises(PartnerAPIError, match='可信度'):
+        client.classify(['眼干'])
+    outcomes = client.classify_many([['眼干'], ['看远处模糊']])
+    assert isinstance(outcomes[0], PartnerAPIError)
+    assert outcomes[1] == {'disease': '近视', 'confidence': 0.8}
+
+
+def test_unexpected_error_releases_half_open_probe(monkeypatch):
+    clock = FakeClock()
+    client = make_client('http://partner.invalid/api', clock)
+    client.breaker.record_failure()
+    client.breaker.record_failure()
+    clock.now += 31
+
+    def post(*args, **kwargs):
+        raise RuntimeError('boom')
+
+    monkeypatch.setattr(client.session, 'post', post)
+    with pytest.raises(RuntimeError):
+        client.post({'symptoms': ['眼痛']})
+    # 探测名额已释放，下一次调用仍可作为探测请求发出
+    assert client.breaker.state == CircuitBreaker.HALF_OPEN
+    assert client.breaker.allow() is True
+
+
+def make_async_client(handler, clock, attempts=1):
+    client = AsyncPartnerClient('http://partner.test/api', max_attempts=attempts, backoff_base=0,
+                                breaker=CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock))
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+def test_async_decoding_error_is_wrapped_and_counted():
+    def handler(request):
+        raise httpx.DecodingError('bad gzip', request=request)
+
+    async def run():
+        client = make_async_client(handler, FakeClock(), attempts=2)
+        with pytest.raises(PartnerAPIError, match='2 次尝试'):
+            await client.classify(['眼痛'])
+        with pytest.raises(PartnerAPIError):
+            await client.classify(['眼痛'])
+        with pytest.raises(PartnerUnavailableError):
+            await client.classify(['眼痛'])
+        await client.aclose()
+        return client
+
+    client = asyncio.run(run())
+    assert client.requests == 4 and client.in_flight == 0
+
+
+def test_async_cancelled_probe_is_released():
+    clock = FakeClock()
+
+    async def handler(request):
+        await asyncio.sleep(10)
+
+    async def run():
+        client = make_async_client(handler, clock)
+        client.breaker.record_failure()
+        client.breaker.record_failure()
+        clock.now += 31
+        task = asyncio.ensure_future(client.classify(['眼痛']))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await client.aclose()
+        return client
+
+    client = asyncio.run(run())
+    assert client.breaker.state == CircuitBreaker.HALF_OPEN
+    assert client.breaker.allow() is True
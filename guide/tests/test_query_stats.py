@@ -0,0 +1,33 @@
+import logging
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from asgi import AsyncClassifyApp
+from exts import db
+from query_stats import query_stats
+from test_asgi import post_raw
+
+
+def test_failed_statement_does_not_leave_a_start_time(app):
+    with app.test_request_context('/'):
+        with db.engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text('select * from no_such_table'))
+            assert not conn.info.get('query_start')
+            conn.execute(text('select 1'))
+            assert not conn.info.get('query_start')
+        count, seconds = query_stats()
+    assert count == 2 and seconds >= 0
+
+
+def test_asgi_classify_is_counted(app, caplog):
+    @app.before_request
+    def touch_db():
+        db.session.execute(text('select 1'))
+
+    with caplog.at_level(logging.INFO, logger=app.logger.name):
+        response = post_raw(AsyncClassifyApp(app), {'symptoms': ['眼痛']})
+    assert response.status_code == 200
+    assert any(r.getMessage().startswith('POST /classify/ -> 200: 1 SQL') for r in caplog.records)
@@ -0,0 +1,73 @@
+from result_store import ResultStore, _sizeof
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_get_set_and_ttl():
+    clock = FakeClock()
+    store = ResultStore(ttl=10, clock=clock)
+    assert store.set('a', {'x': 1}) is True
+    assert store.get('a') == {'x': 1}
+    clock.now += 9.9
+    assert store.get('a') == {'x': 1}
+    clock.now += 0.2
+    assert store.get('a') is None
+    assert store.stats()['expirations'] == 1
+
+
+def test_lru_eviction_by_entries():
+    store = ResultStore(max_entries=2)
+    store.set('a', 1)
+    store.set('b', 2)
+    store.get('a')
+    store.set('c', 3)
+    assert store.get('b') is None
+    assert store.get('a') == 1 and store.get('c') == 3
+    assert store.stats()['evictions'] == 1
+
+
+def test_eviction_by_bytes():
+    value = 'x' * 100
+    store = ResultStore(max_bytes=_sizeof(value) * 2)
+    store.set('a', value)
+    store.set('b', value)
+    store.set('c', value)
+    assert len(store) == 2
+    assert store.get('a') is None
+
+
+def test_oversized_value_is_rejected_without_evicting():
+    small = 'x' * 10
+    store = ResultStore(max_bytes=_sizeof(small) * 3)
+    store.set('a', small)
+    store.set('b', small)
+    assert store.set('big', 'y' * 1000) is False
+    assert store.get('a') == small and store.get('b') == small
+    assert store.get('big') is None
+    stats = store.stats()
+    assert stats['evictions'] == 0 and stats['oversized'] == 1
+
+
+def test_oversized_overwrite_drops_stale_value():
+    store = ResultStore(max_bytes=100)
+    store.set('a', 'old')
+    assert store.set('a', 'y' * 1000) is False
+    assert store.get('a') is None
+    assert store.stats()['bytes'] == 0
+
+
+def test_overwrite_does_not_grow_heap_unbounded():
+    clock = FakeClock()
+    store = ResultStore(ttl=10, clock=clock)
+    for i in range(1000):
+        store.set('a', i)
+    assert len(store._expiry) <= 2 * len(store) + 64
+    clock.now += 11
+    assert store.purge_expired() == 1
+    assert len(store) == 0
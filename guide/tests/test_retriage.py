@@ -0,0 +1,49 @@
+import random
+
+import numpy as np
+
+from retriage import diff_report, encode_records, evaluate_levels, match_rules
+from triage import FLAG_WIDTH, RULES, evaluate_triage, match_rule
+
+
+def test_vectorized_rules_match_single_evaluation():
+    rng = random.Random(0)
+    flags = [rng.getrandbits(FLAG_WIDTH) for _ in range(5000)]
+    hours = [rng.choice((0, 5, 6, 30, 72, 100)) for _ in flags]
+    vectorized = match_rules(np.array(flags, dtype=np.uint32), np.array(hours, dtype=np.float32))
+    assert vectorized.tolist() == [match_rule(f, h) for f, h in zip(flags, hours)]
+
+
+def test_diff_report_counts_and_transitions():
+    report = diff_report(np.array([1, 2, 3, 4, 4]), np.array([1, 3, 3, 2, 4]))
+    assert report['total'] == 5 and report['invalid'] == 0
+    assert report['changed'] == 2
+    assert report['more_urgent'] == 1 and report['less_urgent'] == 1
+    assert report['transitions']['4'] == {'2': 1, '4': 1}
+
+
+def test_diff_report_excludes_out_of_range_levels():
+    before = np.array([1, 0, 5, -1, 9, 2], dtype=np.int8)
+    after = np.array([1, 2, 2, 3, 4, 7], dtype=np.int8)
+    report = diff_report(before, after)
+    assert report['invalid'] == 5
+    assert report['total'] == 1
+    assert report['before'] == {'1': 1, '2': 0, '3': 0, '4': 0}
+
+
+def test_encode_records_marks_bad_recorded_levels():
+    columns = encode_records([
+        {'pain_description': '剧烈疼痛', 'duration_hours': 2, 'level': 2},
+        {'pain_description': '无疼痛', 'duration_hours': 2},
+        {'pain_description': '无疼痛', 'duration_hours': 2, 'triage_result': {'level': 300}},
+        {'pain_description': '无疼痛', 'level': '3'},
+    ])
+    assert columns.recorded_level.tolist() == [2, 0, -1, -1]
+    assert np.isnan(columns.duration[3])
+    assert evaluate_levels(columns).tolist() == [2, 4, 4, 4]
+
+
+def test_default_rules_have_no_undocumented_conditions():
+    assert all(rule.max_hours is None for rule in RULES)
+    assert evaluate_triage(pain='中度疼痛', duration_hours=1)['level'] == 4
+    assert evaluate_triage(associated_symptoms=['眼红', '分泌物多'], duration_hours=200)['level'] == 3
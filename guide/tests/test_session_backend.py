@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+import redis
+
+from mini_redis import MiniRedisServer
+from result_store import ResultStore
+from session_backend import LocalSessionBackend, RedisSessionBackend
+
+RESULT = {'classification': {'disease': '急性闭角型青光眼', 'confidence': 0.92}, 'symptoms': ['眼痛', '头痛']}
+
+
+@pytest.fixture(scope='module')
+def redis_server():
+    server = MiniRedisServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def backend(redis_server):
+    backend = RedisSessionBackend(redis_server.url, ttl=60, prefix='test:', pool_size=4)
+    backend.client.flushdb()
+    return backend
+
+
+def test_redis_get_set_roundtrip(backend):
+    assert backend.get('missing') is None
+    backend.set('r1', RESULT)
+    assert backend.get('r1') == RESULT
+    assert backend.stats()['hits'] == 1 and backend.stats()['misses'] == 1
+
+
+def test_redis_keys_are_prefixed(backend, redis_server):
+    backend.set('r1', RESULT)
+    assert b'test:r1' in redis_server.store.data
+
+
+def test_redis_default_and_explicit_ttl(backend):
+    backend.set('default', RESULT)
+    assert 55000 < backend.client.pttl('test:default') <= 60000
+    backend.set('short', RESULT, ttl=0.05)
+    assert backend.get('short') == RESULT
+    time.sleep(0.1)
+    assert backend.get('short') is None
+
+
+def test_redis_delete(backend):
+    backend.set('r1', RESULT)
+    assert backend.delete('r1') is True
+    assert backend.delete('r1') is False
+    assert backend.get('r1') is None
+
+
+def test_redis_get_many_keeps_order_and_misses(backend):
+    backend.set_many([(f'r{i}', dict(RESULT, n=i)) for i in range(5)])
+    values = backend.get_many(['r3', 'nope', 'r0', 'r4'])
+    assert [v and v['n'] for v in values] == [3, None, 0, 4]
+    assert backend.get_many([]) == []
+
+
+def test_redis_pool_stats(backend):
+    backend.get('r1')
+    stats = backend.stats()
+    assert stats['backend'] == 'redis'
+    assert stats['pool_max_connections'] == 4
+    assert stats['pool_in_use_connections'] == 0
+
+
+def test_redis_pool_stats_without_pool_internals(backend, monkeypatch):
+    monkeypatch.delattr(backend.pool, '_connections')
+    stats = backend.stats()
+    assert stats['pool_max_connections'] == 4
+    assert 'pool_created_connections' not in stats
+
+
+def test_redis_hit_counters_are_exact_under_threads(backend):
+    backend.set('r1', RESULT)
+
+    def reads():
+        for _ in range(50):
+            backend.get('r1')
+            backend.get_many(['r1', 'nope'])
+
+    threads = [threading.Thread(target=reads) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert backend.stats()['hits'] == 400 and backend.stats()['misses'] == 200
+
+
+def test_mini_redis_wrong_arity_is_an_error_reply(backend):
+    with pytest.raises(redis.ResponseError, match="wrong number of arguments for 'get' command"):
+        backend.client.execute_command('GET')
+    # 连接仍可继续使用
+    assert backend.client.ping() is True
+
+
+def test_local_backend_matches_redis_semantics():
+    backend = LocalSessionBackend(ResultStore(ttl=60))
+    backend.set_many([(f'r{i}', dict(RESULT, n=i)) for i in range(3)])
+    assert [v and v['n'] for v in backend.get_many(['r2', 'nope', 'r0'])] == [2, None, 0]
+    assert backend.delete('r2') is True
+    assert backend.get('r2') is None
+    assert backend.stats()['backend'] == 'local'
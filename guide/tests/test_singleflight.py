@@ -0,0 +1,187 @@
+import asyncio
+import threading
+import time
+
+from singleflight import SingleFlight
+
+
+def run_concurrently(n, target):
+    barrier = threading.Barrier(n)
+    results = [None] * n
+
+    def worker(i):
+        barrier.wait()
+        results[i] = target()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+    return results
+
+
+def test_do_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    calls = []
+
+    def slow(x):
+        calls.append(x)
+        time.sleep(0.2)
+        return x * 2
+
+    results = run_concurrently(8, lambda: flight.do('k', slow, 21))
+    assert calls == [21]
+    assert [r[0] for r in results] == [42] * 8
+    assert sum(shared for _, shared in results) == 7
+    assert flight.stats() == {'in_flight': 0, 'leaders': 1, 'shared': 7}
+
+
+def test_do_many_joins_in_flight_keys_and_leads_the_rest():
+    flight = SingleFlight()
+    started = threading.Event()
+    batches = []
+
+    def slow(x):
+        started.set()
+        time.sleep(0.2)
+        return f'single-{x}'
+
+    def many(args):
+        batches.append(args)
+        return [f'batch-{a}' if a != 'bad' else ValueError(a) for a in args]
+
+    single = threading.Thread(target=flight.do, args=('a', slow, 'a'))
+    single.start()
+    started.wait()
+    outcomes, joined = flight.do_many({'a': 'a', 'b': 'b', 'c': 'bad'}, many)
+    single.join()
+
+    assert batches == [['b', 'bad']]
+    assert joined == 1
+    assert outcomes['a'] == 'single-a' and outcomes['b'] == 'batch-b'
+    assert isinstance(outcomes['c'], ValueError)
+    assert flight.stats()['in_flight'] == 0
+
+
+def test_identical_concurrent_classify_requests_make_one_partner_call(app, partner):
+    mock, _ = partner
+    mock.profile.update({'latency': 'fixed:300'})
+
+    def post():
+        return app.test_client().post('/classify/', json={'symptoms': ['眼痛', '头痛', '恶心呕吐']})
+
+    responses = run_concurrently(8, post)
+    assert all(r.status_code == 200 for r in responses)
+    assert len({r.get_json()['result_id'] for r in responses}) == 8
+    assert len({r.get_json()['classification']['disease'] for r in responses}) == 1
+    assert mock.stats()['requests'] == 1
+    stats = app.extensions['classify_singleflight'].stats()
+    # 晚到的请求可能已命中记忆缓存，不一定进入 single-flight
+    assert stats['leaders'] == 1 and stats['in_flight'] == 0
+
+
+def test_batch_joins_in_flight_single_request(app, partner):
+    mock, _ = partner
+    mock.profile.update({'latency': 'fixed:300'})
+    client = app.test_client()
+
+    single = threading.Thread(target=lambda: app.test_client().post('/classify/', json={'symptoms': ['眼红']}))
+    single.start()
+    deadline = time.monotonic() + 5
+    while mock.stats()['in_flight'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.005)
+    body = client.post('/classify/batch', json={'items': [{'symptoms': ['眼红']}, {'symptoms': ['流泪']}]}).get_json()
+    single.join()
+
+    assert [r['success'] for r in body['results']] == [True, True]
+    assert body['stats']['coalesced'] == 1 and body['stats']['partner_requests'] == 1
+    assert mock.stats()['requests'] == 2
+
+
+def test_do_async_shares_calls_with_threads():
+    flight = SingleFlight()
+    started = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append('thread')
+        started.set()
+        time.sleep(0.2)
+        return 'from-thread'
+
+    async def coro():
+        calls.append('coro')
+        await asyncio.sleep(0.2)
+        return 'from-coro'
+
+    leader = threading.Thread(target=lambda: flight.do('k', slow))
+    leader.start()
+    started.wait(5)
+    # 线程在途时协程等待其结果
+    assert asyncio.run(flight.do_async('k', coro)) == ('from-thread', True)
+    leader.join(5)
+
+    # 协程在途时线程等待其结果
+    results = []
+
+    async def lead():
+        task = asyncio.ensure_future(flight.do_async('j', coro))
+        await asyncio.sleep(0.05)
+        waiter = threading.Thread(target=lambda: results.append(flight.do('j', slow)))
+        waiter.start()
+        value = await task
+        await asyncio.to_thread(waiter.join, 5)
+        return value
+
+    assert asyncio.run(lead()) == ('from-coro', False)
+    assert results == [('from-coro', True)]
+    assert calls == ['thread', 'coro']
+
+
+class Interrupted(BaseException):
+    """模拟 KeyboardInterrupt / GeneratorExit，不是 Exception 的子类"""
+
+
+def test_leader_base_exception_is_raised_in_waiters():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def interrupted():
+        started.set()
+        release.wait(5)
+        raise Interrupted()
+
+    def lead():
+        try:
+            flight.do('k', interrupted)
+        except Interrupted:
+            pass
+
+    leader = threading.Thread(target=lead)
+    leader.start()
+    started.wait(5)
+    errors = []
+
+    def wait_single():
+        try:
+            flight.do('k', lambda: 'never')
+        except Interrupted as e:
+            errors.append(e)
+
+    def wait_batch():
+        try:
+            flight.do_many({'k': None}, lambda args: ['never'])
+        except Interrupted as e:
+            errors.append(e)
+
+    waiters = [threading.Thread(target=wait_single), threading.Thread(target=wait_batch)]
+    for t in waiters:
+        t.start()
+    while flight.stats()['shared'] < 2:
+        time.sleep(0.01)
+    release.set()
+    for t in [leader, *waiters]:
+        t.join(5)
+    assert len(errors) == 2 and all(isinstance(e, Interrupted) for e in errors)
@@ -0,0 +1,28 @@
+import json
+import subprocess
+import sys
+
+import startup_bench
+
+CHECK = r'''
+import json, sys
+import app
+imported = sorted(m for m in ('sqlalchemy', 'requests') if m in sys.modules)
+app.create_app()
+print(json.dumps({'import': imported, 'create_app': sorted(m for m in ('requests', 'numpy') if m in sys.modules)}))
+'''
+
+
+def test_startup_defers_heavy_imports(monkeypatch, seeded_db):
+    monkeypatch.setenv('DATABASE_URL', seeded_db)
+    proc = subprocess.run([sys.executable, '-c', CHECK], cwd=startup_bench.HERE, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    loaded = json.loads(proc.stdout.strip().splitlines()[-1])
+    assert loaded == {'import': [], 'create_app': []}
+
+
+def test_startup_bench_runs(monkeypatch, seeded_db, capsys):
+    monkeypatch.setenv('DATABASE_URL', seeded_db)
+    assert startup_bench.main(['--runs', '1']) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report['first_request_status'] == 200
@@ -0,0 +1,90 @@
+import json
+import os
+
+import pytest
+from flask import Flask
+
+from triage import ASSOCIATED_OPTIONS, evaluate_triage, load_rules, make_rule, triage_inputs
+from triage_table import TriageTable, get_triage_table, reload_triage_table
+
+TIMED_RULES = (
+    make_rule(1, '化学伤', any_of=('化学物质进入眼睛',)),
+    make_rule(2, '急性眼红', any_of=('眼红',), max_hours=24),
+    make_rule(3, '近期眼痛', any_of=('中度疼痛',), max_hours=6),
+)
+
+
+def test_memo_matches_rules_and_counts_hits():
+    table = TriageTable()
+    data = {'pain_description': '剧烈疼痛', 'vision_changes': ['视力急剧下降'], 'duration_hours': 3}
+    first = table.evaluate_request(data)
+    assert first == evaluate_triage(**triage_inputs(data))
+    assert table.evaluate_request(dict(data)) is first
+    assert table.stats()['hits'] == 1 and table.stats()['misses'] == 1
+
+
+def test_duration_thresholds_are_part_of_the_key():
+    table = TriageTable(TIMED_RULES)
+    for hours in (None, 0, 5.9, 6, 23.9, 24, 100, 5.9, 24, None):
+        data = {'pain_description': '中度疼痛', 'associated_symptoms': ['眼红'], 'duration_hours': hours}
+        assert table.evaluate_request(data) == evaluate_triage(**triage_inputs(data), rules=TIMED_RULES)
+    assert table.verify(20000) == []
+
+
+def test_symptom_order_shares_one_entry():
+    table = TriageTable()
+    table.evaluate(vision_changes=['视力逐渐下降', '眼前有黑影'], associated_symptoms=['眼红', '分泌物多'])
+    table.evaluate(vision_changes=['眼前有黑影', '视力逐渐下降'], associated_symptoms=['分泌物多', '眼红'])
+    assert table.stats()['memo_entries'] == 1 and table.stats()['hits'] == 1
+
+
+def test_unusual_inputs_match_rules():
+    table = TriageTable(TIMED_RULES)
+    for data in ({'pain_description': {'text': '剧烈疼痛'}, 'vision_changes': ['视力逐渐下降']},
+                 {'associated_symptoms': ['眼红'], 'duration_hours': float('nan')}):
+        assert table.evaluate_request(data) == evaluate_triage(**triage_inputs(data), rules=TIMED_RULES)
+    assert table.stats()['memo_entries'] == 1
+
+
+def test_memo_is_bounded():
+    table = TriageTable(max_entries=4)
+    for i in range(10):
+        table.evaluate(associated_symptoms=ASSOCIATED_OPTIONS[i:i + 1])
+    assert table.stats()['memo_entries'] <= 4
+
+
+@pytest.fixture
+def rules_app(tmp_path):
+    path = tmp_path / 'rules.json'
+    path.write_text(json.dumps([{'level': 3, 'reason': '眼红', 'any_of': ['眼红']}], ensure_ascii=False),
+                    encoding='utf-8')
+    app = Flask(__name__)
+    app.config.update(TRIAGE_RULES_FILE=str(path), TRIAGE_RULES_CHECK_INTERVAL=0, TRIAGE_MEMO_MAX_ENTRIES=16)
+    with app.app_context():
+        reload_triage_table(app)
+        yield app, path
+
+
+def _rewrite(path, items):
+    mtime = os.stat(path).st_mtime_ns
+    path.write_text(json.dumps(items, ensure_ascii=False), encoding='utf-8')
+    os.utime(path, ns=(mtime + 10 ** 9, mtime + 10 ** 9))  # 保证修改时间变化
+
+
+def test_rules_file_change_is_picked_up(rules_app):
+    app, path = rules_app
+    data = {'associated_symptoms': ['眼红']}
+    assert get_triage_table().evaluate_request(data)['level'] == 3
+
+    _rewrite(path, [{'level': 2, 'reason': '眼红', 'any_of': ['眼红']}])
+    table = get_triage_table()
+    assert table.rules == load_rules(path)
+    assert table.evaluate_request(data)['level'] == 2
+
+
+def test_broken_rules_file_keeps_current_rules(rules_app):
+    app, path = rules_app
+    before = get_triage_table()
+    _rewrite(path, [{'level': 9, 'reason': '无效级别'}])
+    assert get_triage_table() is before
+    assert before.evaluate_request({'associated_symptoms': ['眼红']})['level'] == 3
@@ -0,0 +1,151 @@
+# 急诊分诊规则（read.md 第 3、4 节）
+# 分诊表单几乎全部是枚举项：表单输入先编码为一个整数位掩码，规则同样用位掩码表示，
+# 单次请求（evaluate_triage）与批量重评估（retriage.py）共用同一套编码和规则
+import json
+from collections import namedtuple
+
+from normalize import normalize_name
+
+PAIN_OPTIONS = ('无疼痛', '轻微不适', '中度疼痛', '剧烈疼痛')
+VISION_OPTIONS = (
+    '视力正常', '视力逐渐下降', '视力急剧下降', '视力突然完全丧失',
+    '看东西模糊', '看东西重影', '眼前有黑影', '闪光感',
+)
+ASSOCIATED_OPTIONS = (
+    '无', '眼红', '分泌物多', '畏光', '流泪', '异物感', '头痛', '恶心呕吐', '眼部外伤', '化学物质进入眼睛',
+)
+# 症状持续时间下拉选项的分界（小时）：小于6小时 / 6-24小时 / 1-3天 / 3天以上
+DURATION_BOUNDS = (6, 24, 72)
+
+# 位布局：疼痛 4 位（单选）| 视力变化 8 位 | 伴随症状 10 位
+FLAG_NAMES = PAIN_OPTIONS + VISION_OPTIONS + ASSOCIATED_OPTIONS
+FLAG_BITS = {name: 1 << i for i, name in enumerate(FLAG_NAMES)}
+PAIN_SHIFT = 0
+VISION_SHIFT = len(PAIN_OPTIONS)
+ASSOCIATED_SHIFT = VISION_SHIFT + len(VISION_OPTIONS)
+FLAG_WIDTH = len(FLAG_NAMES)
+
+# 接口中常见的非标准写法
+FLAG_ALIASES = {
+    '剧痛': '剧烈疼痛', '剧烈眼痛': '剧烈疼痛', '中度': '中度疼痛', '轻微': '轻微不适', '无痛': '无疼痛',
+    '视力模糊': '看东西模糊', '复视': '看东西重影', '眼前黑影': '眼前有黑影', '闪光': '闪光感',
+    '恶心': '恶心呕吐', '呕吐': '恶心呕吐', '剧烈头痛': '头痛', '外伤': '眼部外伤', '化学伤': '化学物质进入眼睛',
+}
+_FLAG_LOOKUP = {normalize_name(name): FLAG_BITS[name] for name in FLAG_NAMES}
+_FLAG_LOOKUP.update({normalize_name(alias): FLAG_BITS[name] for alias, name in FLAG_ALIASES.items()})
+
+SUGGESTED_TIME = {1: '立即就诊', 2: '今天内就诊', 3: '24小时内就诊', 4: '48小时内就诊'}
+SELF_CARE_ADVICE = {
+    1: ('保持平静，避免揉眼', '如为化学伤，立即用大量清水冲洗眼睛至少15分钟', '避免自行用药', '请家人或朋友陪同立即前往急诊'),
+    2: ('避免驾驶车辆', '避免强光刺激', '避免揉眼，尽快前往医院'),
+    3: ('可用湿毛巾冷敷', '避免戴隐形眼镜', '注意眼部卫生，不要与他人共用毛巾'),
+    4: ('保持眼部清洁', '避免长时间用眼', '症状加重时及时就诊'),
+}
+DEFAULT_LEVEL = 4
+DEFAULT_REASON = '常规眼科问题'
+
+# all_mask 中的项须全部出现；any_mask 非 0 时至少出现一项；max_hours 不为 None 时要求持续时间小于该值
+TriageRule = namedtuple('TriageRule', ['level', 'reason', 'all_mask', 'any_mask', 'max_hours'])
+
+
+def make_rule(level, reason, all_of=(), any_of=(), max_hours=None):
+    return TriageRule(
+        level, reason,
+        sum(FLAG_BITS[f] for f in all_of),
+        sum(FLAG_BITS[f] for f in any_of),
+        max_hours,
+    )
+
+
+# 按顺序匹配，第一条命中的规则决定级别；均未命中为 4 级。
+# 默认规则只收录 read.md 第 3 节列出的判断依据（单纯眼部外伤不在其中，外伤只在伴视力明显下降时为 1 级）；
+# 持续时间限制（max_hours）等细化条件需经临床确认后通过 TRIAGE_RULES_FILE 提供，不放在默认规则中
+RULES = (
+    make_rule(1, '视力突然完全丧失，可能危及视力的急症', any_of=('视力突然完全丧失',)),
+    make_rule(1, '化学物质进入眼睛，可能危及视力的急症', any_of=('化学物质进入眼睛',)),
+    make_rule(1, '外伤后视力明显下降', all_of=('眼部外伤',), any_of=('视力急剧下降', '视力突然完全丧失')),
+    make_rule(2, '视力急剧下降', any_of=('视力急剧下降',)),
+    make_rule(2, '眼部剧烈疼痛', any_of=('剧烈疼痛',)),
+    make_rule(2, '眼前黑影或闪光感，需排除视网膜脱离', any_of=('眼前有黑影', '闪光感')),
+    make_rule(3, '视力逐渐下降', any_of=('视力逐渐下降',)),
+    make_rule(3, '眼红伴分泌物增多', all_of=('眼红', '分泌物多')),
+    make_rule(3, '新出现复视', any_of=('看东西重影',)),
+)
+
+
+def load_rules(path):
+    """从 JSON 文件读取规则，格式为
+    [{"level": 1, "reason": "...", "all_of": [...], "any_of": [...], "max_hours": 72}, ...]
+    level 须为 SUGGESTED_TIME 中的级别，否则抛出 ValueError
+    """
+    with open(path, encoding='utf-8') as f:
+        items = json.load(f)
+    for item in items:
+        if item.get('level') not in SUGGESTED_TIME:
+            raise ValueError(f"规则级别须为 {sorted(SUGGESTED_TIME)} 之一: {item!r}")
+    return tuple(
+        make_rule(item['level'], item['reason'], item.get('all_of', ()), item.get('any_of', ()), item.get('max_hours'))
+        for item in items
+    )
+
+
+def encode_flags(pain=None, vision_changes=(), associated_symptoms=(), trauma_history=False, chemical_exposure=False):
+    """表单输入 -> 位掩码；枚举外的取值忽略，外伤/化学伤布尔项并入对应伴随症状位"""
+    flags = 0
+    for value in [pain, *(vision_changes or ()), *(associated_symptoms or ())]:
+        if isinstance(value, str):
+            flags |= _FLAG_LOOKUP.get(normalize_name(value), 0)
+    if trauma_history:
+        flags |= FLAG_BITS['眼部外伤']
+    if chemical_exposure:
+        flags |= FLAG_BITS['化学物质进入眼睛']
+    return flags
+
+
+def match_rule(flags, duration_hours, rules=RULES):
+    """返回第一条命中规则的下标，均未命中返回 len(rules)"""
+    for i, rule in enumerate(rules):
+        if flags & rule.all_mask != rule.all_mask:
+            continue
+        if rule.any_mask and not flags & rule.any_mask:
+            continue
+        if rule.max_hours is not None and (duration_hours is None or duration_hours >= rule.max_hours):
+            continue
+        return i
+    return len(rules)
+
+
+def rule_outcome(index, rules=RULES):
+    """规则下标 -> (level, reason)"""
+    if index >= len(rules):
+        return DEFAULT_LEVEL, DEFAULT_REASON
+    return rules[index].level, rules[index].reason
+
+
+def build_triage_result(level, reason):
+    return {
+        'level': level,
+        'reason': reason,
+        'suggested_time': SUGGESTED_TIME[level],
+        'self_care_advice': list(SELF_CARE_ADVICE[level]),
+    }
+
+
+def evaluate_triage(pain=None, vision_changes=(), duration_hours=None, associated_symptoms=(),
+                    trauma_history=False, chemical_exposure=False, rules=RULES):
+    """单次分诊，返回 /triage/ 响应中的 triage_result"""
+    flags = encode_flags(pain, vision_changes, associated_symptoms, trauma_history, chemical_exposure)
+    level, reason = rule_outcome(match_rule(flags, duration_hours, rules), rules)
+    return build_triage_result(level, reason)
+
+
+def triage_inputs(data):
+    """从 /triage/ 请求体中取出分诊输入；兼容 pain_description 与 pain_level 两种字段名"""
+    return {
+        'pain': data.get('pain_description') or data.get('pain_level'),
+        'vision_changes': data.get('vision_changes') or (),
+        'duration_hours': data.get('duration_hours'),
+        'associated_symptoms': data.get('associated_symptoms') or (),
+        'trauma_history': bool(data.get('trauma_history')),
+        'chemical_exposure': bool(data.get('chemical_exposure')),
+    }
@@ -0,0 +1,81 @@
+# 急诊分诊流程：会话存储取分类结果 -> 分诊规则（记忆表） -> 组装响应
+# /triage/ 与 /triage/batch 共用
+from disease_index import lookup_department
+from session_backend import get_session_backend
+from triage_table import get_triage_table
+
+SESSION_EXPIRED = '会话不存在或已过期，请重新进行症状分类'
+
+
+def parse_triage(data):
+    """校验 /triage/ 请求体，返回 (session_id, 错误信息)"""
+    if not isinstance(data, dict):
+        return None, '请求体必须是 JSON 对象'
+    session_id = data.get('session_id')
+    if not isinstance(session_id, str) or not session_id.strip():
+        return None, 'session_id 不能为空'
+    duration = data.get('duration_hours')
+    if isinstance(duration, bool) or not isinstance(duration, (int, float)) or duration < 0:
+        return session_id, 'duration_hours 必须为非负数'
+    return session_id, None
+
+
+def _department(result, resolved):
+    """会话中已有科室时直接使用；没有时按分类疾病解析一次，同一批次内复用"""
+    department = result.get('recommended_department')
+    if department is not None:
+        return department
+    disease = (result.get('classification') or {}).get('disease')
+    if not disease:
+        return None
+    if disease not in resolved:
+        resolved[disease] = lookup_department(disease)
+    return resolved[disease]
+
+
+def triage_response(session_id, result, data, resolved=None):
+    return {
+        'session_id': session_id,
+        'recommended_department': _department(result, {} if resolved is None else resolved),
+        'triage_result': get_triage_table().evaluate_request(data),
+    }
+
+
+def triage_session(data):
+    """单条分诊，返回 (响应, 错误信息)"""
+    session_id, error = parse_triage(data)
+    if error:
+        return None, error
+    result = get_session_backend().get(session_id)
+    if result is None:
+        return None, SESSION_EXPIRED
+    return triage_response(session_id, result, data), None
+
+
+def triage_batch(items):
+    """批量分诊：所有 session_id 去重后一次批量读取，返回与输入顺序一致的逐条结果"""
+    parsed = [parse_triage(item) for item in items]
+    session_ids = list(dict.fromkeys(sid for sid, error in parsed if not error))
+    sessions = dict(zip(session_ids, get_session_backend().get_many(session_ids)))
+
+    resolved = {}
+    results = []
+    expired = 0
+    for item, (session_id, error) in zip(items, parsed):
+        if error:
+            results.append({'success': False, 'session_id': session_id, 'error': error})
+            continue
+        result = sessions[session_id]
+        if result is None:
+            expired += 1
+            results.append({'success': False, 'session_id': session_id, 'error': SESSION_EXPIRED})
+            continue
+        results.append(dict(triage_response(session_id, result, item, resolved), success=True))
+
+    stats = {
+        'total': len(items),
+        'sessions': len(session_ids),
+        'expired': expired,
+        'invalid': sum(1 for _, error in parsed if error),
+    }
+    return results, stats
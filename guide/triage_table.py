@@ -0,0 +1,197 @@
+# 分诊结果记忆表
+# 以 encode_flags 得到的规则位掩码加上持续时间所在区间（落在规则时间界限之间的哪一段）为键，记住命中的
+# 规则下标：同一症状集合不论列表顺序、写法如何都落在同一项，命中时省去逐条规则匹配。
+# 只有第一次出现的组合才求值，不预先生成全部 2^24 种掩码（16MB 的表、约 0.5 秒的构建）。
+# 配置了 TRIAGE_RULES_FILE 时按 TRIAGE_RULES_CHECK_INTERVAL 检查文件修改时间，规则变化后自动重建
+# 用法: python triage_table.py [--rules rules.json] [--verify 200000]
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+from flask import current_app
+
+from triage import (
+    ASSOCIATED_OPTIONS, FLAG_NAMES, PAIN_OPTIONS, RULES, VISION_OPTIONS, build_triage_result, encode_flags,
+    evaluate_triage, load_rules, match_rule, rule_outcome, triage_inputs,
+)
+
+EXTENSION_KEY = 'triage_table'
+
+_build_lock = threading.Lock()
+
+
+def rules_fingerprint(rules):
+    """规则与位布局的指纹，用于判断重新读取的规则是否真的变化"""
+    payload = json.dumps([FLAG_NAMES, [list(rule) for rule in rules]], ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class TriageTable:
+    """规则加上已求值组合的记忆表；记忆表满时换成新的空表，持续时间不是数值的请求直接逐条匹配
+
+    读记忆表不加锁（只读取当前字典引用），写入和换表在锁内进行。
+    """
+
+    __slots__ = ('rules', 'fingerprint', 'max_entries', 'rules_path', 'rules_mtime', 'checked_at',
+                 '_thresholds', '_results', '_memo', '_lock', 'hits', 'misses')
+
+    def __init__(self, rules=RULES, max_entries=4096, rules_path=None, rules_mtime=None):
+        self.rules = tuple(rules)
+        self.fingerprint = rules_fingerprint(self.rules)
+        self.max_entries = max_entries
+        self.rules_path = rules_path
+        self.rules_mtime = rules_mtime
+        self.checked_at = time.monotonic()
+        # 持续时间只与各条规则的 max_hours 比较，落在相同两个界限之间的取值结果一定相同
+        self._thresholds = sorted({rule.max_hours for rule in self.rules if rule.max_hours is not None})
+        # 每条规则（以及未命中时的默认级别）对应的响应只构建一次，调用方不应修改
+        self._results = tuple(build_triage_result(*rule_outcome(i, self.rules)) for i in range(len(self.rules) + 1))
+        self._memo = {}  # (位掩码, 持续时间区间) -> 规则下标
+        self._lock = threading.Lock()
+        # 统计值不加锁，并发时为近似值
+        self.hits = 0
+        self.misses = 0
+
+    def duration_bucket(self, duration_hours):
+        """持续时间所在区间；未填写为 -1（不满足任何 max_hours），非数值和 NaN 抛出 TypeError"""
+        if duration_hours is None:
+            return -1
+        if isinstance(duration_hours, (int, float)) and duration_hours == duration_hours:
+            return bisect.bisect_right(self._thresholds, duration_hours)
+        raise TypeError(f'duration_hours 不是数值: {duration_hours!r}')
+
+    def evaluate(self, pain=None, vision_changes=(), duration_hours=None, associated_symptoms=(),
+                 trauma_history=False, chemical_exposure=False):
+        """与 triage.evaluate_triage 参数和结果相同"""
+        flags = encode_flags(pain, vision_changes, associated_symptoms, trauma_history, chemical_exposure)
+        try:
+            key = (flags, self.duration_bucket(duration_hours))
+        except TypeError:  # 持续时间不是数值，按原样交给规则匹配
+            self.misses += 1
+            return self._results[match_rule(flags, duration_hours, self.rules)]
+        index = self._memo.get(key)
+        if index is not None:
+            self.hits += 1
+            return self._results[index]
+
+        self.misses += 1
+        index = match_rule(flags, duration_hours, self.rules)
+        with self._lock:
+            if len(self._memo) >= self.max_entries:
+                self._memo = {}
+            self._memo[key] = index
+        return self._results[index]
+
+    def evaluate_request(self, data):
+        """/triage/ 请求体 -> triage_result"""
+        return self.evaluate(**triage_inputs(data))
+
+    def stale(self, interval):
+        """距上次检查超过 interval 秒时查看规则文件修改时间，文件变化返回 True；文件暂时不可读时沿用当前规则"""
+        if not self.rules_path:
+            return False
+        now = time.monotonic()
+        if now - self.checked_at < interval:
+            return False
+        self.checked_at = now
+        try:
+            return os.stat(self.rules_path).st_mtime_ns != self.rules_mtime
+        except OSError:
+            return False
+
+    def verify(self, samples=200000, seed=0):
+        """随机生成表单输入，与 triage.evaluate_triage 逐条对比，返回不一致的请求列表"""
+        rng = random.Random(seed)
+        durations = (None, 0, 1, 5.9, 6, 12, 23.9, 24, 48, 71.9, 72, 200)
+        mismatches = []
+        for _ in range(samples):
+            data = {
+                'pain_description': rng.choice(PAIN_OPTIONS),
+                'vision_changes': rng.sample(VISION_OPTIONS, rng.randint(0, 2)),
+                'duration_hours': rng.choice(durations),
+                'associated_symptoms': rng.sample(ASSOCIATED_OPTIONS, rng.randint(0, 2)),
+                'trauma_history': rng.random() < 0.1,
+                'chemical_exposure': rng.random() < 0.05,
+            }
+            if self.evaluate_request(data) != evaluate_triage(**triage_inputs(data), rules=self.rules):
+                mismatches.append(data)
+        return mismatches
+
+    def stats(self):
+        return {
+            'rules': len(self.rules),
+            'fingerprint': self.fingerprint[:12],
+            'rules_file': self.rules_path or None,
+            'memo_entries': len(self._memo),
+            'memo_max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+def _load_configured(app):
+    """返回 (规则, 规则文件路径, 文件修改时间)"""
+    path = app.config['TRIAGE_RULES_FILE']
+    if not path:
+        return RULES, None, None
+    mtime = os.stat(path).st_mtime_ns
+    return load_rules(path), path, mtime
+
+
+def init_triage_table(app):
+    """规则很小，启动时直接读取，规则文件有误时启动即失败"""
+    reload_triage_table(app)
+
+
+def reload_triage_table(app=None):
+    """重新读取规则；指纹相同时沿用当前的表（保留记忆内容），只更新文件修改时间"""
+    if app is None:
+        app = current_app._get_current_object()
+    rules, path, mtime = _load_configured(app)
+    fingerprint = rules_fingerprint(rules)
+    with _build_lock:
+        current = app.extensions.get(EXTENSION_KEY)
+        if current is not None and current.fingerprint == fingerprint:
+            current.rules_path, current.rules_mtime = path, mtime
+            return current
+        table = TriageTable(rules, max_entries=app.config['TRIAGE_MEMO_MAX_ENTRIES'],
+                            rules_path=path, rules_mtime=mtime)
+        app.extensions[EXTENSION_KEY] = table
+    app.logger.info('Triage rules loaded: %d rules from %s', len(table.rules), path or 'triage.py')
+    return table
+
+
+def get_triage_table():
+    """规则文件修改后的第一次调用重新读取；新文件有误时记录错误并继续使用原规则"""
+    app = current_app._get_current_object()
+    table = app.extensions.get(EXTENSION_KEY)
+    if table is None:
+        return reload_triage_table(app)
+    if table.stale(app.config['TRIAGE_RULES_CHECK_INTERVAL']):
+        try:
+            return reload_triage_table(app)
+        except (OSError, ValueError, KeyError) as e:
+            app.logger.error('Failed to reload triage rules from %s: %s', table.rules_path, e)
+    return table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='校验分诊记忆表与逐条规则的结果一致')
+    parser.add_argument('--rules', help='规则 JSON，缺省为 triage.py 中的当前规则')
+    parser.add_argument('--verify', type=int, default=200000, help='随机样本数')
+    args = parser.parse_args(argv)
+
+    table = TriageTable(load_rules(args.rules) if args.rules else RULES)
+    mismatches = table.verify(args.verify)
+    print(json.dumps(dict(table.stats(), verified=args.verify, mismatches=len(mismatches)), ensure_ascii=False))
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())